@@ -0,0 +1,201 @@
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from database import DATABASES, ConnectionManager, DatabaseUtility
+
+# Reservations that never produced revenue
+NON_REVENUE_STATUSES = ["Cancelled", "No Show"]
+
+# Report periods: the window they cover and the grouping used for their "best" row
+REPORT_PERIODS = {
+    "Yearly": ("year", "month", "Highest Revenue Month"),
+    "Monthly": ("month", "week", "Highest Revenue Week"),
+    "Weekly": ("week", "day", "Highest Revenue Day"),
+    "Daily": ("day", None, None),
+}
+
+FETCH_CHUNK = 100000  # rows pulled from SQLite per fetchmany call
+
+
+def days_since_epoch(day):
+    """Day number of a ``date``, counted from 1970-01-01; the day axis every NumPy column here uses."""
+    return (day - date(1970, 1, 1)).days
+
+
+def iso_day(day):
+    """The YYYY-MM-DD date of a day number, the inverse of ``days_since_epoch``."""
+    return (date(1970, 1, 1) + timedelta(days=int(day))).isoformat()
+
+
+def _week_start(days):
+    """Monday on or before each day, as days since the epoch (1970-01-01 was a Thursday)."""
+    return days - (days + 3) % 7
+
+
+def month_index(days):
+    """Months since January 1970 of an array of day numbers."""
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+class AnalyticsEngine:
+    """Revenue and utilization figures computed over NumPy columns of the reservation history.
+
+    Non-cancelled reservations are loaded once as numeric arrays of car index,
+    start day and rental days, with the matching per-day rate. Every report
+    is then a handful of vectorized masks and ``bincount`` groupings. The
+    columns and finished reports are cached. They are thrown away when
+    reservations.db or vehicle.db changes, detected through ``PRAGMA
+    data_version`` together with the connection's own ``total_changes``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._columns = None
+        self._reports = {}
+
+    @staticmethod
+    def _current_signature():
+        return ConnectionManager.signature(DATABASES["reservations"], DATABASES["vehicle"])
+
+    def invalidate(self):
+        with self._lock:
+            self._signature = None
+
+    def _load(self):
+        vehicles = DatabaseUtility.execute_query(
+            DATABASES["vehicle"], "SELECT car_id, brand, model, rate_per_day FROM vehicles ORDER BY car_id", fetch=True
+        )
+        car_ids = np.array([row[0] for row in vehicles], dtype=np.int64)
+        rates = np.array([row[3] for row in vehicles], dtype=np.float64)
+        names = [f"{row[1]} {row[2]}" for row in vehicles]
+
+        placeholders = ", ".join("?" for _ in NON_REVENUE_STATUSES)
+        chunks = []
+        with ConnectionManager.connection(DATABASES["reservations"]) as conn:
+            cursor = conn.execute(f"""
+                SELECT car_id,
+                       CAST(julianday(start_date) - 2440587.5 AS INTEGER),
+                       CAST(julianday(end_date) - 2440587.5 AS INTEGER)
+                FROM reservations
+                WHERE status NOT IN ({placeholders})
+                  AND julianday(start_date) IS NOT NULL AND julianday(end_date) IS NOT NULL
+            """, NON_REVENUE_STATUSES)
+            while True:
+                rows = cursor.fetchmany(FETCH_CHUNK)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.int64))
+        data = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+
+        # Map car ids onto vehicle rows; reservations for deleted cars keep index -1 and a zero rate
+        position = np.searchsorted(car_ids, data[:, 0])
+        position = np.clip(position, 0, max(len(car_ids) - 1, 0))
+        known = (car_ids[position] == data[:, 0]) if len(car_ids) else np.zeros(len(data), dtype=bool)
+        car_index = np.where(known, position, -1)
+        start = data[:, 1]
+        days = np.maximum(data[:, 2] - start, 1)
+        revenue = days * np.where(known, rates[position] if len(rates) else 0.0, 0.0)
+        return {"car_index": car_index, "start": start, "days": days, "revenue": revenue, "names": names}
+
+    def columns(self):
+        """Return the cached reservation columns, reloading them if the databases changed."""
+        signature = self._current_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._columns = self._load()
+                self._reports = {}
+                self._signature = signature
+            return self._columns
+
+    @staticmethod
+    def window(kind, reference):
+        """Return the [start, end) day range of the period of ``kind`` that contains ``reference``."""
+        if kind == "year":
+            first, last = date(reference.year, 1, 1), date(reference.year + 1, 1, 1)
+        elif kind == "month":
+            first = reference.replace(day=1)
+            last = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        elif kind == "week":
+            day = days_since_epoch(reference)
+            return int(_week_start(np.int64(day))), int(_week_start(np.int64(day))) + 7
+        else:
+            first = reference
+            return days_since_epoch(first), days_since_epoch(first) + 1
+        return days_since_epoch(first), days_since_epoch(last)
+
+    @staticmethod
+    def _top_group(keys, revenue):
+        if not len(keys):
+            return None, 0.0
+        groups, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=revenue)
+        best = int(np.argmax(totals))
+        return groups[best], totals[best]
+
+    @staticmethod
+    def _format_group(grouping, key):
+        if grouping == "month":
+            return np.datetime64(int(key), "M").astype(date).strftime("%B %Y")
+        day = np.datetime64(int(key), "D").astype(date)
+        if grouping == "week":
+            return f"Week of {day.strftime('%B %d, %Y')}"
+        return day.strftime("%B %d, %Y")
+
+    def report(self, period, reference=None):
+        """Return the (metric, value) rows for one of REPORT_PERIODS around ``reference`` (default today)."""
+        reference = reference or date.today()
+        columns = self.columns()
+        with self._lock:
+            cache_key = (period, reference)
+            if cache_key in self._reports:
+                return self._reports[cache_key]
+
+        window, grouping, label = REPORT_PERIODS[period]
+        first, last = self.window(window, reference)
+        mask = (columns["start"] >= first) & (columns["start"] < last)
+        start = columns["start"][mask]
+        revenue = columns["revenue"][mask]
+        car_index = columns["car_index"][mask]
+
+        rows = [
+            ("Total Revenue", f"${revenue.sum():,.2f}"),
+            ("Total Bookings", f"{int(mask.sum()):,}"),
+            ("Rental Days", f"{int(columns['days'][mask].sum()):,}"),
+        ]
+        known = car_index[car_index >= 0]
+        if len(known):
+            counts = np.bincount(known, minlength=len(columns["names"]))
+            rows.append(("Most Booked Car", columns["names"][int(np.argmax(counts))]))
+        else:
+            rows.append(("Most Booked Car", "-"))
+        if grouping:
+            keys = {"month": month_index, "week": _week_start, "day": lambda d: d}[grouping](start)
+            key, total = self._top_group(keys, revenue)
+            rows.append((label, "-" if key is None else f"{self._format_group(grouping, key)} (${total:,.2f})"))
+
+        with self._lock:
+            self._reports[cache_key] = rows
+        return rows
+
+    def monthly_summary(self):
+        """Return (month label, revenue, bookings, rental days) for every month with reservations, newest first."""
+        columns = self.columns()
+        with self._lock:
+            if "monthly" in self._reports:
+                return self._reports["monthly"]
+        if not len(columns["start"]):
+            return []
+        months, inverse = np.unique(month_index(columns["start"]), return_inverse=True)
+        revenue = np.bincount(inverse, weights=columns["revenue"])
+        bookings = np.bincount(inverse)
+        days = np.bincount(inverse, weights=columns["days"])
+        summary = [
+            (self._format_group("month", months[i]), float(revenue[i]), int(bookings[i]), int(days[i]))
+            for i in range(len(months) - 1, -1, -1)
+        ]
+        with self._lock:
+            self._reports["monthly"] = summary
+        return summary
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import http.client
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+from booking import BookingConflict, BookingEngine, ReservationNotFound
+from database import ConnectionManager, DatabaseManager
+from auth import Authenticator
+from logstore import LogStore
+from services import LIST_LIMIT, SEARCH_LIMIT, CustomerService, ReservationService, VehicleService
+
+# Local API service defaults
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_THREADS = 4              # bounded pool running SQLite work for the event loop
+API_WRITE_BATCH = 64         # writes committed together in one transaction
+API_WRITE_WINDOW = 0.005     # seconds the writer waits for more writes to join a batch
+API_MAX_BODY = 1024 * 1024   # largest accepted request body, in bytes
+API_TIMEOUT = 30             # client socket timeout, in seconds
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """Raised by ApiClient for an unexpected response from the API service."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class ApiServer:
+    """Serves the booking operations as HTTP/JSON over a single asyncio event loop.
+
+    Reads run on a bounded thread pool. Writes are queued to one writer task.
+    It gathers whatever arrives within ``API_WRITE_WINDOW`` (up to
+    ``API_WRITE_BATCH`` writes) and commits the batch with
+    ``BookingEngine.apply_batch``. That is one transaction per batch, with a
+    savepoint per write, so a conflicting booking fails alone.
+
+    Routes:
+        GET  /cars/available?start=YYYY-MM-DD&end=YYYY-MM-DD
+        GET  /cars/search?start=&end=&type=&class=&max_price=&min_year=&limit=
+        GET  /customers?after=&before=&limit=
+        GET  /customers/search?q=&limit=
+        GET  /reservations?after=&before=&limit=
+        GET  /reservations/<id>
+        POST /bookings                      {car_id, customer_name, start_date, end_date}
+        POST /reservations                  {car_id, customer_name, start_date, end_date, status}
+        POST /reservations/<id>/status      {status}
+    """
+
+    def __init__(self, host=API_HOST, port=API_PORT, threads=API_THREADS):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api-db")
+        self._writes = None
+        self._server = None
+        self._writer = None
+
+    async def start(self):
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._writer.cancel()
+        self.executor.shutdown(wait=True)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _write(self, name, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((name, args, future))
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._writes.get()]
+            await asyncio.sleep(API_WRITE_WINDOW)
+            while len(batch) < API_WRITE_BATCH and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                results = await self._run(BookingEngine.apply_batch, [(name, args) for name, args, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > API_MAX_BODY:
+                    status, payload = 413, {"error": "Request body too large."}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            data = json.loads(body) if body else {}
+            if method == "GET" and parts == ["cars", "available"]:
+                cars = await self._run(VehicleService.available_cars, query.get("start"), query.get("end"))
+                return 200, {"cars": cars}
+            if method == "GET" and parts == ["cars", "search"]:
+                max_price, min_year = query.get("max_price"), query.get("min_year")
+                cars = await self._run(
+                    lambda: VehicleService.search_available(
+                        query.get("start"), query.get("end"), query.get("type"), query.get("class"),
+                        float(max_price) if max_price else None, int(min_year) if min_year else None,
+                        min(int(query.get("limit", SEARCH_LIMIT)), SEARCH_LIMIT),
+                    )
+                )
+                return 200, {"cars": cars}
+            if method == "GET" and parts == ["customers"]:
+                customers = await self._run(
+                    lambda: CustomerService.list_customers(
+                        after=query.get("after"), before=query.get("before"),
+                        limit=min(int(query.get("limit", LIST_LIMIT)), LIST_LIMIT),
+                    )
+                )
+                return 200, {"customers": customers}
+            if method == "GET" and parts == ["customers", "search"]:
+                limit = min(int(query.get("limit", SEARCH_LIMIT)), SEARCH_LIMIT)
+                customers = await self._run(CustomerService.search_customers, query.get("q", ""), limit)
+                return 200, {"customers": customers}
+            if method == "GET" and parts == ["reservations"]:
+                reservations = await self._run(
+                    lambda: ReservationService.list_reservations(
+                        after=int(query["after"]) if "after" in query else None,
+                        before=int(query["before"]) if "before" in query else None,
+                        limit=min(int(query.get("limit", LIST_LIMIT)), LIST_LIMIT),
+                    )
+                )
+                return 200, {"reservations": reservations}
+            if method == "GET" and len(parts) == 2 and parts[0] == "reservations":
+                reservation = await self._run(ReservationService.get_reservation, int(parts[1]))
+                if reservation is None:
+                    return 404, {"error": f"Reservation {parts[1]} does not exist."}
+                return 200, {"reservation": reservation}
+            if method == "POST" and parts == ["bookings"]:
+                reservation_id = await self._write(
+                    "book", int(data["car_id"]), data["customer_name"], data["start_date"], data["end_date"]
+                )
+                return 200, {"reservation_id": reservation_id}
+            if method == "POST" and parts == ["reservations"]:
+                reservation_id = await self._write(
+                    "reserve", int(data["car_id"]), data["customer_name"], data["start_date"], data["end_date"],
+                    data.get("status", "Upcoming"),
+                )
+                return 200, {"reservation_id": reservation_id}
+            if method == "POST" and len(parts) == 3 and parts[0] == "reservations" and parts[2] == "status":
+                await self._write("update_status", int(parts[1]), data["status"])
+                return 200, {}
+            return 404, {"error": f"No route for {method} {url.path}"}
+        except ReservationNotFound as e:
+            return 404, {"error": str(e)}
+        except BookingConflict as e:
+            return 409, {"error": str(e)}
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, {"error": str(e) if not isinstance(e, KeyError) else f"Missing field: {e}"}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+
+class ApiClient:
+    """Talks to an ApiServer with the same method names as the local services.
+
+    It stands in for VehicleService, ReservationService and CustomerService
+    when the app runs as a thin client. Each calling thread keeps its own
+    keep-alive connection.
+    """
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.host = url.hostname or API_HOST
+        self.port = url.port or API_PORT
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=API_TIMEOUT)
+        return conn
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        for attempt in range(2):
+            conn = self._connection()
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                data = json.loads(response.read() or b"{}")
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # The server may have dropped an idle keep-alive connection; reconnect once. A POST that
+                # went out may already be committed, and sending it again could book the car twice.
+                conn.close()
+                self._local.conn = None
+                if attempt or (sent and method != "GET"):
+                    raise
+        if response.status == 409:
+            raise BookingConflict(data.get("error"))
+        if response.status == 400:
+            raise ValueError(data.get("error"))
+        if response.status != 200:
+            raise ApiError(response.status, data.get("error"))
+        return data
+
+    def available_cars(self, start_date=None, end_date=None):
+        query = urlencode({key: value for key, value in (("start", start_date), ("end", end_date)) if value})
+        return [tuple(car) for car in self._request("GET", f"/cars/available?{query}")["cars"]]
+
+    def search_available(self, start_date, end_date, vehicle_type=None, vehicle_class=None, max_price=None,
+                         min_year=None, limit=SEARCH_LIMIT):
+        params = {"start": start_date, "end": end_date, "type": vehicle_type, "class": vehicle_class,
+                  "max_price": max_price, "min_year": min_year, "limit": limit}
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        return [tuple(car) for car in self._request("GET", f"/cars/search?{query}")["cars"]]
+
+    def list_customers(self, after=None, limit=LIST_LIMIT, before=None):
+        params = {"after": after, "before": before, "limit": limit}
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        return [tuple(row) for row in self._request("GET", f"/customers?{query}")["customers"]]
+
+    def search_customers(self, text, limit=SEARCH_LIMIT):
+        query = urlencode({"q": text, "limit": limit})
+        return [tuple(row) for row in self._request("GET", f"/customers/search?{query}")["customers"]]
+
+    def list_reservations(self, after=None, limit=LIST_LIMIT, before=None):
+        params = {"after": after, "before": before, "limit": limit}
+        query = urlencode({key: value for key, value in params.items() if value is not None})
+        return [tuple(row) for row in self._request("GET", f"/reservations?{query}")["reservations"]]
+
+    def get_reservation(self, reservation_id):
+        try:
+            return tuple(self._request("GET", f"/reservations/{quote(str(reservation_id))}")["reservation"])
+        except ApiError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def book(self, car_id, customer_name, start_date, end_date):
+        return self._request("POST", "/bookings", {
+            "car_id": car_id, "customer_name": customer_name, "start_date": start_date, "end_date": end_date,
+        })["reservation_id"]
+
+    def reserve(self, car_id, customer_name, start_date, end_date, status):
+        return self._request("POST", "/reservations", {
+            "car_id": car_id, "customer_name": customer_name, "start_date": start_date,
+            "end_date": end_date, "status": status,
+        })["reservation_id"]
+
+    def update_status(self, reservation_id, new_status):
+        self._request("POST", f"/reservations/{quote(str(reservation_id))}/status", {"status": new_status})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the car rental booking operations over local HTTP/JSON.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="SQLite worker threads")
+    args = parser.parse_args(argv)
+
+    # The service owns the database files: its clients neither migrate them nor archive the audit log
+    DatabaseManager.initialize_database()
+    LogStore.archive()
+    Authenticator.migrate_passwords()
+    server = ApiServer(args.host, args.port, args.threads)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,49 @@
 import sqlite3
+import argparse
+import atexit
+import functools
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox, ttk
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import filedialog, messagebox, ttk
 from datetime import datetime
 
-# Constants for database names and other repeated values
-DATABASES = {
-    "user": "user.db",
-    "customer": "customer.db",
-    "vehicle": "vehicle.db",
-    "reservations": "reservations.db",
-    "logs": "logs.db",
-    "settings": "settings.db",
-}
+from api import ApiClient
+from audit import AuditLogger
+from auth import Authenticator
+from booking import RELEASE_STATUSES, BookingConflict
+from database import DATABASES, VEHICLE_CLASSES, ConnectionManager, DatabaseManager, DatabaseUtility
+from export import EXPORT_FORMATS, EXPORT_TABLES, ExportCancelled, ExportJob
+from importer import CsvImporter
+from logstore import LogStore
+from services import (
+    CustomerService, LogService, PricingService, ReportingService, ReservationService, UserService, VehicleService,
+)
 
 DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
-# Utility class for database operations
-class DatabaseUtility:
-    @staticmethod
-    def execute_query(db_name, query, params=(), fetch=False):
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        result = cursor.fetchall() if fetch else None
-        conn.commit()
-        conn.close()
-        return result
+# Paged Treeview tuning: rows fetched per query and pages kept in the widget at once
+PAGE_SIZE = 200
+MAX_PAGES = 5
+
+# Dashboard metrics: label -> reservation statuses it counts (None counts every status)
+DASHBOARD_METRICS = {
+    "Total Reservations": None,
+    "Ongoing Reservations": ("Ongoing", "In Progress"),
+    "Upcoming Reservations": ("Upcoming", "Booked", "Hold", "Book Now", "Delayed"),
+    "Completed Reservations": ("Completed",),
+}
+UPCOMING_LIMIT = 10
+
+# Background database worker: threads running queries and how often the Tk thread collects results (ms)
+DB_WORKERS = 2
+DB_POLL_INTERVAL = 25
+
+# How often the export screen reads the progress of a running export (ms)
+EXPORT_POLL_INTERVAL = 200
 
 # Utility function to create Treeview widgets
 def create_treeview(parent, columns, column_width=120):
@@ -35,180 +53,500 @@ def create_treeview(parent, columns, column_width=120):
         tree.column(col, width=column_width)
     return tree
 
-# Database initialization
-class DatabaseManager:
-    """Handles database operations."""
-    @staticmethod
-    def initialize_database():
-        # Initialize user.db
-        DatabaseUtility.execute_query(DATABASES["user"], """
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL,
-                first_name TEXT,
-                last_name TEXT,
-                phone TEXT,
-                email TEXT,
-                employee_id TEXT,
-                address TEXT
-            )
-        """)
-        dummy_users = [
-            ('manager', 'man123', 'Manager', 'Default', 'Manager', '1234567890', 'manager@example.com', '1000', '123 Manager St'),
-            ('employee1', 'emp123', 'Employee', 'John', 'Doe', '555-1111', 'john.doe@example.com', '2001', '456 Elm St'),
-            ('employee2', 'emp123', 'Employee', 'Jane', 'Smith', '555-2222', 'jane.smith@example.com', '2002', '789 Oak St'),
-            ('employee3', 'emp123', 'Employee', 'Alice', 'Johnson', '555-3333', 'alice.johnson@example.com', '2003', '123 Pine St'),
-            ('employee4', 'emp123', 'Employee', 'Michael', 'Brown', '555-4444', 'michael.brown@example.com', '2004', '456 Maple St'),
-            ('employee5', 'emp123', 'Employee', 'Emily', 'Davis', '555-5555', 'emily.davis@example.com', '2005', '789 Birch St'),
-        ]
-        for user in dummy_users:
-            DatabaseUtility.execute_query(DATABASES["user"], """
-                INSERT OR IGNORE INTO users (username, password, role, first_name, last_name, phone, email, employee_id, address)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, params=user)
-
-        # Initialize customer.db
-        DatabaseUtility.execute_query(DATABASES["customer"], """
-            CREATE TABLE IF NOT EXISTS customers (
-                name TEXT PRIMARY KEY,
-                address TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                license_number TEXT NOT NULL,
-                insurance_company TEXT NOT NULL,
-                policy_number TEXT NOT NULL
-            )
-        """)
-        dummy_customers = [
-            ("John Doe", "123 Elm Street", "555-1234", "LN12345", "ABC Insurance", "PN98765"),
-            ("Jane Smith", "456 Oak Avenue", "555-5678", "LN67890", "XYZ Insurance", "PN54321"),
-            ("Alice Johnson", "789 Pine Road", "555-9012", "LN11223", "DEF Insurance", "PN11223"),
-        ]
-        for customer in dummy_customers:
-            DatabaseUtility.execute_query(DATABASES["customer"], """
-                INSERT OR IGNORE INTO customers (name, address, phone, license_number, insurance_company, policy_number)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, params=customer)
-
-        # Initialize feedback table
-        DatabaseUtility.execute_query(DATABASES["customer"], """
-            CREATE TABLE IF NOT EXISTS feedback (
-                feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_name TEXT NOT NULL,
-                rating INTEGER NOT NULL,
-                comment TEXT,
-                date TEXT NOT NULL
-            )
-        """)
-        dummy_feedback = [
-            ("John Doe", 5, "Excellent service! Highly recommend.", "2025-03-01"),
-            ("Jane Smith", 4, "Good experience, but the car was slightly dirty.", "2025-03-02"),
-            ("Alice Johnson", 3, "Average service. Could be better.", "2025-03-03"),
-            ("Michael Brown", 5, "Amazing staff and great cars!", "2025-03-04"),
-            ("Emily Davis", 2, "Had issues with the car's AC.", "2025-03-05"),
-        ]
-        for feedback in dummy_feedback:
-            DatabaseUtility.execute_query(DATABASES["customer"], """
-                INSERT INTO feedback (customer_name, rating, comment, date)
-                VALUES (?, ?, ?, ?)
-            """, params=feedback)
-
-        # Initialize vehicle.db
-        DatabaseUtility.execute_query(DATABASES["vehicle"], """
-            CREATE TABLE IF NOT EXISTS vehicles (
-                car_id INTEGER PRIMARY KEY,
-                brand TEXT NOT NULL,
-                model TEXT NOT NULL,
-                year INTEGER NOT NULL,
-                rate_per_day REAL NOT NULL,
-                rate_per_km REAL NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Available'
-            )
-        """)
-        dummy_vehicles = [
-            (10, "Toyota", "Corolla", 2020, 50.0, 0.2, "Available"),
-            (11, "Honda", "Civic", 2019, 45.0, 0.18, "Ongoing"),
-            (12, "Ford", "Focus", 2021, 55.0, 0.25, "Upcoming"),
-            (13, "Chevrolet", "Malibu", 2018, 40.0, 0.15, "Available"),
-            (14, "Nissan", "Altima", 2020, 50.0, 0.2, "Available"),
-        ]
-        for vehicle in dummy_vehicles:
-            DatabaseUtility.execute_query(DATABASES["vehicle"], """
-                INSERT OR IGNORE INTO vehicles (car_id, brand, model, year, rate_per_day, rate_per_km, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, params=vehicle)
-
-        # Initialize reservations.db
-        DatabaseUtility.execute_query(DATABASES["reservations"], """
-            CREATE TABLE IF NOT EXISTS reservations (
-                reservation_id INTEGER PRIMARY KEY,
-                customer_name TEXT NOT NULL,
-                car_id INTEGER NOT NULL,
-                start_date TEXT NOT NULL,
-                end_date TEXT NOT NULL,
-                status TEXT NOT NULL,
-                FOREIGN KEY (car_id) REFERENCES vehicles (car_id)
-            )
-        """)
-        dummy_reservations = [
-            (1, "John Doe", 10, "2025-01-01", "2025-01-10", "Completed"),
-            (2, "Jane Smith", 11, "2025-03-10", "2025-03-15", "Ongoing"),
-            (3, "Alice Johnson", 12, "2025-03-20", "2025-03-25", "Upcoming"),
-        ]
-        for reservation in dummy_reservations:
-            DatabaseUtility.execute_query(DATABASES["reservations"], """
-                INSERT OR IGNORE INTO reservations (reservation_id, customer_name, car_id, start_date, end_date, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, params=reservation)
-
-        # Initialize logs.db
-        DatabaseUtility.execute_query(DATABASES["logs"], """
-            CREATE TABLE IF NOT EXISTS logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user TEXT NOT NULL,
-                action TEXT NOT NULL,
-                timestamp TEXT NOT NULL
-            )
-        """)
-        dummy_logs = [
-            ("manager", "Added a new vehicle: Toyota Corolla", "2025-03-20 10:00:00"),
-            ("employee1", "Updated reservation #1", "2025-03-21 14:30:00"),
-            ("manager", "Deleted vehicle #12", "2025-03-22 09:15:00"),
-            ("employee2", "Added a new customer: John Doe", "2025-03-23 11:45:00"),
-            ("manager", "Generated financial report for March 2025", "2025-03-24 08:00:00"),
-        ]
-        for log in dummy_logs:
-            DatabaseUtility.execute_query(DATABASES["logs"], """
-                INSERT OR IGNORE INTO logs (user, action, timestamp)
-                VALUES (?, ?, ?)
-            """, params=log)
+def show_db_error(error):
+    messagebox.showerror("Error", f"An error occurred: {error}")
+
+class DbWorker:
+    """Runs database work on background threads and hands results back to the Tk thread.
+
+    Results are queued by the worker threads and collected on the Tk thread by
+    a ``root.after`` poll, so callbacks can touch widgets safely. Cancellable
+    tasks belong to the current screen. ``cancel_all()``, called whenever the
+    ScreenRegistry switches screens, interrupts their SQLite statements and
+    discards their results.
+    """
+    def __init__(self, root, workers=DB_WORKERS):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue()
+        self._screen_cancel = threading.Event()
+        self._outstanding = 0
+        self._screen_tasks = 0  # cancellable tasks of the current screen still running
+        self._polling = False
+
+    def submit(self, work, on_success=None, on_error=show_db_error, loading=None, cancellable=True):
+        """Run ``work()`` in the background, then call ``on_success(result)`` or ``on_error(exc)`` on the Tk thread.
+
+        ``loading`` is an optional parent widget that shows a "Loading..." label until the task finishes.
+        """
+        cancel = self._screen_cancel if cancellable else threading.Event()
+        indicator = None
+        if loading is not None:
+            indicator = tk.Label(loading, text="Loading...", fg="gray")
+            indicator.pack(pady=5)
+
+        def run():
+            try:
+                with ConnectionManager.cancel_on(cancel):
+                    outcome = (on_success, work())
+            except Exception as e:
+                outcome = (on_error, e)
+            self._results.put((cancel, indicator, outcome))
+
+        self._outstanding += 1
+        if cancellable:
+            self._screen_tasks += 1
+        self.executor.submit(run)
+        if not self._polling:
+            self._polling = True
+            self.root.after(DB_POLL_INTERVAL, self._poll)
+
+    def cancel_all(self):
+        """Cancel every cancellable task started for the current screen; return True if any was still running."""
+        interrupted = self._screen_tasks > 0
+        self._screen_tasks = 0
+        self._screen_cancel.set()
+        self._screen_cancel = threading.Event()
+        return interrupted
+
+    def _poll(self):
+        while True:
+            try:
+                cancel, indicator, (callback, value) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if cancel is self._screen_cancel:
+                self._screen_tasks -= 1
+            if indicator is not None and indicator.winfo_exists():
+                indicator.destroy()
+            if not cancel.is_set() and callback is not None:
+                callback(value)
+        if self._outstanding:
+            self.root.after(DB_POLL_INTERVAL, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+class TreeRows:
+    """Rows of a Treeview addressed by a key column, so single rows can change in place.
+
+    ``upsert`` and ``remove`` touch only the affected row. ``sync`` diffs a
+    fresh result set against the rows on screen. Either way the scroll
+    position and selection survive, unlike a full reload. Keys are looked up
+    by their string form, so values read back from the Treeview work too.
+    """
+    def __init__(self, tree, key_index=0):
+        self.tree = tree
+        self.key_index = key_index
+        self._key_of = {}   # Treeview item -> key value of its row
+        self._item_of = {}  # str(key) -> Treeview item
+        self._row_of = {}   # Treeview item -> row tuple currently shown
+
+    def __contains__(self, key):
+        return str(key) in self._item_of
+
+    def key_of(self, item):
+        return self._key_of[item]
+
+    def keys(self):
+        return [self._key_of[item] for item in self.tree.get_children()]
+
+    def insert(self, rows, index="end"):
+        for offset, row in enumerate(rows):
+            item = self.tree.insert("", index if index == "end" else index + offset, values=row)
+            self._key_of[item] = row[self.key_index]
+            self._item_of[str(row[self.key_index])] = item
+            self._row_of[item] = tuple(row)
+
+    def delete(self, items):
+        self.tree.delete(*items)
+        for item in items:
+            del self._item_of[str(self._key_of.pop(item))]
+            del self._row_of[item]
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._key_of.clear()
+        self._item_of.clear()
+        self._row_of.clear()
+
+    def upsert(self, row):
+        """Update the row with ``row``'s key in place, or insert it at its key-ordered position."""
+        item = self._item_of.get(str(row[self.key_index]))
+        if item is None:
+            self.insert([row], bisect_left(self.keys(), row[self.key_index]))
+        elif self._row_of[item] != tuple(row):
+            self.tree.item(item, values=row)
+            self._row_of[item] = tuple(row)
+
+    def remove(self, key):
+        item = self._item_of.get(str(key))
+        if item is not None:
+            self.delete([item])
+
+    def sync(self, rows):
+        """Show exactly ``rows``, in order, touching only rows that were added, changed, removed or moved."""
+        wanted = [str(row[self.key_index]) for row in rows]
+        keep = set(wanted)
+        self.delete([item for key, item in self._item_of.items() if key not in keep])
+        for row in rows:
+            if str(row[self.key_index]) in self._item_of:
+                self.upsert(row)
+            else:
+                self.insert([row])
+        if [str(key) for key in self.keys()] != wanted:
+            for index, key in enumerate(wanted):
+                self.tree.move(self._item_of[key], "", index)
+
+class KeysetPager:
+    """Feeds a Treeview from a table one keyset page at a time as the user scrolls.
+
+    Pages are fetched with ``WHERE key > ? ORDER BY key LIMIT ?`` (or the
+    reverse when scrolling up). At most ``max_pages`` pages are kept in the
+    widget, so memory and first paint stay the same however large the table is.
+    When a DbWorker is given, pages are fetched on it instead of the Tk thread.
+    A ``fetch(after=, before=, limit=)`` callable, such as a service's
+    ``list_*`` method, can stand in for the SQL query.
+    """
+    def __init__(self, tree, db_name, select, key, key_index=0, where="", params=(),
+                 page_size=PAGE_SIZE, max_pages=MAX_PAGES, worker=None, fetch=None):
+        self.tree = tree
+        self.db_name = db_name
+        self.select = select
+        self.key = key
+        self.key_index = key_index
+        self.where = where
+        self.params = tuple(params)
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.rows_above = False  # rows before the first loaded one were trimmed
+        self.rows_below = True   # the last page fetched was full
+        self.worker = worker
+        self.fetch = fetch
+        self._pending = False
+        self._generation = 0  # bumped whenever the rows are replaced, so stale pages are dropped
+        self.rows = TreeRows(tree, key_index)
+        tree["yscrollcommand"] = self._on_scroll
+        self.reload()
+
+    def _fetch(self, after=None, before=None):
+        if self.fetch is not None:
+            return self.fetch(after=after, before=before, limit=self.page_size)
+        conditions = [f"({self.where})"] if self.where else []
+        params = list(self.params)
+        order = "ASC"
+        if after is not None:
+            conditions.append(f"{self.key} > ?")
+            params.append(after)
+        elif before is not None:
+            conditions.append(f"{self.key} < ?")
+            params.append(before)
+            order = "DESC"
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"{self.select}{where} ORDER BY {self.key} {order} LIMIT ?"
+        rows = DatabaseUtility.execute_query(self.db_name, query, (*params, self.page_size), fetch=True)
+        return rows[::-1] if order == "DESC" else rows
+
+    def _request(self, apply, loading=None, **bounds):
+        """Fetch a page (in the background if there is a worker) and pass it to ``apply``."""
+        self._pending = True
+        generation = self._generation
+
+        def done(rows):
+            self._pending = False
+            if self.tree.winfo_exists() and generation == self._generation:
+                apply(rows)
+
+        def failed(error):
+            self._pending = False
+            show_db_error(error)
+
+        if self.worker is None:
+            done(self._fetch(**bounds))
+        else:
+            self.worker.submit(lambda: self._fetch(**bounds), done, failed, loading=loading)
+
+    def reload(self):
+        self._clear()
+        self._request(self._apply_first, loading=self.tree.master)
+
+    def show_rows(self, rows):
+        """Replace the loaded pages with ``rows``, such as search results; scrolling loads nothing until reload()."""
+        self._clear()
+        self._insert(rows, "end")
+
+    def _clear(self):
+        self._generation += 1
+        self.rows.clear()
+        self.rows_above = False
+        self.rows_below = False
+
+    def _apply_first(self, rows):
+        self._insert(rows, "end")
+        self.rows_below = len(rows) == self.page_size
+
+    def _insert(self, rows, index):
+        self.rows.insert(rows, index)
+
+    def _delete(self, items):
+        self.rows.delete(items)
+
+    def _edge_key(self, position):
+        children = self.tree.get_children()
+        return self.rows.key_of(children[position]) if children else None
+
+    def upsert(self, row):
+        """Show the current version of one row: update it in place, or insert it if it falls in the loaded range."""
+        key = row[self.key_index]
+        if key not in self.rows:
+            keys = self.rows.keys()
+            if keys and key < keys[0] and self.rows_above:
+                return  # arrives with the page above when the user scrolls up
+            if (not keys or key > keys[-1]) and self.rows_below:
+                return  # arrives with the next page
+        self.rows.upsert(row)
+
+    def remove(self, key):
+        self.rows.remove(key)
+
+    def load_next(self):
+        if self.rows_below:
+            self._request(self._apply_next, after=self._edge_key(-1))
+        else:
+            self._pending = False
+
+    def _apply_next(self, rows):
+        self.rows_below = len(rows) == self.page_size
+        if not rows:
+            return
+        position = self._first_visible()
+        self._insert(rows, "end")
+        children = self.tree.get_children()
+        excess = len(children) - self.max_rows
+        if excess > 0:
+            self._delete(children[:excess])
+            self.rows_above = True
+            self._move_to(position - excess)
+
+    def load_previous(self):
+        if self.rows_above:
+            self._request(self._apply_previous, before=self._edge_key(0))
+        else:
+            self._pending = False
+
+    def _apply_previous(self, rows):
+        self.rows_above = len(rows) == self.page_size
+        if not rows:
+            return
+        position = self._first_visible()
+        self._insert(rows, 0)
+        children = self.tree.get_children()
+        excess = len(children) - self.max_rows
+        if excess > 0:
+            self._delete(children[-excess:])
+            self.rows_below = True
+        self._move_to(position + len(rows))
+
+    def _first_visible(self):
+        return round(self.tree.yview()[0] * len(self.tree.get_children()))
+
+    def _move_to(self, index):
+        total = len(self.tree.get_children())
+        if total:
+            self.tree.yview_moveto(max(index, 0) / total)
+
+    def _on_scroll(self, first, last):
+        if self._pending:
+            return
+        if float(last) > 0.9 and self.rows_below:
+            self._pending = True
+            self.tree.after_idle(self.load_next)
+        elif float(first) < 0.1 and self.rows_above:
+            self._pending = True
+            self.tree.after_idle(self.load_previous)
+
+def create_paged_treeview(parent, columns, db_name, select, key, column_width=120, **pager_options):
+    """Create a Treeview whose rows are loaded lazily by a KeysetPager (available as ``tree.pager``)."""
+    tree = create_treeview(parent, columns, column_width)
+    tree.pager = KeysetPager(tree, db_name, select, key, **pager_options)
+    return tree
+
+def create_search_bar(parent, tree, search, worker):
+    """Add a search box whose ranked ``search(text)`` matches replace the rows of a paged ``tree`` until cleared.
+
+    Returns a function that re-runs the current search, or reloads the pages when the box is empty.
+    """
+    frame = tk.Frame(parent)
+    frame.pack(pady=5)
+    entry = tk.Entry(frame, width=40)
+    entry.pack(side=tk.LEFT, padx=5)
+
+    def run_search(event=None):
+        text = entry.get().strip()
+        if text:
+            worker.submit(lambda: search(text), tree.pager.show_rows)
+        else:
+            tree.pager.reload()
+
+    def clear():
+        entry.delete(0, tk.END)
+        tree.pager.reload()
+
+    entry.bind("<Return>", run_search)
+    tk.Button(frame, text="Search", command=run_search).pack(side=tk.LEFT, padx=5)
+    tk.Button(frame, text="Clear", command=clear).pack(side=tk.LEFT, padx=5)
+    return run_search
+
+def run_csv_import(app, what, import_file, then):
+    """Ask for a CSV file, import it with ``import_file(path)`` in the background, report the result, then call ``then``."""
+    path = filedialog.askopenfilename(title=f"Import {what}", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+
+    def imported(result):
+        app.log_action(app.session.username, f"Imported {result['imported']} {what} from {os.path.basename(path)}")
+        message = f"Imported {result['imported']:,} {what}."
+        if result["report"]:
+            message += f"\n{result['rejected']:,} rows were rejected; see {result['report']}"
+        messagebox.showinfo("Import", message)
+        then()
+
+    app.db_worker.submit(lambda: import_file(path), imported, cancellable=False)
+
+def show_quote(app, car_id, start_date, end_date):
+    """Price ``car_id`` over [start_date, end_date) in the background and show the quote."""
+    if not start_date or not end_date:
+        messagebox.showerror("Error", "Enter the start and end dates to get a quote.")
+        return
+
+    def quoted(prices):
+        if int(car_id) in prices:
+            messagebox.showinfo("Quote", f"Car #{car_id} from {start_date} to {end_date}: ${prices[int(car_id)]:,.2f}")
+        else:
+            messagebox.showerror("Error", f"Car #{car_id} not found!")
+
+    def failed(e):
+        if isinstance(e, ValueError):
+            messagebox.showerror("Error", str(e))
+        else:
+            show_db_error(e)
+
+    app.db_worker.submit(lambda: PricingService.quote_cars([car_id], start_date, end_date), quoted, failed)
+
+class ScreenRegistry:
+    """Keeps each list screen's frame alive after its first visit and switches between them.
+
+    A cached screen is built once, into its own frame, by a builder that
+    returns a ``refresh`` callable (or None when the screen shows no
+    database data). Later visits just show the frame again. ``refresh``
+    runs only when one of the screen's database files has changed since the
+    screen last loaded, judged by ``ConnectionManager.signature``, or when
+    the screen was left while its data was still loading. Forms are built
+    with ``open_transient`` and destroyed as soon as another screen is shown.
+    """
+    def __init__(self, parent, worker):
+        self.parent = parent
+        self.worker = worker
+        self.frame = None       # frame of the screen on display
+        self._current = None    # name of the cached screen on display, None for a transient one
+        self._transient = None
+        self._screens = {}      # name -> (frame, refresh, db_names)
+        self._loaded = {}       # name -> signature of its db_names when its data was last loaded
+
+    def _switch(self, frame, name):
+        if self.worker.cancel_all() and self._current is not None:
+            self._loaded.pop(self._current, None)  # left mid-load: reload on the next visit
+        if self.frame is not None:
+            self.frame.pack_forget()
+        if self._transient is not None:
+            self._transient.destroy()
+            self._transient = None
+        self.frame = frame
+        self._current = name
+        frame.pack(fill=tk.BOTH, expand=True)
+
+    def open_transient(self):
+        """Show a fresh frame for a screen that is rebuilt on every visit."""
+        frame = tk.Frame(self.parent)
+        self._switch(frame, None)
+        self._transient = frame
+        return frame
+
+    def show(self, name, build, db_names=()):
+        """Show the cached screen ``name``, building it with ``build()`` on the first visit."""
+        if name not in self._screens:
+            self._switch(tk.Frame(self.parent), name)
+            self._check(name, db_names, None)
+            self._screens[name] = (self.frame, build(), db_names)
+            return
+        frame, refresh, db_names = self._screens[name]
+        if frame is not self.frame:
+            self._switch(frame, name)
+        if refresh is not None:
+            self._check(name, db_names, refresh)
+
+    def _check(self, name, db_names, refresh):
+        if not db_names:
+            return
+        loaded = self._loaded.get(name)
+
+        def compare(signature):
+            self._loaded[name] = signature
+            if refresh is not None and signature != loaded and self._current == name:
+                refresh()
+
+        self.worker.submit(lambda: ConnectionManager.signature(*db_names), compare)
+
+def cached_screen(*sources):
+    """Make a ``show_*`` method open a ScreenRegistry screen refreshed when the ``DATABASES[source]`` files change.
+
+    The method builds into ``content_frame`` and returns the screen's refresh callable.
+    """
+    def decorate(build):
+        @functools.wraps(build)
+        def show(self):
+            app = getattr(self, "app", self)
+            app.screens.show(build.__qualname__, lambda: build(self), tuple(DATABASES[source] for source in sources))
+        return show
+    return decorate
 
 class Dashboard:
     """Handles dashboard-related operations."""
     def __init__(self, app):
         self.app = app
 
+    @cached_screen("reservations")
     def show_dashboard(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Dashboard", font=("Arial", 20)).pack(pady=10)
 
         # Key Metrics Overview
         tk.Label(self.app.content_frame, text="Key Metrics", font=("Arial", 16)).pack(pady=5)
         metrics_frame = tk.Frame(self.app.content_frame)
         metrics_frame.pack(pady=5)
-        tk.Label(metrics_frame, text="Total Reservations: 120", font=("Arial", 14)).grid(row=0, column=0, padx=10)
-        tk.Label(metrics_frame, text="Ongoing Reservations: 15", font=("Arial", 14)).grid(row=0, column=1, padx=10)
-        tk.Label(metrics_frame, text="Upcoming Reservations: 5", font=("Arial", 14)).grid(row=1, column=0, padx=10)
-        tk.Label(metrics_frame, text="Completed Reservations: 100", font=("Arial", 14)).grid(row=1, column=1, padx=10)
+        metric_labels = {}
+        for index, metric in enumerate(DASHBOARD_METRICS):
+            label = tk.Label(metrics_frame, text=f"{metric}: ...", font=("Arial", 14))
+            label.grid(row=index // 2, column=index % 2, padx=10)
+            metric_labels[metric] = label
 
         # Upcoming Reservations
-        tk.Label(self.app.content_frame, text="Upcoming Reservations", font=("Arial", 16)).pack(pady=5)
-        columns = ("Reservation ID", "Customer Name", "Car ID", "Start Date", "End Date")
-        upcoming_tree = ttk.Treeview(self.app.content_frame, columns=columns, show="headings")
-        for col in columns:
-            upcoming_tree.heading(col, text=col)
-            upcoming_tree.column(col, width=120)  # Set column width
-        upcoming_tree.pack(pady=5)
+        upcoming = TreeRows(self._show_upcoming_reservations())
+
+        def fill_dashboard(data):
+            counters, upcoming_reservations = data
+            for metric, statuses in DASHBOARD_METRICS.items():
+                total = sum(count for status, count in counters.items() if statuses is None or status in statuses)
+                metric_labels[metric].config(text=f"{metric}: {total}")
+            upcoming.sync(upcoming_reservations)
+
+        def refresh():
+            self.app.db_worker.submit(self._load_metrics, fill_dashboard)
+
+        refresh()
 
         # Recent Notifications
         self._show_recent_notifications()
@@ -216,17 +554,22 @@ class Dashboard:
         # Quick Actions
         self._show_quick_actions()
 
+        # Add a welcome message in the content frame
+        tk.Label(self.app.content_frame, text=f"Welcome, {self.app.session.username}!", font=("Arial", 16)).pack(pady=10)
+        return refresh
+
+    @staticmethod
+    def _load_metrics():
+        """Read the trigger-maintained status counters and the next few upcoming reservations."""
+        return ReservationService.status_counts(), ReservationService.upcoming(UPCOMING_LIMIT)
+
     def _show_upcoming_reservations(self):
         tk.Label(self.app.content_frame, text="Upcoming Reservations", font=("Arial", 16)).pack(pady=5)
         columns = ("Reservation ID", "Customer Name", "Car ID", "Start Date", "End Date")
         tree = create_treeview(self.app.content_frame, columns)
-        upcoming_reservations = [
-            (1, "John Doe", 10, "2025-03-25", "2025-03-30"),
-            (2, "Jane Smith", 11, "2025-03-28", "2025-04-02"),
-        ]
-        for reservation in upcoming_reservations:
-            tree.insert("", "end", values=reservation)
+        tree.configure(height=min(UPCOMING_LIMIT, 10))
         tree.pack(fill=tk.BOTH, expand=True, pady=5)
+        return tree
 
     def _show_recent_notifications(self):
         tk.Label(self.app.content_frame, text="Recent Notifications", font=("Arial", 16)).pack(pady=5)
@@ -258,24 +601,19 @@ class UserManager:
         self.app = app
 
     def login(self, username, password):
-        conn = sqlite3.connect("user.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, password))
-        user = cursor.fetchone()
-        conn.close()
-        return user
+        return UserService.login(username, password)
 
+    @cached_screen("user")
     def show_users(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="List of Employees", font=("Arial", 16)).pack(pady=10)
 
         # Create a Treeview widget to display employees
         columns = ("Username", "Role", "First Name", "Last Name", "Phone", "Email", "Employee ID", "Address")
-        tree = create_treeview(self.app.content_frame, columns)
-        employees = DatabaseUtility.execute_query(DATABASES["user"], "SELECT * FROM users", fetch=True)
-        for employee in employees:
-            tree.insert("", "end", values=employee)
-
+        tree = create_paged_treeview(
+            self.app.content_frame, columns, DATABASES["user"],
+            "SELECT username, role, first_name, last_name, phone, email, employee_id, address FROM users",
+            key="username", worker=self.app.db_worker,
+        )
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Add buttons below the employee list
@@ -286,6 +624,7 @@ class UserManager:
         tk.Button(button_frame, text="Delete Employee", command=self.show_delete_employee).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Edit Employee Details", command=self.show_edit_employee).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return tree.pager.reload
 
     def show_add_employee(self):
         self.app.clear_content_frame()
@@ -310,24 +649,30 @@ class UserManager:
             values = {field: entry.get() for field, entry in entries.items()}
             role = role_var.get()
             if all(values.values()) and role in ["Manager", "Employee"]:
-                try:
-                    conn = sqlite3.connect("user.db")
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO users (username, password, role, first_name, last_name, phone, email, employee_id, address)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (values["Username"], values["Password"], role, values["First Name"], values["Last Name"], values["Phone"], values["Email"], values["Employee ID"], values["Address"]))
-                    conn.commit()
+                def added(_):
+                    self.app.log_action(self.app.session.username, f"Added employee: {values['Username']}")
                     messagebox.showinfo("Success", "Employee added successfully!")
                     self.show_users()
-                except sqlite3.IntegrityError:
-                    messagebox.showerror("Error", "Username already exists!")
-                finally:
-                    conn.close()
+
+                def failed(error):
+                    if submit_button.winfo_exists():
+                        submit_button.config(state=tk.NORMAL)
+                    if isinstance(error, sqlite3.IntegrityError):
+                        messagebox.showerror("Error", "Username already exists!")
+                    else:
+                        show_db_error(error)
+
+                # Hashing the password takes about 0.1 s, so the save runs on the DbWorker
+                submit_button.config(state=tk.DISABLED)
+                self.app.db_worker.submit(
+                    lambda: UserService.add_user(values["Username"], values["Password"], role, values["First Name"], values["Last Name"], values["Phone"], values["Email"], values["Employee ID"], values["Address"]),
+                    added, failed, cancellable=False,
+                )
             else:
                 messagebox.showerror("Error", "All fields are required, and Role must be valid!")
 
-        tk.Button(self.app.content_frame, text="Submit", command=add_employee).pack(pady=10)
+        submit_button = tk.Button(self.app.content_frame, text="Submit", command=add_employee)
+        submit_button.pack(pady=10)
         tk.Button(self.app.content_frame, text="Back", command=self.show_users).pack(pady=5)
 
     def show_delete_employee(self):
@@ -341,16 +686,12 @@ class UserManager:
         def delete_employee():
             username = username_entry.get()
             if username:
-                conn = sqlite3.connect("user.db")
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-                if cursor.rowcount > 0:
-                    conn.commit()
+                if UserService.delete_user(username):
+                    self.app.log_action(self.app.session.username, f"Deleted employee: {username}")
                     messagebox.showinfo("Success", "Employee deleted successfully!")
                     self.show_users()
                 else:
                     messagebox.showerror("Error", "Username not found!")
-                conn.close()
             else:
                 messagebox.showerror("Error", "Username is required!")
 
@@ -377,25 +718,35 @@ class UserManager:
             username = username_entry.get()
             updates = {field: entry.get() for field, entry in entries.items()}
             if username and any(updates.values()):
-                conn = sqlite3.connect("user.db")
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-                if cursor.fetchone():
-                    cursor.execute("""
-                        UPDATE users
-                        SET password = ?, role = ?, first_name = ?, last_name = ?, phone = ?, email = ?, employee_id = ?, address = ?
-                        WHERE username = ?
-                    """, (updates["Password"], updates["Role"], updates["First Name"], updates["Last Name"], updates["Phone"], updates["Email"], updates["Employee ID"], updates["Address"], username))
-                    conn.commit()
-                    messagebox.showinfo("Success", "Employee details updated successfully!")
-                    self.show_users()
-                else:
+                def finished(updated):
+                    if updated:
+                        self.app.log_action(self.app.session.username, f"Updated employee: {username}")
+                        messagebox.showinfo("Success", "Employee details updated successfully!")
+                        self.show_users()
+                        return
+                    if update_button.winfo_exists():
+                        update_button.config(state=tk.NORMAL)
                     messagebox.showerror("Error", "Username not found!")
-                conn.close()
+
+                def failed(error):
+                    if update_button.winfo_exists():
+                        update_button.config(state=tk.NORMAL)
+                    show_db_error(error)
+
+                # A new password is hashed (about 0.1 s) on the DbWorker; an empty one keeps the stored hash
+                update_button.config(state=tk.DISABLED)
+                self.app.db_worker.submit(
+                    lambda: UserService.update_user(
+                        username, updates["Password"], updates["Role"], updates["First Name"], updates["Last Name"],
+                        updates["Phone"], updates["Email"], updates["Employee ID"], updates["Address"],
+                    ),
+                    finished, failed, cancellable=False,
+                )
             else:
                 messagebox.showerror("Error", "Username and at least one field are required!")
 
-        tk.Button(self.app.content_frame, text="Update", command=edit_employee).pack(pady=10)
+        update_button = tk.Button(self.app.content_frame, text="Update", command=edit_employee)
+        update_button.pack(pady=10)
         tk.Button(self.app.content_frame, text="Back", command=self.show_users).pack(pady=5)
 
 class VehicleManager:
@@ -415,7 +766,7 @@ class VehicleManager:
             self.vehicle_entries[field] = entry
 
         tk.Label(self.app.content_frame, text="Vehicle Type:").pack()
-        self.vehicle_type = ttk.Combobox(self.app.content_frame, values=["Car", "Truck", "SUV", "Van"])
+        self.vehicle_type = ttk.Combobox(self.app.content_frame, values=list(VEHICLE_CLASSES))
         self.vehicle_type.pack()
         self.vehicle_type.bind("<<ComboboxSelected>>", self.update_vehicle_class)
 
@@ -423,26 +774,11 @@ class VehicleManager:
         self.vehicle_class = ttk.Combobox(self.app.content_frame)
         self.vehicle_class.pack()
 
+        tk.Button(self.app.content_frame, text="Add Vehicle", command=self.add_vehicle).pack(pady=5)
+        tk.Button(self.app.content_frame, text="Back", command=self.show_manage_cars).pack(pady=5)
+
     def update_vehicle_class(self, event):
-        vehicle_type = self.vehicle_type.get()
-        if vehicle_type == "Car":
-            self.vehicle_class['values'] = [
-                "Compact Car", "Premium Car", "Sporty Car", "Hybrid Car", "Economy Car", "Convertible Car",
-                "Intermediate Car", "Luxury Car", "Full Size Car", "Standard Car", "Elite Car", "Electric Car"
-            ]
-        elif vehicle_type == "Truck":
-            self.vehicle_class['values'] = [
-                "Full Size Pickup", "Box Truck", "Small Pickup", "Refrigerated Truck"
-            ]
-        elif vehicle_type == "SUV":
-            self.vehicle_class['values'] = [
-                "Standard SUV", "Premium & Luxury SUV", "Electric SUV", "Intermediate SUV", "Compact SUV",
-                "Jeeps", "Full Size SUV", "Hybrid SUV"
-            ]
-        elif vehicle_type == "Van":
-            self.vehicle_class['values'] = [
-                "Cargo Van", "Passenger Van", "Refrigerated Van", "Minivan"
-            ]
+        self.vehicle_class['values'] = VEHICLE_CLASSES.get(self.vehicle_type.get(), [])
 
     def add_vehicle(self):
         brand = self.vehicle_entries["Car Brand"].get()
@@ -454,38 +790,31 @@ class VehicleManager:
         vehicle_type = self.vehicle_type.get()
         vehicle_class = self.vehicle_class.get()
         if brand and model and year and kilometers and rate_per_day and rate_per_km and vehicle_type and vehicle_class:
-            conn = sqlite3.connect("vehicle.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO vehicles (brand, model, year, kilometers, rate_per_day, rate_per_km, vehicle_type, vehicle_class)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (brand, model, year, kilometers, rate_per_day, rate_per_km, vehicle_type, vehicle_class))
-            conn.commit()
-            conn.close()
-            self.log_action(self.current_user[0], f"Added vehicle: {brand} {model} ({year})")
+            try:
+                VehicleService.add_vehicle(brand, model, year, kilometers, rate_per_day, rate_per_km, vehicle_type, vehicle_class)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            except Exception as e:
+                messagebox.showerror("Error", f"An error occurred: {e}")
+                return
+            self.app.log_action(self.app.session.username, f"Added vehicle: {brand} {model} ({year})")
             messagebox.showinfo("Success", "Vehicle added successfully!")
             self.app.show_main_menu()
         else:
             messagebox.showerror("Error", "All fields are required!")
 
+    @cached_screen("vehicle")
     def show_vehicles_inventory(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Vehicles Inventory", font=("Arial", 16)).pack(pady=10)
         # Create a Treeview widget to display vehicles
         columns = ("Car ID", "Brand", "Model", "Year", "Rate/Day", "Rate/KM")
-        tree = ttk.Treeview(self.app.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120)
-        # Fetch vehicles from the database
-        conn = sqlite3.connect("vehicle.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles")
-        vehicles = cursor.fetchall()
-        conn.close()
-
-        for vehicle in vehicles:
-            tree.insert("", "end", values=vehicle)
+        # Vehicles are loaded page by page from the database as the list is scrolled
+        tree = create_paged_treeview(
+            self.app.content_frame, columns, DATABASES["vehicle"],
+            "SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles",
+            key="car_id", worker=self.app.db_worker,
+        )
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Add buttons below the vehicle list
@@ -494,6 +823,7 @@ class VehicleManager:
 
         tk.Button(button_frame, text="Add Vehicle", command=self.show_add_vehicle).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return tree.pager.reload
 
     def show_delete_vehicle(self):
         self.app.clear_content_frame()
@@ -506,16 +836,12 @@ class VehicleManager:
         def delete_car():
             car_id = car_id_entry.get()
             if car_id:
-                conn = sqlite3.connect("vehicle.db")
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM vehicles WHERE car_id = ?", (car_id,))
-                if cursor.rowcount > 0:
-                    conn.commit()
+                if VehicleService.delete_vehicle(car_id):
+                    self.app.log_action(self.app.session.username, f"Deleted vehicle #{car_id}")
                     messagebox.showinfo("Success", "Car deleted successfully!")
                     self.show_manage_cars()
                 else:
                     messagebox.showerror("Error", "Car ID not found!")
-                conn.close()
             else:
                 messagebox.showerror("Error", "Car ID is required!")
 
@@ -538,52 +864,58 @@ class VehicleManager:
             entry.pack()
             update_entries[field] = entry
 
+        # Cars added before vehicle types and classes existed have neither until they are set here
+        tk.Label(self.app.content_frame, text="Vehicle Type:").pack()
+        type_box = ttk.Combobox(self.app.content_frame, values=list(VEHICLE_CLASSES), state="readonly")
+        type_box.pack()
+        tk.Label(self.app.content_frame, text="Vehicle Class:").pack()
+        class_box = ttk.Combobox(self.app.content_frame, state="readonly")
+        class_box.pack()
+
+        def type_selected(event):
+            class_box.set("")
+            class_box["values"] = VEHICLE_CLASSES.get(type_box.get(), [])
+
+        type_box.bind("<<ComboboxSelected>>", type_selected)
+
         def update_car():
             car_id = car_id_entry.get()
             updates = {field: entry.get() for field, entry in update_entries.items()}
-            if car_id and all(updates.values()):
-                conn = sqlite3.connect("vehicle.db")
-                cursor = conn.cursor()
+            vehicle_type, vehicle_class = type_box.get(), class_box.get()
+            if car_id and all(updates.values()) and vehicle_type and vehicle_class:
                 try:
-                    cursor.execute("""
-                        UPDATE vehicles
-                        SET brand = ?, model = ?, year = ?, rate_per_day = ?, rate_per_km = ?
-                        WHERE car_id = ?
-                    """, (updates["Brand"], updates["Model"], updates["Year"], updates["Rate Per Day"], updates["Rate Per KM"], car_id))
-                    if cursor.rowcount > 0:
-                        conn.commit()
+                    updated = VehicleService.update_vehicle(
+                        car_id, updates["Brand"], updates["Model"], updates["Year"], updates["Rate Per Day"], updates["Rate Per KM"],
+                        vehicle_type, vehicle_class,
+                    )
+                    if updated:
+                        PricingService.invalidate()  # quotes memoized with the old rates and classes
+                        self.app.log_action(self.app.session.username, f"Updated vehicle #{car_id}")
                         messagebox.showinfo("Success", "Car details updated successfully!")
                         self.show_manage_cars()
                     else:
                         messagebox.showerror("Error", "Car ID not found!")
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
                 except Exception as e:
                     messagebox.showerror("Error", f"An error occurred: {e}")
-                finally:
-                    conn.close()
             else:
                 messagebox.showerror("Error", "All fields are required!")
 
         tk.Button(self.app.content_frame, text="Update", command=update_car).pack(pady=5)
         tk.Button(self.app.content_frame, text="Back", command=self.show_manage_cars).pack(pady=5)
 
+    @cached_screen("vehicle")
     def show_manage_cars(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Manage Cars", font=("Arial", 20)).pack(pady=10)
         # Create a Treeview widget to display cars
         columns = ("Car ID", "Brand", "Model", "Year", "Rate/Day", "Rate/KM")
-        tree = ttk.Treeview(self.app.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120)
-        # Fetch car data from the database
-        conn = sqlite3.connect("vehicle.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles")
-        cars = cursor.fetchall()
-        conn.close()
-
-        for car in cars:
-            tree.insert("", "end", values=car)
+        # Car data is loaded page by page in the background
+        tree = create_paged_treeview(
+            self.app.content_frame, columns, DATABASES["vehicle"],
+            "SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles",
+            key="car_id", worker=self.app.db_worker,
+        )
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Add buttons for car management
@@ -591,12 +923,15 @@ class VehicleManager:
         button_frame.pack(pady=10)
 
         tk.Button(button_frame, text="Add New Car", command=self.show_add_vehicle).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Import CSV", command=lambda: run_csv_import(
+            self.app, "vehicles", CsvImporter.import_vehicles, self.show_manage_cars)).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Remove Car", command=self.show_delete_vehicle).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Update Pricing", command=self.show_update_vehicle).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return tree.pager.reload
 
+    @cached_screen("vehicle", "reservations")
     def show_available_cars(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Available Cars", font=("Arial", 16)).pack(pady=10)
 
         # Create a Treeview widget to display available cars
@@ -606,22 +941,15 @@ class VehicleManager:
             tree.heading(col, text=col)
             tree.column(col, width=120)
 
-        # Fetch available cars from the vehicle.db
-        conn = sqlite3.connect(DATABASES["vehicle"])
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT car_id, brand, model, year, rate_per_day, rate_per_km
-            FROM vehicles
-            WHERE status = 'Available'
-        """)
-        available_cars = cursor.fetchall()
-        conn.close()
-
-        # Add available cars to the Treeview
-        for car in available_cars:
-            tree.insert("", "end", values=car)
-
+        # Fetch cars that have no active reservation for today in the background
+        rows = TreeRows(tree)
         tree.pack(fill=tk.BOTH, expand=True)
+        frame = self.app.content_frame
+
+        def refresh():
+            self.app.db_worker.submit(self.app.vehicles.available_cars, rows.sync, loading=frame)
+
+        refresh()
 
         # Function to book a selected car
         def book_car():
@@ -651,35 +979,29 @@ class VehicleManager:
                     end_date = end_date_entry.get()
 
                     if customer_name and start_date and end_date:
-                        try:
-                            # Update the vehicle status and add a reservation entry
-                            conn = sqlite3.connect(DATABASES["vehicle"])
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                UPDATE vehicles
-                                SET status = 'Booked'
-                                WHERE car_id = ?
-                            """, (car_id,))
-                            conn.commit()
-
-                            # Add reservation details to the reservations table
-                            conn = sqlite3.connect(DATABASES["reservations"])
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                INSERT INTO reservations (customer_name, car_id, start_date, end_date, status)
-                                VALUES (?, ?, ?, ?, 'Booked')
-                            """, (customer_name, car_id, start_date, end_date))
-                            conn.commit()
-                            conn.close()
-
+                        def booked(reservation_id):
+                            self.app.log_action(self.app.session.username, f"Booked car #{car_id} for {customer_name}")
                             messagebox.showinfo("Success", f"Car with ID {car_id} has been booked successfully!")
                             booking_window.destroy()
-                            self.show_available_cars()  # Refresh the available cars list
-                        except Exception as e:
-                            messagebox.showerror("Error", f"An error occurred: {e}")
+                            if tree.winfo_exists():
+                                rows.remove(car_id)  # the booked car is no longer available
+
+                        def failed(e):
+                            if isinstance(e, (BookingConflict, ValueError)):
+                                messagebox.showerror("Error", str(e))
+                            else:
+                                show_db_error(e)
+
+                        # Update the vehicle status and add a reservation entry in one transaction
+                        self.app.db_worker.submit(
+                            lambda: self.app.reservations.book(car_id, customer_name, start_date, end_date),
+                            booked, failed, cancellable=False,
+                        )
                     else:
                         messagebox.showerror("Error", "All fields are required!")
 
+                tk.Button(booking_window, text="Get Quote", command=lambda: show_quote(
+                    self.app, car_id, start_date_entry.get(), end_date_entry.get())).pack(pady=5)
                 tk.Button(booking_window, text="Confirm Booking", command=confirm_booking).pack(pady=10)
                 tk.Button(booking_window, text="Cancel", command=booking_window.destroy).pack(pady=5)
             else:
@@ -690,10 +1012,13 @@ class VehicleManager:
         button_frame.pack(pady=10)
 
         tk.Button(button_frame, text="Book Car", command=book_car).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Search by Dates", command=lambda: self.show_availability_search(
+            self.show_available_cars)).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_reservations).pack(side=tk.LEFT, padx=5)
+        return refresh
 
+    @cached_screen("vehicle", "reservations")
     def show_available_cars_manager(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Available Cars", font=("Arial", 16)).pack(pady=10)
 
         # Create a Treeview widget to display available cars
@@ -703,22 +1028,15 @@ class VehicleManager:
             tree.heading(col, text=col)
             tree.column(col, width=120)
 
-        # Fetch available cars from the vehicle.db
-        conn = sqlite3.connect(DATABASES["vehicle"])
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT car_id, brand, model, year, rate_per_day, rate_per_km
-            FROM vehicles
-            WHERE status = 'Available'
-        """)
-        available_cars = cursor.fetchall()
-        conn.close()
-
-        # Add available cars to the Treeview
-        for car in available_cars:
-            tree.insert("", "end", values=car)
-
+        # Fetch cars that have no active reservation for today in the background
+        rows = TreeRows(tree)
         tree.pack(fill=tk.BOTH, expand=True)
+        frame = self.app.content_frame
+
+        def refresh():
+            self.app.db_worker.submit(self.app.vehicles.available_cars, rows.sync, loading=frame)
+
+        refresh()
 
         # Function to book a selected car
         def book_car():
@@ -756,35 +1074,29 @@ class VehicleManager:
                     end_date = end_date_entry.get()
 
                     if customer_name and start_date and end_date:
-                        try:
-                            # Update the vehicle status and add a reservation entry
-                            conn = sqlite3.connect(DATABASES["vehicle"])
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                UPDATE vehicles
-                                SET status = 'Booked'
-                                WHERE car_id = ?
-                            """, (car_details[0],))
-                            conn.commit()
-
-                            # Add reservation details to the reservations table
-                            conn = sqlite3.connect(DATABASES["reservations"])
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                INSERT INTO reservations (customer_name, car_id, start_date, end_date, status)
-                                VALUES (?, ?, ?, ?, 'Booked')
-                            """, (customer_name, car_details[0], start_date, end_date))
-                            conn.commit()
-                            conn.close()
-
+                        def booked(reservation_id):
+                            self.app.log_action(self.app.session.username, f"Booked car #{car_details[0]} for {customer_name}")
                             messagebox.showinfo("Success", f"Car with ID {car_details[0]} has been booked successfully!")
                             booking_window.destroy()
-                            self.show_available_cars_manager()  # Refresh the available cars list
-                        except Exception as e:
-                            messagebox.showerror("Error", f"An error occurred: {e}")
+                            if tree.winfo_exists():
+                                rows.remove(car_details[0])  # the booked car is no longer available
+
+                        def failed(e):
+                            if isinstance(e, (BookingConflict, ValueError)):
+                                messagebox.showerror("Error", str(e))
+                            else:
+                                show_db_error(e)
+
+                        # Update the vehicle status and add a reservation entry in one transaction
+                        self.app.db_worker.submit(
+                            lambda: self.app.reservations.book(car_details[0], customer_name, start_date, end_date),
+                            booked, failed, cancellable=False,
+                        )
                     else:
                         messagebox.showerror("Error", "All fields are required!")
 
+                tk.Button(booking_window, text="Get Quote", command=lambda: show_quote(
+                    self.app, car_details[0], start_date_entry.get(), end_date_entry.get())).pack(pady=5)
                 tk.Button(booking_window, text="Confirm Booking", command=confirm_booking).pack(pady=10)
                 tk.Button(booking_window, text="Cancel", command=booking_window.destroy).pack(pady=5)
             else:
@@ -795,28 +1107,132 @@ class VehicleManager:
         button_frame.pack(pady=10)
 
         tk.Button(button_frame, text="Book Car", command=book_car).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Search by Dates", command=lambda: self.show_availability_search(
+            self.show_available_cars_manager)).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return refresh
+
+    def show_availability_search(self, back):
+        self.app.clear_content_frame()
+        tk.Label(self.app.content_frame, text="Search Available Cars", font=("Arial", 16)).pack(pady=10)
+
+        # Search filters, laid out in one row
+        filter_frame = tk.Frame(self.app.content_frame)
+        filter_frame.pack(pady=5)
+        entries = {}
+        for column, field in enumerate(["Start Date (YYYY-MM-DD)", "End Date (YYYY-MM-DD)", "Max Price", "Min Year"]):
+            tk.Label(filter_frame, text=f"{field}:").grid(row=0, column=column, padx=5)
+            entry = tk.Entry(filter_frame, width=14)
+            entry.grid(row=1, column=column, padx=5)
+            entries[field] = entry
+        tk.Label(filter_frame, text="Vehicle Type:").grid(row=0, column=4, padx=5)
+        type_box = ttk.Combobox(filter_frame, values=["Any", *VEHICLE_CLASSES], state="readonly", width=12)
+        type_box.current(0)
+        type_box.grid(row=1, column=4, padx=5)
+        tk.Label(filter_frame, text="Vehicle Class:").grid(row=0, column=5, padx=5)
+        class_box = ttk.Combobox(filter_frame, values=["Any"], state="readonly", width=20)
+        class_box.current(0)
+        class_box.grid(row=1, column=5, padx=5)
+
+        def update_classes(event):
+            class_box["values"] = ["Any", *VEHICLE_CLASSES.get(type_box.get(), [])]
+            class_box.current(0)
+
+        type_box.bind("<<ComboboxSelected>>", update_classes)
+
+        # Results: cars free for the whole period, cheapest quote first
+        columns = ("Car ID", "Brand", "Model", "Year", "Class", "Rate/Day", "Rate/KM", "Quote")
+        tree = create_treeview(self.app.content_frame, columns, column_width=100)
+        rows = TreeRows(tree)
+        tree.pack(fill=tk.BOTH, expand=True)
+        status = tk.Label(self.app.content_frame, text="")
+        status.pack()
+        searched = {}  # the period the results are for
+
+        def search():
+            start_date = entries["Start Date (YYYY-MM-DD)"].get()
+            end_date = entries["End Date (YYYY-MM-DD)"].get()
+            if not start_date or not end_date:
+                messagebox.showerror("Error", "Start and end dates are required!")
+                return
+            try:
+                max_price = float(entries["Max Price"].get()) if entries["Max Price"].get() else None
+                min_year = int(entries["Min Year"].get()) if entries["Min Year"].get() else None
+            except ValueError:
+                messagebox.showerror("Error", "Max price and min year must be numbers!")
+                return
+            vehicle_type = None if type_box.get() == "Any" else type_box.get()
+            vehicle_class = None if class_box.get() == "Any" else class_box.get()
+
+            def show_results(cars):
+                searched.update(start=start_date, end=end_date)
+                rows.sync([(*car[:7], f"${car[7]:,.2f}") for car in cars])
+                status.config(text=f"{len(cars)} car(s) free from {start_date} to {end_date}")
+
+            def failed(e):
+                if isinstance(e, ValueError):
+                    messagebox.showerror("Error", str(e))
+                else:
+                    show_db_error(e)
+
+            self.app.db_worker.submit(
+                lambda: self.app.vehicles.search_available(
+                    start_date, end_date, vehicle_type, vehicle_class, max_price, min_year),
+                show_results, failed, loading=self.app.content_frame,
+            )
+
+        def reserve_car():
+            selected_item = tree.selection()
+            customer_name = customer_entry.get()
+            if not selected_item or not customer_name:
+                messagebox.showerror("Error", "Select a car and enter the customer name.")
+                return
+            car_id = tree.item(selected_item, "values")[0]
+            start_date, end_date = searched["start"], searched["end"]
+
+            def reserved(reservation_id):
+                self.app.log_action(self.app.session.username, f"Added reservation #{reservation_id} for car #{car_id}")
+                messagebox.showinfo("Success", f"Car with ID {car_id} is reserved from {start_date} to {end_date}.")
+                if tree.winfo_exists():
+                    rows.remove(car_id)  # no longer free for this period
+
+            def failed(e):
+                if isinstance(e, (BookingConflict, ValueError)):
+                    messagebox.showerror("Error", str(e))
+                else:
+                    show_db_error(e)
+
+            self.app.db_worker.submit(
+                lambda: self.app.reservations.reserve(int(car_id), customer_name, start_date, end_date, "Upcoming"),
+                reserved, failed, cancellable=False,
+            )
+
+        button_frame = tk.Frame(self.app.content_frame)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Search", command=search).pack(side=tk.LEFT, padx=5)
+        tk.Label(button_frame, text="Customer Name:").pack(side=tk.LEFT, padx=5)
+        customer_entry = tk.Entry(button_frame)
+        customer_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Reserve", command=reserve_car).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Back", command=back).pack(side=tk.LEFT, padx=5)
 
 class CustomerManager:
     """Manages customer-related operations."""
     def __init__(self, app):
         self.app = app
 
+    @cached_screen("customer")
     def show_customers(self):
-        self.app.clear_content_frame()
         tk.Label(self.app.content_frame, text="Customer List", font=("Arial", 16)).pack(pady=10)
 
         # Create a Treeview widget to display customers
         columns = ("Name", "Address", "Phone Number", "License Number", "Insurance Company", "Policy Number")
-        tree = ttk.Treeview(self.app.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=150)
-
-        # Fetch customer data from the database
-        customers = DatabaseUtility.execute_query(DATABASES["customer"], "SELECT * FROM customers", fetch=True)
-        for customer in customers:
-            tree.insert("", "end", values=customer)
+        # Customers are loaded page by page from the database as the list is scrolled
+        tree = create_paged_treeview(
+            self.app.content_frame, columns, DATABASES["customer"], None,
+            key="name", column_width=150, worker=self.app.db_worker, fetch=self.app.customers.list_customers,
+        )
+        refresh = create_search_bar(self.app.content_frame, tree, self.app.customers.search_customers, self.app.db_worker)
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Add buttons below the customer list
@@ -824,8 +1240,11 @@ class CustomerManager:
         button_frame.pack(pady=10)
 
         tk.Button(button_frame, text="Add Customer", command=self.show_add_customer).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Import CSV", command=lambda: run_csv_import(
+            self.app, "customers", CsvImporter.import_customers, self.show_customers)).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Delete Customer", command=self.show_delete_customer).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.app.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return refresh
 
     def show_add_customer(self):
         self.app.clear_content_frame()
@@ -848,19 +1267,12 @@ class CustomerManager:
             policy_number = self.customer_entries["Policy Number"].get()
             if name and address and phone and license_number and insurance_company and policy_number:
                 try:
-                    conn = sqlite3.connect("customer.db")
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO customers (name, address, phone, license_number, insurance_company, policy_number)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (name, address, phone, license_number, insurance_company, policy_number))
-                    conn.commit()
+                    CustomerService.add_customer(name, address, phone, license_number, insurance_company, policy_number)
+                    self.app.log_action(self.app.session.username, f"Added a new customer: {name}")
                     messagebox.showinfo("Success", "Customer added successfully!")
                     self.show_customers()
                 except sqlite3.IntegrityError:
                     messagebox.showerror("Error", "Customer with this name already exists!")
-                finally:
-                    conn.close()
             else:
                 messagebox.showerror("Error", "All fields are required!")
 
@@ -879,7 +1291,8 @@ class CustomerManager:
             name = name_entry.get()
             if name:
                 try:
-                    DatabaseUtility.execute_query(DATABASES["customer"], "DELETE FROM customers WHERE name = ?", (name,))
+                    CustomerService.delete_customer(name)
+                    self.app.log_action(self.app.session.username, f"Deleted customer: {name}")
                     messagebox.showinfo("Success", "Customer deleted successfully!")
                     self.show_customers()
                 except Exception as e:
@@ -892,10 +1305,24 @@ class CustomerManager:
 
 class CarRentalApp:
     """Main application class."""
-    def __init__(self, root):
+    def __init__(self, root, api_url=None):
         self.root = root
         self.root.title("Car Rental System")
-        self.current_user = None
+        self.session = None  # auth.Session of the signed-in employee, set once the password is verified
+        self.audit = AuditLogger()
+        self.export_job = None
+        self.db_worker = DbWorker(root)
+        if not api_url:  # a thin client leaves this maintenance to the API service that owns the files
+            # Move audit log months older than the retention window into the archive
+            self.db_worker.submit(LogStore.archive, cancellable=False)
+            # Hash any passwords still stored in plaintext
+            self.db_worker.submit(Authenticator.migrate_passwords, cancellable=False)
+
+        # Availability, booking, reservation and customer listing go through the local API service when one is given
+        if api_url:
+            self.vehicles = self.reservations = self.customers = ApiClient(api_url)
+        else:
+            self.vehicles, self.reservations, self.customers = VehicleService, ReservationService, CustomerService
 
         # Initialize managers
         self.user_manager = UserManager(self)
@@ -912,7 +1339,8 @@ class CarRentalApp:
         tk.Label(self.login_frame, text="Password:").grid(row=1, column=0)
         self.password_entry = tk.Entry(self.login_frame, show="*")
         self.password_entry.grid(row=1, column=1)
-        tk.Button(self.login_frame, text="Login", command=self.login).grid(row=2, column=1, pady=10)
+        self.login_button = tk.Button(self.login_frame, text="Login", command=self.login)
+        self.login_button.grid(row=2, column=1, pady=10)
 
         # Main Menu Frame (initially hidden)
         self.main_menu_frame = tk.Frame(self.root)
@@ -926,43 +1354,56 @@ class CarRentalApp:
         separator = ttk.Separator(self.main_menu_frame, orient="vertical")
         separator.pack(side=tk.LEFT, fill=tk.Y)
 
-        # Content Frame (for dynamic content on the right)
-        self.content_frame = tk.Frame(self.main_menu_frame)
-        self.content_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, pady=20, padx=20)
+        # Content area (for dynamic content on the right); each screen gets its own frame inside it
+        self.content_area = tk.Frame(self.main_menu_frame)
+        self.content_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, pady=20, padx=20)
+        self.screens = ScreenRegistry(self.content_area, self.db_worker)
+
+    @property
+    def content_frame(self):
+        """Frame of the screen being shown or built."""
+        return self.screens.frame
 
     def login(self):
+        """Verify the credentials on the DbWorker; password hashing is too slow for the Tk thread."""
         username = self.username_entry.get()
         password = self.password_entry.get()
-        user = self.user_manager.login(username, password)
-        if user:
-            self.current_user = user
-            self.login_frame.pack_forget()
-            self.show_main_menu()
-        else:
-            messagebox.showerror("Login Failed", "Invalid username or password")
+        self.login_button.config(text="Signing in...", state=tk.DISABLED)
+
+        def finish(session):
+            self.login_button.config(text="Login", state=tk.NORMAL)
+            if session:
+                self.session = session
+                self.password_entry.delete(0, tk.END)
+                self.login_frame.pack_forget()
+                self.show_main_menu()
+            else:
+                messagebox.showerror("Login Failed", "Invalid username or password")
+
+        def failed(error):
+            self.login_button.config(text="Login", state=tk.NORMAL)
+            show_db_error(error)
+
+        self.db_worker.submit(lambda: self.user_manager.login(username, password), finish, failed, cancellable=False)
 
     def clear_content_frame(self):
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        """Start a form screen in a fresh frame; list screens use ``@cached_screen`` instead."""
+        self.screens.open_transient()
 
     def show_main_menu(self):
-        self.clear_content_frame()
         self.dashboard.show_dashboard()  # Show the Dashboard as the first page
 
         # Clear existing widgets in the side menu
         for widget in self.side_menu_frame.winfo_children():
             widget.destroy()
 
-        # Get the user's role
-        role = self.current_user[2]  # Assuming the role is the third column in the `users` table
-
-        # Add buttons to the side menu based on the role
+        # Add buttons to the side menu based on the role cached in the session
         tk.Button(self.side_menu_frame, text="Dashboard", command=self.dashboard.show_dashboard).pack(pady=5, fill=tk.X)
         tk.Button(self.side_menu_frame, text="Notifications", command=self.show_notifications).pack(pady=5, fill=tk.X)
         tk.Button(self.side_menu_frame, text="Car Reservation", command=self.show_reservations).pack(pady=5, fill=tk.X)
         tk.Button(self.side_menu_frame, text="Customer Feedback", command=self.show_customer_feedback).pack(pady=5, fill=tk.X)
 
-        if role == "Manager":
+        if self.session.is_manager:
             tk.Button(self.side_menu_frame, text="Available Cars", command=self.vehicle_manager.show_available_cars_manager).pack(pady=5, fill=tk.X)  # New Button
             tk.Button(self.side_menu_frame, text="Manage Cars", command=self.vehicle_manager.show_manage_cars).pack(pady=5, fill=tk.X)
             tk.Button(self.side_menu_frame, text="Manage Employees", command=self.user_manager.show_users).pack(pady=5, fill=tk.X)
@@ -970,13 +1411,11 @@ class CarRentalApp:
             tk.Button(self.side_menu_frame, text="Financial Reports", command=self.show_financial_reports).pack(pady=5, fill=tk.X)
             tk.Button(self.side_menu_frame, text="Settings", command=self.show_settings).pack(pady=5, fill=tk.X)
             tk.Button(self.side_menu_frame, text="Logs", command=self.show_logs).pack(pady=5, fill=tk.X)
+            tk.Button(self.side_menu_frame, text="Export Data", command=self.show_export).pack(pady=5, fill=tk.X)
             tk.Button(self.side_menu_frame, text="Reports and Analytics", command=self.show_reports_and_analytics).pack(pady=5, fill=tk.X)
 
-        # Add a welcome message in the content frame
-        tk.Label(self.content_frame, text=f"Welcome, {self.current_user[0]}!", font=("Arial", 16)).pack(pady=10)
-
+    @cached_screen()
     def show_notifications(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Notifications", font=("Arial", 20)).pack(pady=10)
 
         # Create a Treeview widget to display notifications
@@ -1020,29 +1459,19 @@ class CarRentalApp:
 
         tk.Button(button_frame, text="Delete", command=delete_notification).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return None
 
+    @cached_screen("reservations")
     def show_reservations(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Car Reservations", font=("Arial", 20)).pack(pady=10)
 
         # Create a Treeview widget to display reservations
         columns = ("Reservation ID", "Customer Name", "Car ID", "Start Date", "End Date", "Status")
-        tree = ttk.Treeview(self.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120)
-
-        # Fetch reservations from the database
-        conn = sqlite3.connect(DATABASES["reservations"])
-        cursor = conn.cursor()
-        cursor.execute("SELECT reservation_id, customer_name, car_id, start_date, end_date, status FROM reservations")
-        reservations = cursor.fetchall()
-        conn.close()
-
-        # Add reservations to the Treeview
-        for reservation in reservations:
-            tree.insert("", "end", values=reservation)
-
+        # Reservations are loaded page by page from the database as the list is scrolled
+        tree = create_paged_treeview(
+            self.content_frame, columns, DATABASES["reservations"], None,
+            key="reservation_id", worker=self.db_worker, fetch=self.reservations.list_reservations,
+        )
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Function to update reservation status
@@ -1053,33 +1482,19 @@ class CarRentalApp:
                 car_id = tree.item(selected_item, "values")[2]  # Get the Car ID
                 new_status = status_var.get()  # Get the new status from the dropdown
 
-                if new_status in ["Completed", "Cancelled", "No Show"]:
-                    try:
-                        # Update the reservation status
-                        conn = sqlite3.connect(DATABASES["reservations"])
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE reservations
-                            SET status = ?
-                            WHERE reservation_id = ?
-                        """, (new_status, reservation_id))
-                        conn.commit()
-
-                        # Move the car back to "Available" in the vehicles table
-                        conn = sqlite3.connect(DATABASES["vehicle"])
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE vehicles
-                            SET status = 'Available'
-                            WHERE car_id = ?
-                        """, (car_id,))
-                        conn.commit()
-                        conn.close()
-
+                if new_status in RELEASE_STATUSES:
+                    def updated(row):
+                        self.log_action(self.session.username, f"Updated reservation #{reservation_id} to {new_status}")
                         messagebox.showinfo("Success", f"Reservation status updated to '{new_status}', and car ID {car_id} is now available.")
-                        self.show_reservations()  # Refresh the reservations list
-                    except Exception as e:
-                        messagebox.showerror("Error", f"An error occurred: {e}")
+                        if row is not None and tree.winfo_exists():
+                            tree.pager.upsert(row)  # redraw just the edited reservation
+
+                    def update_and_reload():
+                        # Update the reservation status and move the car back to "Available" together
+                        self.reservations.update_status(reservation_id, new_status)
+                        return self.reservations.get_reservation(reservation_id)
+
+                    self.db_worker.submit(update_and_reload, updated, cancellable=False)
                 else:
                     messagebox.showerror("Error", "Only 'Completed', 'Cancelled', or 'No Show' statuses can move the car back to available.")
             else:
@@ -1101,6 +1516,7 @@ class CarRentalApp:
 
         tk.Button(button_frame, text="Update Status", command=update_status).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return tree.pager.reload
 
     def show_new_reservation(self):
         self.clear_content_frame()
@@ -1137,19 +1553,22 @@ class CarRentalApp:
             end_date = entries["End Date (YYYY-MM-DD)"].get()
             status = status_var.get()
             if customer_name and car_id and start_date and end_date and status:
-                try:
-                    conn = sqlite3.connect("reservations.db")
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO reservations (customer_name, car_id, start_date, end_date, status)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (customer_name, car_id, start_date, end_date, status))
-                    conn.commit()
-                    conn.close()
+                def reserved(reservation_id):
+                    self.log_action(self.session.username, f"Added reservation #{reservation_id} for car #{car_id}")
                     messagebox.showinfo("Success", "Reservation added successfully!")
                     self.show_reservations()  # Redirect to the Car Reservations page
-                except Exception as e:
-                    messagebox.showerror("Error", f"An error occurred: {e}")
+
+                def failed(e):
+                    if isinstance(e, (BookingConflict, ValueError)):
+                        messagebox.showerror("Error", str(e))
+                    else:
+                        show_db_error(e)
+
+                # Reserving can be an HTTP round trip to the API service, so it runs on the DbWorker
+                self.db_worker.submit(
+                    lambda: self.reservations.reserve(int(car_id), customer_name, start_date, end_date, status),
+                    reserved, failed, cancellable=False,
+                )
             else:
                 messagebox.showerror("Error", "All fields are required!")
 
@@ -1188,58 +1607,54 @@ class CarRentalApp:
 
         tree.pack(fill=tk.BOTH, expand=True)
 
+    @cached_screen("reservations", "vehicle")
     def show_financial_reports(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Financial Reports", font=("Arial", 20)).pack(pady=10)
 
         # Create a Treeview widget to display financial summaries
-        columns = ("Report ID", "Month", "Total Revenue", "Expenses", "Profit")
+        columns = ("Report ID", "Month", "Total Revenue", "Bookings", "Rental Days")
         tree = ttk.Treeview(self.content_frame, columns=columns, show="headings")
         for col in columns:
             tree.heading(col, text=col)
             tree.column(col, width=150)
 
-        # Dummy financial reports data
-        financial_reports = [
-            (1, "January 2025", "$10,000", "$4,000", "$6,000"),
-            (2, "February 2025", "$12,000", "$5,000", "$7,000"),
-            (3, "March 2025", "$15,000", "$6,000", "$9,000"),
-            (4, "April 2025", "$8,000", "$3,000", "$5,000"),
-            (5, "May 2025", "$20,000", "$7,000", "$13,000"),
-        ]
+        # Monthly revenue computed from reservations and vehicle rates
+        rows = TreeRows(tree)
+
+        def fill_tree(financial_reports):
+            rows.sync([
+                (report_id, month, f"${revenue:,.2f}", f"{bookings:,}", f"{rental_days:,}")
+                for report_id, (month, revenue, bookings, rental_days) in enumerate(financial_reports, start=1)
+            ])
 
-        # Add financial reports to the Treeview
-        for report in financial_reports:
-            tree.insert("", "end", values=report)
         tree.pack(fill=tk.BOTH, expand=True)
+        frame = self.content_frame
+
+        def refresh():
+            self.db_worker.submit(ReportingService.monthly_summary, fill_tree, loading=frame)
+
+        refresh()
 
         # Add a Back button
         tk.Button(self.content_frame, text="Back", command=self.show_main_menu).pack(pady=10)
+        return refresh
 
+    @cached_screen("customer")
     def show_customer_feedback(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Customer Feedback", font=("Arial", 20)).pack(pady=10)
 
-        # Create a Treeview widget to display feedback
-        columns = ("Customer Name", "Rating", "Comment", "Date")
-        tree = ttk.Treeview(self.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=150)
-
-        # Fetch feedback data from the database
-        conn = sqlite3.connect("customer.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT customer_name, rating, comment, date FROM feedback")
-        feedbacks = cursor.fetchall()
-        conn.close()
-
-        for feedback in feedbacks:
-            tree.insert("", "end", values=feedback)
+        # Create a Treeview widget to display feedback, loaded page by page in the background
+        columns = ("Feedback ID", "Customer Name", "Rating", "Comment", "Date")
+        tree = create_paged_treeview(
+            self.content_frame, columns, DATABASES["customer"], None,
+            key="feedback_id", column_width=150, worker=self.db_worker, fetch=CustomerService.list_feedback,
+        )
+        refresh = create_search_bar(self.content_frame, tree, CustomerService.search_feedback, self.db_worker)
         tree.pack(fill=tk.BOTH, expand=True)
 
         # Add a Back button
         tk.Button(self.content_frame, text="Back", command=self.show_main_menu).pack(pady=10)
+        return refresh
 
     def show_settings(self):
         self.clear_content_frame()
@@ -1269,6 +1684,13 @@ class CarRentalApp:
         sms_notifications_var = tk.BooleanVar()
         tk.Checkbutton(self.content_frame, variable=sms_notifications_var).pack()
 
+        # Section for Audit Log Retention
+        tk.Label(self.content_frame, text="Audit Log", font=("Arial", 16)).pack(pady=5)
+        tk.Label(self.content_frame, text="Months Kept Before Archiving:").pack()
+        retention_entry = tk.Entry(self.content_frame)
+        retention_entry.insert(0, str(LogStore.retention_months()))
+        retention_entry.pack()
+
         # Save Settings Functionality
         def save_settings():
             payment_gateway = payment_gateway_entry.get()
@@ -1276,64 +1698,72 @@ class CarRentalApp:
             closing_time = closing_time_entry.get()
             email_notifications = email_notifications_var.get()
             sms_notifications = sms_notifications_var.get()
+            log_retention_months = retention_entry.get().strip()
+            if not (log_retention_months.isdigit() and int(log_retention_months) >= 1):
+                messagebox.showerror("Error", "Months kept before archiving must be a whole number of at least 1.")
+                return
+
+            # Update settings in a single transaction
+            with ConnectionManager.transaction(DATABASES["settings"]) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS settings (
+                        setting_name TEXT PRIMARY KEY,
+                        setting_value TEXT NOT NULL
+                    )
+                """)
+
+                # Update settings in the database
+                settings_to_update = [
+                    ("payment_gateway", payment_gateway),
+                    ("opening_time", opening_time),
+                    ("closing_time", closing_time),
+                    ("email_notifications", str(email_notifications)),
+                    ("sms_notifications", str(sms_notifications)),
+                    ("log_retention_months", log_retention_months),
+                ]
+
+                for setting_name, setting_value in settings_to_update:
+                    if setting_value:  # Only update non-empty values
+                        conn.execute("INSERT OR REPLACE INTO settings (setting_name, setting_value) VALUES (?, ?)", (setting_name, setting_value))
 
-            # Open the database connection
-            conn = sqlite3.connect("settings.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    setting_name TEXT PRIMARY KEY,
-                    setting_value TEXT NOT NULL
-                )
-            """)
-
-            # Update settings in the database
-            settings_to_update = [
-                ("payment_gateway", payment_gateway),
-                ("opening_time", opening_time),
-                ("closing_time", closing_time),
-                ("email_notifications", str(email_notifications)),
-                ("sms_notifications", str(sms_notifications)),
-            ]
-
-            for setting_name, setting_value in settings_to_update:
-                if setting_value:  # Only update non-empty values
-                    cursor.execute("INSERT OR REPLACE INTO settings (setting_name, setting_value) VALUES (?, ?)", (setting_name, setting_value))
-
-            conn.commit()
-            conn.close()
             messagebox.showinfo("Success", "Settings saved successfully!")
+            self.db_worker.submit(LogStore.archive, cancellable=False)  # apply a shorter retention right away
 
         tk.Button(self.content_frame, text="Save Settings", command=save_settings).pack(pady=10)
         tk.Button(self.content_frame, text="Back", command=self.show_main_menu).pack(pady=10)
 
+    @cached_screen("logs")
     def show_logs(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Logs", font=("Arial", 20)).pack(pady=10)
 
         # Create a Treeview widget to display logs
         columns = ("Log ID", "User", "Action", "Timestamp")
-        tree = ttk.Treeview(self.content_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=150)
-
-        # Fetch logs from the database
-        conn = sqlite3.connect("logs.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT log_id, user, action, timestamp FROM logs")
-        logs = cursor.fetchall()
-        conn.close()
-
-        for log in logs:
-            tree.insert("", "end", values=log)
+        # Logs are loaded page by page from the database as the list is scrolled
+        tree = create_paged_treeview(
+            self.content_frame, columns, DATABASES["logs"], None,
+            key="log_id", column_width=150, worker=self.db_worker, fetch=self._list_logs,
+        )
+        search = create_search_bar(self.content_frame, tree, self._search_logs, self.db_worker)
         tree.pack(fill=tk.BOTH, expand=True)
 
+        def refresh():
+            search()
+
         # Add a Back button
         tk.Button(self.content_frame, text="Back", command=self.show_main_menu).pack(pady=10)
+        return refresh
+
+    # Run on the DbWorker: flushing waits for the write-behind queue, so it stays off the Tk thread
+    def _list_logs(self, after=None, before=None, limit=PAGE_SIZE):
+        self.audit.flush()  # include actions still waiting in the write-behind queue
+        return LogService.list_logs(after=after, before=before, limit=limit)
 
+    def _search_logs(self, text):
+        self.audit.flush()
+        return LogService.search_logs(text)
+
+    @cached_screen("reservations", "vehicle")
     def show_reports_and_analytics(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Reports and Analytics", font=("Arial", 20)).pack(pady=10)
 
         # Create a Treeview widget to display booking statistics
@@ -1344,46 +1774,22 @@ class CarRentalApp:
             tree.column(col, width=200)
         tree.pack(fill=tk.BOTH, expand=True)
 
+        period_var = tk.StringVar(value="Yearly")
+        rows = TreeRows(tree)  # keyed by metric name
+        generation = [0]  # bumped per request, so a slower earlier period cannot overwrite a later one
+
         def load_data(period):
-            # Clear the Treeview
-            for item in tree.get_children():
-                tree.delete(item)
-
-            # Fetch data based on the selected period
-            if period == "Yearly":
-                data = [
-                    ("Total Revenue", "$150,000"),
-                    ("Total Bookings", "1,200"),
-                    ("Most Booked Car", "Toyota Corolla"),
-                    ("Highest Revenue Month", "March 2025"),
-                ]
-            elif period == "Monthly":
-                data = [
-                    ("Total Revenue", "$15,000"),
-                    ("Total Bookings", "120"),
-                    ("Most Booked Car", "Honda Civic"),
-                    ("Highest Revenue Week", "Week 2 of March 2025"),
-                ]
-            elif period == "Weekly":
-                data = [
-                    ("Total Revenue", "$3,500"),
-                    ("Total Bookings", "30"),
-                    ("Most Booked Car", "Ford Focus"),
-                    ("Highest Revenue Day", "March 10, 2025"),
-                ]
-            elif period == "Daily":
-                data = [
-                    ("Total Revenue", "$500"),
-                    ("Total Bookings", "5"),
-                    ("Most Booked Car", "BMW 3 Series"),
-                    ("Peak Booking Hour", "10:00 AM"),
-                ]
-            else:
-                data = []
+            period_var.set(period)
+            generation[0] += 1
+            requested = generation[0]
 
-            # Populate the Treeview with the fetched data
-            for metric, value in data:
-                tree.insert("", "end", values=(metric, value))
+            # Show the figures for the selected period once the latest request comes back
+            def fill_tree(data):
+                if requested == generation[0] and tree.winfo_exists():
+                    rows.sync(data)
+
+            # Compute the figures for the current period in the background
+            self.db_worker.submit(lambda: ReportingService.report(period) + ReportingService.utilization(period), fill_tree)
 
         # Create a frame for the buttons
         button_frame = tk.Frame(self.content_frame)
@@ -1400,26 +1806,96 @@ class CarRentalApp:
 
         # Load default data (e.g., Yearly) when the page is first displayed
         load_data("Yearly")
+        return lambda: load_data(period_var.get())
 
-    def log_action(self, user, action):
-        conn = sqlite3.connect("logs.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS logs (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user TEXT NOT NULL,
-                action TEXT NOT NULL,
-                timestamp TEXT NOT NULL
-            )
-        """)
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("INSERT INTO logs (user, action, timestamp) VALUES (?, ?, ?)", (user, action, timestamp))
-        conn.commit()
-        conn.close()
+    def show_export(self):
+        self.clear_content_frame()
+        tk.Label(self.content_frame, text="Export Data", font=("Arial", 20)).pack(pady=10)
+
+        tk.Label(self.content_frame, text="Table:").pack()
+        table_var = tk.StringVar(value="reservations")
+        ttk.Combobox(self.content_frame, textvariable=table_var, values=list(EXPORT_TABLES), state="readonly").pack()
+        tk.Label(self.content_frame, text="Format:").pack()
+        format_var = tk.StringVar(value="csv")
+        ttk.Combobox(self.content_frame, textvariable=format_var, values=list(EXPORT_FORMATS), state="readonly").pack()
+        compress_var = tk.BooleanVar()
+        tk.Checkbutton(self.content_frame, text="Compress (gzip)", variable=compress_var).pack()
+
+        tk.Label(self.content_frame, text="From Date (YYYY-MM-DD, optional):").pack()
+        from_entry = tk.Entry(self.content_frame)
+        from_entry.pack()
+        tk.Label(self.content_frame, text="To Date (YYYY-MM-DD, optional):").pack()
+        to_entry = tk.Entry(self.content_frame)
+        to_entry.pack()
+        tk.Label(self.content_frame, text="Statuses, comma separated (reservations only, optional):").pack()
+        status_entry = tk.Entry(self.content_frame)
+        status_entry.pack()
+
+        progress_bar = ttk.Progressbar(self.content_frame, length=300, maximum=1)
+        progress_bar.pack(pady=10)
+        progress_label = tk.Label(self.content_frame, text="")
+        progress_label.pack()
+
+        # The export runs on its own thread; its progress is read back here until it finishes
+        def watch(job):
+            if progress_label.winfo_exists():
+                total = job.total or 0
+                progress_bar.config(maximum=max(total, 1), value=job.rows)
+                progress_label.config(text=f"{job.rows:,} / {total:,} rows")
+            if not job.finished:
+                self.root.after(EXPORT_POLL_INTERVAL, watch, job)
+                return
+            self.export_job = None
+            if isinstance(job.error, ExportCancelled):
+                messagebox.showinfo("Export", str(job.error))
+            elif job.error is not None:
+                messagebox.showerror("Error", f"Export failed: {job.error}")
+            else:
+                self.log_action(self.session.username, f"Exported {job.rows} {job.table} rows")
+                messagebox.showinfo("Success", f"Exported {job.rows:,} rows to {job.path}")
+
+        def start_export():
+            if self.export_job is not None:
+                messagebox.showerror("Error", "An export is already running.")
+                return
+            table, fmt, compress = table_var.get(), format_var.get(), compress_var.get()
+            statuses = [status.strip() for status in status_entry.get().split(",") if status.strip()]
+            extension = f".{fmt}.gz" if compress else f".{fmt}"
+            path = filedialog.asksaveasfilename(defaultextension=extension, initialfile=f"{table}{extension}")
+            if not path:
+                return
+            self.export_job = ExportJob(
+                table, path, fmt=fmt, compress=compress, date_from=from_entry.get().strip() or None,
+                date_to=to_entry.get().strip() or None, statuses=statuses or None,
+            ).start()
+            watch(self.export_job)
+
+        def cancel_export():
+            if self.export_job is not None:
+                self.export_job.cancel()
+
+        button_frame = tk.Frame(self.content_frame)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Export", command=start_export).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Cancel Export", command=cancel_export).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Back", command=self.show_main_menu).pack(side=tk.LEFT, padx=5)
 
+    def log_action(self, user, action):
+        self.audit.log(user, action)
+
+    def shutdown(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
+            self.export_job.join()  # stops after the current batch and removes the partial file
+        self.db_worker.shutdown()
+        try:
+            self.audit.close()
+        except Exception as e:
+            messagebox.showerror("Error", f"Some audit log entries could not be saved: {e}")
+        self.root.destroy()
+
+    @cached_screen()
     def show_employee_schedule(self):
-        self.clear_content_frame()
         tk.Label(self.content_frame, text="Employee Schedule", font=("Arial", 20)).pack(pady=10)
         # Create a Treeview widget to display the schedule in calendar format
         columns = ["Time", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
@@ -1463,6 +1939,7 @@ class CarRentalApp:
 
         tk.Button(button_frame, text="Schedule Employees", command=self.show_schedule_employees).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Back", command=self.show_main_menu).pack(side=tk.LEFT, padx=5)
+        return None
 
     def show_schedule_employees(self):
         self.clear_content_frame()
@@ -1500,7 +1977,15 @@ class CarRentalApp:
         tk.Button(self.content_frame, text="Back", command=self.show_employee_schedule).pack(pady=5)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Car Rental System")
+    parser.add_argument("--api", metavar="URL", help="run as a thin client of a local API service, e.g. http://127.0.0.1:8765")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    DatabaseManager.initialize_database()
-    app = CarRentalApp(root)
+    atexit.register(ConnectionManager.close_all)
+    if not args.api:
+        DatabaseManager.initialize_database()  # the API service migrates the files it serves
+    app = CarRentalApp(root, api_url=args.api)
+    atexit.register(app.audit.close)
+    root.protocol("WM_DELETE_WINDOW", app.shutdown)
     root.mainloop()
\ No newline at end of file
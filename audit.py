@@ -0,0 +1,107 @@
+import queue
+import sys
+import threading
+import traceback
+from datetime import datetime
+
+from database import DATABASES, ConnectionManager
+
+# Defaults for the write-behind audit logger
+AUDIT_FLUSH_INTERVAL = 1.0   # seconds between background flushes
+AUDIT_QUEUE_SIZE = 10000     # events held in memory before new ones are dropped
+AUDIT_BATCH_SIZE = 500       # rows written per executemany batch
+
+
+class AuditLogger:
+    """Write-behind audit log shared by every manager.
+
+    ``log()`` only timestamps the event and puts it on a bounded in-memory
+    queue, so callers on the Tk thread never wait on disk I/O. A daemon thread
+    wakes every ``flush_interval`` seconds, or sooner when the queue reaches a
+    batch, and writes the pending events with ``executemany`` in one
+    transaction. ``close()`` writes whatever is left. If the queue is full,
+    new events are counted in ``dropped`` and discarded. A failed background
+    flush keeps its batch for the next pass, is counted in ``failures`` and
+    printed to stderr; if the rows still cannot be written, ``close()``
+    raises the error.
+    """
+
+    def __init__(self, db_name=DATABASES["logs"], flush_interval=AUDIT_FLUSH_INTERVAL,
+                 max_queue=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE):
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.failures = 0
+        self.last_error = None
+        self._retry = []
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="audit-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, user, action):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._queue.put_nowait((user, action, timestamp))
+        except queue.Full:
+            self.dropped += 1
+            self._wake.set()
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """Write all queued events now, on the calling thread."""
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return
+                try:
+                    with ConnectionManager.transaction(self.db_name) as conn:
+                        conn.executemany("INSERT INTO logs (user, action, timestamp) VALUES (?, ?, ?)", batch)
+                except Exception:
+                    self._retry = batch  # written again on the next flush
+                    raise
+
+    def close(self):
+        """Stop the background thread and write any remaining events. Safe to call twice.
+
+        Raises the write error if events are still unwritten.
+        """
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        if self.dropped:
+            print(f"Audit log: {self.dropped:,} event(s) dropped because the queue was full", file=sys.stderr)
+
+    def _drain(self):
+        batch, self._retry = self._retry, []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the thread alive; the failed batch is retried on the next pass
+                if self.last_error is None:  # report once per run of failures, not every second
+                    print("Audit log: writing to the log database failed; retrying", file=sys.stderr)
+                    traceback.print_exc()
+                self.failures += 1
+                self.last_error = e
+            else:
+                self.last_error = None
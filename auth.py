@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import hmac
+import os
+
+from database import DATABASES, ConnectionManager, DatabaseManager
+
+# scrypt cost parameters for new hashes; each verification takes roughly 0.1 s and 32 MB
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024  # OpenSSL's 32 MB default is just below what N = 2**15, r = 8 needs
+SALT_BYTES = 16
+HASH_BYTES = 32
+HASH_SCHEME = "scrypt"
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=SCRYPT_MAXMEM, dklen=HASH_BYTES)
+
+
+def hash_password(password):
+    """Salted scrypt hash of ``password``, stored as ``scrypt$N$r$p$salt$hash`` (hex) in users.password."""
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{HASH_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return stored.startswith(f"{HASH_SCHEME}$")
+
+
+def needs_rehash(stored):
+    """True for plaintext passwords and for hashes made with other cost parameters than the current ones."""
+    return not stored.startswith(f"{HASH_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+def verify_password(password, stored):
+    """Check ``password`` against a stored hash, or against a plaintext password not yet migrated."""
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    _, n, r, p, salt, digest = stored.split("$")
+    return hmac.compare_digest(_scrypt(password, bytes.fromhex(salt), int(n), int(r), int(p)), bytes.fromhex(digest))
+
+
+# Verified against when the username does not exist, so unknown and known usernames take as long to reject
+_DUMMY_HASH = f"{HASH_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${'00' * SALT_BYTES}${'00' * HASH_BYTES}"
+
+
+class Session:
+    """The signed-in employee, cached for the life of the login so screens check the role without a query."""
+
+    def __init__(self, username, role, first_name=None, last_name=None):
+        self.username = username
+        self.role = role
+        self.first_name = first_name
+        self.last_name = last_name
+
+    @property
+    def is_manager(self):
+        return self.role == "Manager"
+
+    def __repr__(self):
+        return f"Session({self.username!r}, {self.role!r})"
+
+
+class Authenticator:
+    """Password checks and the move from plaintext passwords to salted scrypt hashes.
+
+    ``authenticate()`` is deliberately slow, about 0.1 s per call, so the Tk
+    screens run it on the DbWorker and never on the Tk thread. Passwords that
+    are still plaintext, or hashed with older cost parameters, are rehashed on
+    the first successful login. ``migrate_passwords()`` hashes all the rest at
+    once; the app runs it in the background at startup.
+    """
+
+    @staticmethod
+    def authenticate(username, password):
+        """Return a Session for valid credentials, or None."""
+        with ConnectionManager.connection(DATABASES["user"]) as conn:
+            row = conn.execute(
+                "SELECT username, password, role, first_name, last_name FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        if row is None:
+            verify_password(password, _DUMMY_HASH)
+            return None
+        username, stored, role, first_name, last_name = row
+        if not verify_password(password, stored):
+            return None
+        if needs_rehash(stored):
+            Authenticator._replace(username, stored, hash_password(password))
+        return Session(username, role, first_name, last_name)
+
+    @staticmethod
+    def _replace(username, old, new):
+        """Swap a stored password for its hash unless it was changed in the meantime."""
+        with ConnectionManager.transaction(DATABASES["user"]) as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ? AND password = ?", (new, username, old))
+
+    @staticmethod
+    def migrate_passwords():
+        """Hash every plaintext password in user.db; return how many were hashed."""
+        with ConnectionManager.connection(DATABASES["user"]) as conn:
+            rows = [row for row in conn.execute("SELECT username, password FROM users") if not is_hashed(row[1])]
+        for username, stored in rows:
+            Authenticator._replace(username, stored, hash_password(stored))
+        return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash the plaintext passwords left in user.db.")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.directory)  # DATABASES is relative
+    DatabaseManager.initialize_database()
+    try:
+        print(f"Hashed {Authenticator.migrate_passwords()} password(s)")
+    finally:
+        ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
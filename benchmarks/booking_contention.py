@@ -0,0 +1,149 @@
+# Booking contention benchmark: many clerks booking the same small fleet at once.
+#
+# Every worker books random cars from the fleet for the same day and hands
+# each one back a few attempts later, so the cars are fought over constantly.
+# The run reports throughput and conflict rate and checks that no car ended
+# up with two active bookings, including through unpadded dates such as
+# "2026-11-5" that would otherwise compare wrongly as strings:
+#
+#     python -m benchmarks.booking_contention --workers 8 --fleet 10 --attempts 500
+#     python -m benchmarks.booking_contention --processes   # separate connections per worker
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from booking import RELEASE_STATUSES, BookingConflict, BookingEngine, today_period
+from database import DATABASES, ConnectionManager, DatabaseManager
+
+WORKERS = 8
+FLEET = 10
+ATTEMPTS = 500          # booking attempts per worker
+HOLD_ATTEMPTS = 3       # attempts a worker makes before returning a car it booked
+
+
+def create_fleet(size):
+    """Replace the seed data in the current directory with ``size`` Available cars and no reservations."""
+    DatabaseManager.initialize_database()
+    with ConnectionManager.transaction(DATABASES["reservations"]) as conn:
+        conn.execute("DELETE FROM reservations")
+    with ConnectionManager.transaction(DATABASES["vehicle"]) as conn:
+        conn.execute("DELETE FROM vehicles")
+        conn.executemany("""
+            INSERT INTO vehicles (car_id, brand, model, year, rate_per_day, rate_per_km, status)
+            VALUES (?, 'Bench', 'Car', 2024, 50.0, 0.2, 'Available')
+        """, [(car_id,) for car_id in range(1, size + 1)])
+    ConnectionManager.close_all()
+    BookingEngine.availability.invalidate()
+
+
+def book_cars(worker, fleet, attempts, seed, directory=None):
+    """Run one clerk's booking attempts. Returns (booked, conflicts, errors)."""
+    if directory:
+        os.chdir(directory)  # worker processes start in the parent's directory; make it explicit
+    rng = random.Random(f"{seed}:{worker}")
+    start_date, end_date = today_period()
+    booked = conflicts = errors = 0
+    held = deque()  # (attempt to release at, reservation_id)
+    for attempt in range(attempts):
+        while held and held[0][0] <= attempt:
+            _, reservation_id = held.popleft()
+            BookingEngine.update_status(reservation_id, "Completed")
+        car_id = rng.randint(1, fleet)
+        try:
+            reservation_id = BookingEngine.book(car_id, f"Clerk {worker}", start_date, end_date)
+        except BookingConflict:
+            conflicts += 1
+            continue
+        except sqlite3.OperationalError:
+            errors += 1  # busy_timeout expired
+            continue
+        booked += 1
+        held.append((attempt + HOLD_ATTEMPTS, reservation_id))
+    for _, reservation_id in held:
+        BookingEngine.update_status(reservation_id, "Completed")
+    return booked, conflicts, errors
+
+
+def check_no_double_bookings():
+    """Return the number of cars with more than one active reservation (0 means correct)."""
+    placeholders = ", ".join("?" for _ in RELEASE_STATUSES)
+    with ConnectionManager.connection(DATABASES["reservations"]) as conn:
+        return conn.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT car_id FROM reservations WHERE status NOT IN ({placeholders})
+                GROUP BY car_id HAVING COUNT(*) > 1
+            )
+        """, RELEASE_STATUSES).fetchone()[0]
+
+
+def check_unpadded_dates(car_id=1):
+    """Return True if an unpadded period overlapping an existing reservation is rejected."""
+    month = (date.today().replace(day=1) + timedelta(days=62)).replace(day=1)
+    reservation_ids = [BookingEngine.reserve(car_id, "Padded", month.isoformat(), month.replace(day=10).isoformat())]
+    try:
+        reservation_ids.append(BookingEngine.reserve(
+            car_id, "Unpadded", f"{month.year}-{month.month}-5", f"{month.year}-{month.month}-9"
+        ))
+    except BookingConflict:
+        pass
+    for reservation_id in reservation_ids:
+        BookingEngine.update_status(reservation_id, "Cancelled")
+    return len(reservation_ids) == 1
+
+
+def run(workers=WORKERS, fleet=FLEET, attempts=ATTEMPTS, processes=False, seed=0):
+    """Create a fleet in the current directory and race ``workers`` clerks for it."""
+    create_fleet(fleet)
+    started = time.perf_counter()
+    if processes:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(book_cars, [(i, fleet, attempts, seed, os.getcwd()) for i in range(workers)])
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda i: book_cars(i, fleet, attempts, seed), range(workers)))
+    elapsed = time.perf_counter() - started
+    booked, conflicts, errors = (sum(column) for column in zip(*results))
+    return {
+        "attempts": workers * attempts, "booked": booked, "conflicts": conflicts, "errors": errors,
+        "seconds": elapsed, "double_booked_cars": check_no_double_bookings(),
+        "unpadded_rejected": check_unpadded_dates(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race concurrent clerks booking a small fleet.")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--fleet", type=int, default=FLEET, help="number of cars fought over")
+    parser.add_argument("--attempts", type=int, default=ATTEMPTS, help="booking attempts per worker")
+    parser.add_argument("--processes", action="store_true", help="use worker processes instead of threads")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="car-rental-contention-") as workdir:
+        os.chdir(workdir)  # DATABASES holds relative file names
+        try:
+            result = run(args.workers, args.fleet, args.attempts, args.processes, args.seed)
+        finally:
+            ConnectionManager.close_all()
+            os.chdir(cwd)
+
+    print(f"{args.workers} {'processes' if args.processes else 'threads'} booking {args.fleet} cars")
+    print(f"  attempts            {result['attempts']:>10,}")
+    print(f"  throughput          {result['attempts'] / result['seconds']:>10,.0f} attempts/s")
+    print(f"  successful bookings {result['booked']:>10,} ({result['booked'] / result['seconds']:,.0f}/s)")
+    print(f"  conflict rate       {result['conflicts'] / result['attempts']:>10.1%}")
+    print(f"  lock timeouts       {result['errors']:>10,}")
+    print(f"  double-booked cars  {result['double_booked_cars']:>10,}")
+    print(f"  unpadded overlap    {'rejected' if result['unpadded_rejected'] else 'ACCEPTED':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Read-path scaling benchmarks for the service layer.
+#
+# Each fleet size is built from scratch in a temporary directory, so the real
+# database files are never touched:
+#
+#     python -m benchmarks.read_paths                 # 1k, 100k and 1M vehicles
+#     python -m benchmarks.read_paths --sizes 1000 50000 --repeat 9
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking import BookingEngine
+from database import DATABASES, ConnectionManager
+from datagen import DataGenerator
+from services import ReportingService, ReservationService, UserService, VehicleService
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+HISTORY_DAYS = 60   # reservation history per fleet; about seven rentals per car
+REPEAT = 5          # timed runs per measurement; the median is reported
+
+
+def seed_fleet(vehicles, seed=0):
+    """Create the schema in the current directory and add ``vehicles`` cars with reservation histories."""
+    DataGenerator(
+        vehicles=vehicles, customers=max(vehicles // 2, 100), logs=0, seed=seed, history_days=HISTORY_DAYS
+    ).generate()
+
+
+def reset_caches():
+    """Forget every open connection and in-memory index so each fleet starts cold."""
+    ConnectionManager.close_all()
+    BookingEngine.availability.invalidate()
+    ReportingService.analytics.invalidate()
+
+
+def timed(func, repeat=1):
+    """Return the median wall time of ``repeat`` calls to ``func``, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_fleet(vehicles, repeat=REPEAT):
+    """Seed one fleet and return a list of (measurement, seconds)."""
+    results = [("seed fleet", timed(lambda: seed_fleet(vehicles)))]
+    week_start = (date.today() + timedelta(days=7)).isoformat()
+    week_end = (date.today() + timedelta(days=14)).isoformat()
+    with ConnectionManager.connection(DATABASES["reservations"]) as conn:
+        last_id = conn.execute("SELECT MAX(reservation_id) FROM reservations").fetchone()[0]
+
+    results.append(("availability search (cold)", timed(lambda: VehicleService.available_cars(week_start, week_end))))
+    results.append(("availability search (warm)", timed(lambda: VehicleService.available_cars(week_start, week_end), repeat)))
+    results.append(("single car availability", timed(lambda: VehicleService.is_available(1, week_start, week_end), repeat)))
+    results.append(("reservation list, first page", timed(ReservationService.list_reservations, repeat)))
+    results.append(("reservation list, last page", timed(
+        lambda: ReservationService.list_reservations(after=max(last_id - 200, 0)), repeat)))
+    results.append(("dashboard counters", timed(ReservationService.status_counts, repeat)))
+    results.append(("upcoming reservations", timed(lambda: ReservationService.upcoming(10), repeat)))
+    results.append(("yearly report (cold)", timed(lambda: ReportingService.report("Yearly"))))
+    results.append(("yearly report (warm)", timed(lambda: ReportingService.report("Yearly"), repeat)))
+    results.append(("monthly summary (warm)", timed(ReportingService.monthly_summary, repeat)))
+    results.append(("login (scrypt verify)", timed(lambda: UserService.login("manager", "man123"), repeat)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the service-layer read paths on synthetic fleets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="fleet sizes in vehicles")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per measurement")
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    for vehicles in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="car-rental-bench-") as workdir:
+            os.chdir(workdir)  # DATABASES holds relative file names
+            try:
+                results = run_fleet(vehicles, args.repeat)
+            finally:
+                reset_caches()
+                os.chdir(cwd)
+        print(f"\n{vehicles:,} vehicles")
+        for name, seconds in results:
+            print(f"  {name:<32}{seconds * 1000:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
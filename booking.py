@@ -0,0 +1,303 @@
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+from database import DATABASES, ConnectionManager
+from occupancy import OccupancyMap
+
+# Schemas ATTACHed to the vehicle database for cross-file booking work
+BOOKING_SCHEMAS = {
+    "res": DATABASES["reservations"],
+    "cust": DATABASES["customer"],
+}
+
+# Reservation statuses that hand the car back to the available pool
+RELEASE_STATUSES = ["Completed", "Cancelled", "No Show"]
+
+# Accepted rental periods: no start before EARLIEST_START_DATE, no end more than about MAX_YEARS_AHEAD years ahead
+EARLIEST_START_DATE = date(2000, 1, 1)
+MAX_YEARS_AHEAD = 5
+
+
+class BookingConflict(Exception):
+    """Raised when a car is already reserved for part of the requested period."""
+
+
+class ReservationNotFound(LookupError):
+    """Raised when a status update names a reservation that does not exist."""
+
+
+def parse_period(start_date, end_date):
+    """Validate a YYYY-MM-DD rental period and return it as zero-padded ISO dates.
+
+    Reservations are compared as ISO strings, so "2026-11-5" must be stored
+    as "2026-11-05" or it sorts after "2026-11-10". Dates far outside the accepted range are almost always typos (9999 for
+    2025). Rejecting them here also keeps the occupancy day maps small.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    if end <= start:
+        raise ValueError("End date must be after start date.")
+    if start < EARLIEST_START_DATE:
+        raise ValueError(f"Start date must not be before {EARLIEST_START_DATE.isoformat()}.")
+    latest = date.today() + timedelta(days=366 * MAX_YEARS_AHEAD)
+    if end > latest:
+        raise ValueError(f"End date must not be after {latest.isoformat()}.")
+    return start.isoformat(), end.isoformat()
+
+
+def today_period():
+    """Return the one-day period starting today, used for "available now" listings."""
+    today = date.today()
+    return today.isoformat(), (today + timedelta(days=1)).isoformat()
+
+
+class AvailabilityEngine:
+    """Keeps an in-memory interval index of active reservations for each car.
+
+    Every car has parallel lists of reservation starts, ends and ids, sorted by
+    start date, plus a running maximum of the ends. A period [start, end) is
+    free when no earlier-starting reservation ends after ``start``. That takes
+    one bisect, so each check is O(log n). ISO dates sort as strings, so no
+    parsing is needed. The index is rebuilt whenever another connection
+    changes reservations.db, which SQLite reports through
+    ``PRAGMA data_version``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cars = {}          # car_id -> (starts, ends, max_ends, reservation_ids)
+        self._car_of = {}        # reservation_id -> car_id
+        self._data_version = None
+
+    def invalidate(self):
+        with self._lock:
+            self._data_version = None
+
+    def refresh(self, conn):
+        """Reload from ``res.reservations`` if it changed outside this connection."""
+        data_version = conn.execute("PRAGMA res.data_version").fetchone()[0]
+        with self._lock:
+            if data_version == self._data_version:
+                return
+            placeholders = ", ".join("?" for _ in RELEASE_STATUSES)
+            rows = conn.execute(f"""
+                SELECT car_id, start_date, end_date, reservation_id
+                FROM res.reservations
+                WHERE status NOT IN ({placeholders})
+                ORDER BY car_id, start_date
+            """, RELEASE_STATUSES).fetchall()
+            self._cars.clear()
+            self._car_of.clear()
+            for car_id, start_date, end_date, reservation_id in rows:
+                starts, ends, max_ends, ids = self._cars.setdefault(int(car_id), ([], [], [], []))
+                starts.append(start_date)
+                ends.append(end_date)
+                max_ends.append(max(end_date, max_ends[-1]) if max_ends else end_date)
+                ids.append(reservation_id)
+                self._car_of[reservation_id] = int(car_id)
+            self._data_version = data_version
+
+    def is_free(self, car_id, start_date, end_date):
+        with self._lock:
+            intervals = self._cars.get(int(car_id))
+            if not intervals:
+                return True
+            starts, _, max_ends, _ = intervals
+            i = bisect_left(starts, end_date) - 1
+            return i < 0 or max_ends[i] <= start_date
+
+    def add(self, car_id, start_date, end_date, reservation_id):
+        with self._lock:
+            starts, ends, max_ends, ids = self._cars.setdefault(int(car_id), ([], [], [], []))
+            i = bisect_left(starts, start_date)
+            starts.insert(i, start_date)
+            ends.insert(i, end_date)
+            ids.insert(i, reservation_id)
+            max_ends.insert(i, end_date)
+            self._rebuild_max_ends(ends, max_ends, i)
+            self._car_of[reservation_id] = int(car_id)
+
+    def remove(self, reservation_id):
+        with self._lock:
+            car_id = self._car_of.pop(int(reservation_id), None)
+            if car_id is None:
+                return
+            starts, ends, max_ends, ids = self._cars[car_id]
+            i = ids.index(int(reservation_id))
+            for column in (starts, ends, max_ends, ids):
+                del column[i]
+            self._rebuild_max_ends(ends, max_ends, i)
+
+    @staticmethod
+    def _rebuild_max_ends(ends, max_ends, i):
+        for j in range(i, len(ends)):
+            max_ends[j] = max(ends[j], max_ends[j - 1]) if j else ends[j]
+
+
+class BookingEngine:
+    """Applies vehicle and reservation changes together in a single transaction.
+
+    vehicle.db is the main schema, with reservations.db and customer.db
+    ATTACHed as ``res`` and ``cust``. Both writes share one commit, so they
+    succeed or fail together. Before inserting, a new reservation is checked
+    against ``availability`` inside the write transaction. Booking also claims
+    the car with a conditional ``status = 'Available'`` update under ``BEGIN
+    IMMEDIATE``, so concurrent terminals cannot book the same car twice.
+    Every reservation change is also staged on the day maps, ``occupancy``
+    (rentals) and ``bookings`` (reservations that hold the car), and
+    applied to their files once the transaction commits.
+    """
+    availability = AvailabilityEngine()
+    occupancy = OccupancyMap()
+    bookings = OccupancyMap("bookings", RELEASE_STATUSES)
+    day_maps = (occupancy, bookings)
+
+    @staticmethod
+    def transaction(mode="IMMEDIATE"):
+        return ConnectionManager.transaction(DATABASES["vehicle"], mode=mode, attach=BOOKING_SCHEMAS)
+
+    @staticmethod
+    def connection():
+        return ConnectionManager.connection(DATABASES["vehicle"], attach=BOOKING_SCHEMAS)
+
+    @staticmethod
+    def is_available(car_id, start_date, end_date):
+        start_date, end_date = parse_period(start_date, end_date)
+        with BookingEngine.connection() as conn:
+            BookingEngine.availability.refresh(conn)
+            return BookingEngine.availability.is_free(car_id, start_date, end_date)
+
+    @staticmethod
+    def available_cars(start_date, end_date):
+        """Return Available vehicle rows (car_id, brand, model, year, rate_per_day, rate_per_km) free for the whole period."""
+        start_date, end_date = parse_period(start_date, end_date)
+        with BookingEngine.connection() as conn:
+            BookingEngine.availability.refresh(conn)
+            cars = conn.execute("""
+                SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM main.vehicles WHERE status = 'Available'
+            """).fetchall()
+        return [car for car in cars if BookingEngine.availability.is_free(car[0], start_date, end_date)]
+
+    @staticmethod
+    def _insert_reservation(conn, car_id, customer_name, start_date, end_date, status):
+        start_date, end_date = parse_period(start_date, end_date)
+        availability = BookingEngine.availability
+        availability.refresh(conn)
+        blocking = status not in RELEASE_STATUSES
+        if blocking and not availability.is_free(car_id, start_date, end_date):
+            raise BookingConflict(f"Car {car_id} is already reserved between {start_date} and {end_date}.")
+        cursor = conn.execute("""
+            INSERT INTO res.reservations (customer_name, car_id, start_date, end_date, status)
+            VALUES (?, ?, ?, ?, ?)
+        """, (customer_name, car_id, start_date, end_date, status))
+        for day_map in BookingEngine.day_maps:
+            day_map.stage(car_id, start_date, end_date, None, status)
+        if blocking:
+            availability.add(car_id, start_date, end_date, cursor.lastrowid)
+        return cursor.lastrowid
+
+    @staticmethod
+    def _book(conn, car_id, customer_name, start_date, end_date, status="Booked"):
+        # Compare-and-set: only the first of several concurrent bookings finds the car still Available
+        claimed = conn.execute(
+            "UPDATE main.vehicles SET status = 'Booked' WHERE car_id = ? AND status = 'Available'", (car_id,)
+        ).rowcount
+        if not claimed:
+            if conn.execute("SELECT 1 FROM main.vehicles WHERE car_id = ?", (car_id,)).fetchone() is None:
+                raise ValueError(f"Car {car_id} does not exist.")
+            raise BookingConflict(f"Car {car_id} is no longer available.")
+        return BookingEngine._insert_reservation(conn, car_id, customer_name, start_date, end_date, status)
+
+    @staticmethod
+    def _update_status(conn, reservation_id, new_status):
+        reservation = conn.execute(
+            "SELECT car_id, start_date, end_date, status FROM res.reservations WHERE reservation_id = ?", (reservation_id,)
+        ).fetchone()
+        if reservation is None:
+            raise ReservationNotFound(f"Reservation {reservation_id} does not exist.")
+        conn.execute("UPDATE res.reservations SET status = ? WHERE reservation_id = ?", (new_status, reservation_id))
+        for day_map in BookingEngine.day_maps:
+            day_map.stage(*reservation, new_status)
+        if new_status in RELEASE_STATUSES:
+            # Release the reservation's own car, never one named by the caller
+            conn.execute("UPDATE main.vehicles SET status = 'Available' WHERE car_id = ?", (reservation[0],))
+            BookingEngine.availability.remove(reservation_id)
+        else:
+            BookingEngine.availability.invalidate()
+
+    @staticmethod
+    def _run(write, *args):
+        try:
+            with BookingEngine.transaction() as conn:
+                before = OccupancyMap.version(conn, "res")
+                result = write(conn, *args)
+                after = OccupancyMap.version(conn, "res")
+        except Exception:
+            BookingEngine.availability.invalidate()
+            for day_map in BookingEngine.day_maps:
+                day_map.discard()
+            raise
+        for day_map in BookingEngine.day_maps:
+            day_map.apply(before, after)
+        return result
+
+    @staticmethod
+    def reserve(car_id, customer_name, start_date, end_date, status="Upcoming"):
+        """Insert a reservation without touching the vehicle's status. Returns the new reservation_id."""
+        return BookingEngine._run(BookingEngine._insert_reservation, car_id, customer_name, start_date, end_date, status)
+
+    @staticmethod
+    def book(car_id, customer_name, start_date, end_date, status="Booked"):
+        """Claim an Available car and insert the reservation. Returns the new reservation_id.
+
+        Raises BookingConflict if the car is no longer Available or already reserved for the period.
+        """
+        return BookingEngine._run(BookingEngine._book, car_id, customer_name, start_date, end_date, status)
+
+    @staticmethod
+    def update_status(reservation_id, new_status):
+        """Set a reservation's status and, for closing statuses, make its car available again.
+
+        Raises ReservationNotFound if there is no such reservation.
+        """
+        BookingEngine._run(BookingEngine._update_status, reservation_id, new_status)
+
+    @staticmethod
+    def apply_batch(operations):
+        """Run several ``(name, args)`` writes ("reserve", "book" or "update_status") in one transaction.
+
+        Each operation runs under its own savepoint, so a conflict rolls back only
+        that operation. Returns one result or exception per operation, in order.
+        """
+        writes = {
+            "reserve": BookingEngine._insert_reservation,
+            "book": BookingEngine._book,
+            "update_status": BookingEngine._update_status,
+        }
+        day_maps = BookingEngine.day_maps
+        results = []
+        try:
+            with BookingEngine.transaction() as conn:
+                before = OccupancyMap.version(conn, "res")
+                for name, args in operations:
+                    conn.execute("SAVEPOINT batch_write")
+                    marks = [day_map.mark() for day_map in day_maps]
+                    try:
+                        results.append(writes[name](conn, *args))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO batch_write")
+                        BookingEngine.availability.invalidate()
+                        for day_map, mark in zip(day_maps, marks):
+                            day_map.discard(mark)
+                        results.append(e)
+                    conn.execute("RELEASE batch_write")
+                after = OccupancyMap.version(conn, "res")
+        except Exception:
+            BookingEngine.availability.invalidate()
+            for day_map in day_maps:
+                day_map.discard()
+            raise
+        for day_map in day_maps:
+            day_map.apply(before, after)
+        return results
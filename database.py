@@ -0,0 +1,617 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Constants for database names and other repeated values
+DATABASES = {
+    "user": "user.db",
+    "customer": "customer.db",
+    "vehicle": "vehicle.db",
+    "reservations": "reservations.db",
+    "logs": "logs.db",
+    "settings": "settings.db",
+}
+
+# Per-connection tuning applied once when a database file is first opened
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),      # ~16 MB page cache (negative means KiB)
+    ("mmap_size", 134217728),    # 128 MB memory-mapped I/O
+    ("busy_timeout", 5000),      # wait up to 5 s on a locked database
+    ("temp_store", "MEMORY"),
+)
+
+
+class ConnectionManager:
+    """Keeps one long-lived, tuned connection per database file.
+
+    Connections are opened lazily, run in autocommit mode and are guarded by a
+    per-file lock so they can be shared by the UI and background threads.
+    Multi-statement work should go through ``transaction()``. Passing
+    ``attach={"alias": db_name}`` selects a separate connection that has the
+    other files ATTACHed, so one transaction can span several databases.
+    Inside ``cancel_on(event)``, statements run by the current thread are
+    interrupted as soon as ``event`` is set.
+    """
+    _connections = {}
+    _locks = {}
+    _registry_lock = threading.Lock()
+    _local = threading.local()
+
+    @staticmethod
+    def _key(db_name, attach=None):
+        attached = tuple(sorted((alias, os.path.abspath(path)) for alias, path in (attach or {}).items()))
+        return os.path.abspath(db_name), attached
+
+    @classmethod
+    def _open(cls, db_name, attach=None):
+        conn = sqlite3.connect(db_name, isolation_level=None, check_same_thread=False)
+        schemas = ["main"]
+        for alias, path in (attach or {}).items():
+            conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+            schemas.append(alias)
+        for pragma, value in PRAGMAS:
+            if pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size"):
+                for schema in schemas:
+                    conn.execute(f"PRAGMA {schema}.{pragma} = {value}")
+            else:
+                conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
+    @classmethod
+    def get(cls, db_name, attach=None):
+        """Return the shared connection and its lock for ``db_name``."""
+        key = cls._key(db_name, attach)
+        with cls._registry_lock:
+            if key not in cls._connections:
+                cls._connections[key] = cls._open(db_name, attach)
+                cls._locks[key] = threading.RLock()
+            return cls._connections[key], cls._locks[key]
+
+    @classmethod
+    @contextmanager
+    def cancel_on(cls, event):
+        """Abort this thread's statements with OperationalError once ``event`` is set."""
+        cls._local.cancel = event
+        try:
+            yield
+        finally:
+            cls._local.cancel = None
+
+    @classmethod
+    @contextmanager
+    def _locked(cls, db_name, attach):
+        conn, lock = cls.get(db_name, attach)
+        with lock:
+            cancel = getattr(cls._local, "cancel", None)
+            if cancel is not None:
+                conn.set_progress_handler(cancel.is_set, 1000)
+            try:
+                yield conn
+            finally:
+                if cancel is not None:
+                    conn.set_progress_handler(None, 0)
+
+    @classmethod
+    @contextmanager
+    def connection(cls, db_name, attach=None):
+        """Lock the shared connection for a read or a single autocommit statement."""
+        with cls._locked(db_name, attach) as conn:
+            yield conn
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, db_name, mode="DEFERRED", attach=None):
+        """Run a block in one transaction: commit on success, roll back on error."""
+        with cls._locked(db_name, attach) as conn:
+            conn.execute(f"BEGIN {mode}")
+            try:
+                yield conn
+            except BaseException:
+                conn.set_progress_handler(None, 0)  # never let a cancellation interrupt the rollback
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+
+    @classmethod
+    def signature(cls, *db_names):
+        """Return a value that changes whenever one of ``db_names`` is written, from any connection.
+
+        ``PRAGMA data_version`` only moves for commits made by other
+        connections, so the shared connection's own ``total_changes`` is
+        included as well.
+        """
+        signature = []
+        for db_name in db_names:
+            with cls.connection(db_name) as conn:
+                signature += [conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes]
+        return tuple(signature)
+
+    @classmethod
+    def close_all(cls):
+        with cls._registry_lock:
+            for key, conn in cls._connections.items():
+                with cls._locks[key]:
+                    conn.close()
+            cls._connections.clear()
+            cls._locks.clear()
+
+
+# Utility class for database operations
+class DatabaseUtility:
+    @staticmethod
+    def execute_query(db_name, query, params=(), fetch=False):
+        with ConnectionManager.connection(db_name) as conn:
+            cursor = conn.execute(query, params)
+            return cursor.fetchall() if fetch else None
+
+
+# Schema and seed data, grouped per database file. Each entry lists the DDL to
+# run and the seed batches as (insert statement, rows, only_if_empty_table).
+SCHEMA = {
+    "user": {
+        "tables": ["""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                password TEXT NOT NULL,
+                role TEXT NOT NULL,
+                first_name TEXT,
+                last_name TEXT,
+                phone TEXT,
+                email TEXT,
+                employee_id TEXT,
+                address TEXT
+            )
+        """],
+        "seed": [("""
+            INSERT OR IGNORE INTO users (username, password, role, first_name, last_name, phone, email, employee_id, address)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            ('manager', 'man123', 'Manager', 'Default', 'Manager', '1234567890', 'manager@example.com', '1000', '123 Manager St'),
+            ('employee1', 'emp123', 'Employee', 'John', 'Doe', '555-1111', 'john.doe@example.com', '2001', '456 Elm St'),
+            ('employee2', 'emp123', 'Employee', 'Jane', 'Smith', '555-2222', 'jane.smith@example.com', '2002', '789 Oak St'),
+            ('employee3', 'emp123', 'Employee', 'Alice', 'Johnson', '555-3333', 'alice.johnson@example.com', '2003', '123 Pine St'),
+            ('employee4', 'emp123', 'Employee', 'Michael', 'Brown', '555-4444', 'michael.brown@example.com', '2004', '456 Maple St'),
+            ('employee5', 'emp123', 'Employee', 'Emily', 'Davis', '555-5555', 'emily.davis@example.com', '2005', '789 Birch St'),
+        ], None)],
+    },
+    "customer": {
+        "tables": ["""
+            CREATE TABLE IF NOT EXISTS customers (
+                name TEXT PRIMARY KEY,
+                address TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                license_number TEXT NOT NULL,
+                insurance_company TEXT NOT NULL,
+                policy_number TEXT NOT NULL
+            )
+        """, """
+            CREATE TABLE IF NOT EXISTS feedback (
+                feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                customer_name TEXT NOT NULL,
+                rating INTEGER NOT NULL,
+                comment TEXT,
+                date TEXT NOT NULL
+            )
+        """],
+        "seed": [("""
+            INSERT OR IGNORE INTO customers (name, address, phone, license_number, insurance_company, policy_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            ("John Doe", "123 Elm Street", "555-1234", "LN12345", "ABC Insurance", "PN98765"),
+            ("Jane Smith", "456 Oak Avenue", "555-5678", "LN67890", "XYZ Insurance", "PN54321"),
+            ("Alice Johnson", "789 Pine Road", "555-9012", "LN11223", "DEF Insurance", "PN11223"),
+        ], None), ("""
+            INSERT INTO feedback (customer_name, rating, comment, date)
+            VALUES (?, ?, ?, ?)
+        """, [
+            ("John Doe", 5, "Excellent service! Highly recommend.", "2025-03-01"),
+            ("Jane Smith", 4, "Good experience, but the car was slightly dirty.", "2025-03-02"),
+            ("Alice Johnson", 3, "Average service. Could be better.", "2025-03-03"),
+            ("Michael Brown", 5, "Amazing staff and great cars!", "2025-03-04"),
+            ("Emily Davis", 2, "Had issues with the car's AC.", "2025-03-05"),
+        ], "feedback")],
+    },
+    "vehicle": {
+        "tables": ["""
+            CREATE TABLE IF NOT EXISTS vehicles (
+                car_id INTEGER PRIMARY KEY,
+                brand TEXT NOT NULL,
+                model TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                rate_per_day REAL NOT NULL,
+                rate_per_km REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'Available'
+            )
+        """],
+        "seed": [("""
+            INSERT OR IGNORE INTO vehicles (car_id, brand, model, year, rate_per_day, rate_per_km, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (10, "Toyota", "Corolla", 2020, 50.0, 0.2, "Available"),
+            (11, "Honda", "Civic", 2019, 45.0, 0.18, "Ongoing"),
+            (12, "Ford", "Focus", 2021, 55.0, 0.25, "Upcoming"),
+            (13, "Chevrolet", "Malibu", 2018, 40.0, 0.15, "Available"),
+            (14, "Nissan", "Altima", 2020, 50.0, 0.2, "Available"),
+        ], None)],
+    },
+    "reservations": {
+        "tables": ["""
+            CREATE TABLE IF NOT EXISTS reservations (
+                reservation_id INTEGER PRIMARY KEY,
+                customer_name TEXT NOT NULL,
+                car_id INTEGER NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                FOREIGN KEY (car_id) REFERENCES vehicles (car_id)
+            )
+        """],
+        "seed": [("""
+            INSERT OR IGNORE INTO reservations (reservation_id, customer_name, car_id, start_date, end_date, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (1, "John Doe", 10, "2025-01-01", "2025-01-10", "Completed"),
+            (2, "Jane Smith", 11, "2025-03-10", "2025-03-15", "Ongoing"),
+            (3, "Alice Johnson", 12, "2025-03-20", "2025-03-25", "Upcoming"),
+        ], None)],
+    },
+    "logs": {
+        "tables": ["""
+            CREATE TABLE IF NOT EXISTS logs (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user TEXT NOT NULL,
+                action TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            )
+        """],
+        "seed": [("""
+            INSERT INTO logs (user, action, timestamp)
+            VALUES (?, ?, ?)
+        """, [
+            ("manager", "Added a new vehicle: Toyota Corolla", "2025-03-20 10:00:00"),
+            ("employee1", "Updated reservation #1", "2025-03-21 14:30:00"),
+            ("manager", "Deleted vehicle #12", "2025-03-22 09:15:00"),
+            ("employee2", "Added a new customer: John Doe", "2025-03-23 11:45:00"),
+            ("manager", "Generated financial report for March 2025", "2025-03-24 08:00:00"),
+        ], "logs")],
+    },
+}
+
+
+# Vehicle type -> the classes a vehicle of that type can be rented as
+VEHICLE_CLASSES = {
+    "Car": [
+        "Compact Car", "Premium Car", "Sporty Car", "Hybrid Car", "Economy Car", "Convertible Car",
+        "Intermediate Car", "Luxury Car", "Full Size Car", "Standard Car", "Elite Car", "Electric Car",
+    ],
+    "Truck": ["Full Size Pickup", "Box Truck", "Small Pickup", "Refrigerated Truck"],
+    "SUV": [
+        "Standard SUV", "Premium & Luxury SUV", "Electric SUV", "Intermediate SUV", "Compact SUV",
+        "Jeeps", "Full Size SUV", "Hybrid SUV",
+    ],
+    "Van": ["Cargo Van", "Passenger Van", "Refrigerated Van", "Minivan"],
+}
+
+# Integer codes stored in vehicles.type_id and vehicles.class_id, and in their lookup tables. A class
+# code is its type's code * 100 plus its position in the type's list, so new classes must be appended.
+VEHICLE_TYPE_IDS = {vehicle_type: code for code, vehicle_type in enumerate(VEHICLE_CLASSES, start=1)}
+VEHICLE_CLASS_IDS = {
+    vehicle_class: VEHICLE_TYPE_IDS[vehicle_type] * 100 + position
+    for vehicle_type, classes in VEHICLE_CLASSES.items()
+    for position, vehicle_class in enumerate(classes, start=1)
+}
+
+
+def vehicle_codes(vehicle_type, vehicle_class):
+    """Return (type_id, class_id) for a vehicle type and one of its classes."""
+    if vehicle_type not in VEHICLE_CLASSES:
+        raise ValueError(f"Vehicle type {vehicle_type!r} is not one of {', '.join(VEHICLE_CLASSES)}.")
+    if vehicle_class not in VEHICLE_CLASSES[vehicle_type]:
+        raise ValueError(f"Vehicle class {vehicle_class!r} is not a {vehicle_type} class.")
+    return VEHICLE_TYPE_IDS[vehicle_type], VEHICLE_CLASS_IDS[vehicle_class]
+
+
+def vehicle_lookup_statements():
+    """Create the vehicle type and class lookup tables and fill them from VEHICLE_CLASSES."""
+    types = ", ".join(f"({code}, '{name}')" for name, code in VEHICLE_TYPE_IDS.items())
+    classes = ", ".join(f"({code}, {code // 100}, '{name}')" for name, code in VEHICLE_CLASS_IDS.items())
+    return [
+        "CREATE TABLE IF NOT EXISTS vehicle_types (type_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        """
+        CREATE TABLE IF NOT EXISTS vehicle_classes (
+            class_id INTEGER PRIMARY KEY,
+            type_id INTEGER NOT NULL REFERENCES vehicle_types (type_id),
+            name TEXT NOT NULL UNIQUE
+        )
+        """,
+        f"INSERT OR IGNORE INTO vehicle_types (type_id, name) VALUES {types}",
+        f"INSERT OR IGNORE INTO vehicle_classes (class_id, type_id, name) VALUES {classes}",
+    ]
+
+
+# Full-text indexes: FTS5 table -> (database key, content table, content rowid column, indexed columns).
+# They are external-content tables kept in sync by triggers. customers has no
+# INTEGER PRIMARY KEY, so its rowids can change on VACUUM; rebuild it afterwards.
+FTS_INDEXES = {
+    "customers_fts": ("customer", "customers", "rowid", ("name", "address", "phone", "license_number")),
+    "feedback_fts": ("customer", "feedback", "feedback_id", ("comment",)),
+    "logs_fts": ("logs", "logs", "log_id", ("action",)),
+}
+
+
+def fts_triggers(fts):
+    """The insert, delete and update triggers that keep ``fts`` in step with its content table."""
+    _, table, rowid, columns = FTS_INDEXES[fts]
+    names = ", ".join(columns)
+    new = ", ".join(f"NEW.{column}" for column in columns)
+    old = ", ".join(f"OLD.{column}" for column in columns)
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', OLD.{rowid}, {old});"
+    insert = f"INSERT INTO {fts} (rowid, {names}) VALUES (NEW.{rowid}, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+def fts_statements(fts):
+    """Create ``fts``, its sync triggers, and index the rows already in the content table."""
+    _, table, rowid, columns = FTS_INDEXES[fts]
+    create = (f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+              f"{', '.join(columns)}, content='{table}', content_rowid='{rowid}', prefix='2 3')")
+    return [create, *fts_triggers(fts), f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"]
+
+
+# Schema migrations applied on top of SCHEMA, as (version, database key,
+# statements). Versions are tracked per file, so each list must stay ordered.
+MIGRATIONS = [
+    (2, "reservations", [
+        "CREATE INDEX IF NOT EXISTS idx_reservations_car_dates ON reservations (car_id, start_date, end_date)",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_status ON reservations (status)",
+    ]),
+    (2, "vehicle", [
+        "CREATE INDEX IF NOT EXISTS idx_vehicles_status ON vehicles (status)",
+    ]),
+    (2, "logs", [
+        "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_user ON logs (user)",
+    ]),
+    (2, "customer", [
+        "CREATE INDEX IF NOT EXISTS idx_feedback_date ON feedback (date)",
+    ]),
+    # Reservation counts per status, kept current by triggers for the dashboard
+    (3, "reservations", [
+        "CREATE INDEX IF NOT EXISTS idx_reservations_start_date ON reservations (start_date)",
+        """
+        CREATE TABLE IF NOT EXISTS reservation_counters (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "DELETE FROM reservation_counters",
+        "INSERT INTO reservation_counters (status, count) SELECT status, COUNT(*) FROM reservations GROUP BY status",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_count_insert AFTER INSERT ON reservations
+        BEGIN
+            INSERT INTO reservation_counters (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_count_update AFTER UPDATE OF status ON reservations
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE reservation_counters SET count = count - 1 WHERE status = OLD.status;
+            INSERT INTO reservation_counters (status, count) VALUES (NEW.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_count_delete AFTER DELETE ON reservations
+        BEGIN
+            UPDATE reservation_counters SET count = count - 1 WHERE status = OLD.status;
+        END
+        """,
+    ]),
+    # Full-text search over customers, feedback comments and log actions
+    (3, "customer", fts_statements("customers_fts") + fts_statements("feedback_fts")),
+    (3, "logs", fts_statements("logs_fts")),
+    # Write counter for reservations.db, recorded by the occupancy map to tell whether it is current
+    (4, "reservations", [
+        "CREATE TABLE IF NOT EXISTS occupancy_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO occupancy_version (id, version) VALUES (1, 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_occupancy_insert AFTER INSERT ON reservations
+        BEGIN
+            UPDATE occupancy_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_occupancy_update
+        AFTER UPDATE OF car_id, start_date, end_date, status ON reservations
+        BEGIN
+            UPDATE occupancy_version SET version = version + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reservations_occupancy_delete AFTER DELETE ON reservations
+        BEGIN
+            UPDATE occupancy_version SET version = version + 1;
+        END
+        """,
+    ]),
+    # Kilometers plus type and class as integer codes; NULL codes mean the car is not classified yet
+    (4, "vehicle", vehicle_lookup_statements() + [
+        "ALTER TABLE vehicles ADD COLUMN kilometers INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE vehicles ADD COLUMN type_id INTEGER REFERENCES vehicle_types (type_id)",
+        "ALTER TABLE vehicles ADD COLUMN class_id INTEGER REFERENCES vehicle_classes (class_id)",
+        "CREATE INDEX IF NOT EXISTS idx_vehicles_type_class_status ON vehicles (type_id, class_id, status)",
+    ]),
+]
+
+# Hot queries and the index each one is expected to use, as (database key, query, params, index)
+HOT_QUERIES = [
+    ("vehicle", "SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles WHERE status = ?",
+     ("Available",), "idx_vehicles_status"),
+    ("vehicle", "SELECT car_id FROM vehicles WHERE type_id = ? AND class_id = ? AND status = ?",
+     (3, 302, "Available"), "COVERING INDEX idx_vehicles_type_class_status"),
+    ("reservations", "SELECT reservation_id FROM reservations WHERE car_id = ? AND start_date < ? AND end_date > ?",
+     (10, "2025-02-01", "2025-01-01"), "idx_reservations_car_dates"),
+    ("reservations", "SELECT reservation_id, car_id FROM reservations WHERE status = ?",
+     ("Upcoming",), "idx_reservations_status"),
+    ("reservations", "SELECT reservation_id, customer_name, car_id, start_date, end_date FROM reservations "
+     "WHERE start_date >= ? AND status NOT IN ('Completed', 'Cancelled', 'No Show') ORDER BY start_date LIMIT ?",
+     ("2025-03-01", 10), "idx_reservations_start_date"),
+    ("logs", "SELECT log_id, user, action, timestamp FROM logs WHERE timestamp >= ? ORDER BY timestamp",
+     ("2025-03-01",), "idx_logs_timestamp"),
+    ("logs", "SELECT log_id, action, timestamp FROM logs WHERE user = ?",
+     ("manager",), "idx_logs_user"),
+    ("customer", "SELECT customer_name, rating, comment, date FROM feedback WHERE date >= ? ORDER BY date",
+     ("2025-03-01",), "idx_feedback_date"),
+]
+
+
+class SchemaMigrator:
+    """Applies MIGRATIONS in version order and checks that hot queries use their indexes."""
+
+    @staticmethod
+    def latest_version(key):
+        versions = [version for version, db_key, _ in MIGRATIONS if db_key == key]
+        return max(versions, default=DatabaseManager.SCHEMA_VERSION)
+
+    @staticmethod
+    def migrate(key, current_version):
+        """Apply every pending migration for one file, then refresh planner statistics."""
+        db_name = DATABASES[key]
+        pending = [(version, statements) for version, db_key, statements in MIGRATIONS
+                   if db_key == key and version > current_version]
+        for version, statements in pending:
+            with ConnectionManager.transaction(db_name, mode="IMMEDIATE") as conn:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+        if pending:
+            with ConnectionManager.connection(db_name) as conn:
+                conn.execute("PRAGMA analysis_limit = 1000")  # bounded sampling keeps ANALYZE fast on large tables
+                conn.execute("ANALYZE")
+
+    @staticmethod
+    def explain(key, query, params=()):
+        with ConnectionManager.connection(DATABASES[key]) as conn:
+            return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+    @staticmethod
+    def check_query_plans():
+        """Return (query, plan, expected index, ok) for every entry in HOT_QUERIES."""
+        report = []
+        for key, query, params, index in HOT_QUERIES:
+            plan = SchemaMigrator.explain(key, query, params)
+            report.append((query, plan, index, any(index in step for step in plan)))
+        return report
+
+
+class FullTextIndex:
+    """Maintenance for the FTS5 tables in FTS_INDEXES."""
+
+    @staticmethod
+    def _tables(key):
+        return [fts for fts, spec in FTS_INDEXES.items() if spec[0] == key]
+
+    @staticmethod
+    @contextmanager
+    def bulk_load(key):
+        """Pause the sync triggers of ``key``'s FTS tables during a bulk insert, then rebuild them.
+
+        One rebuild is several times faster than indexing rows one at a time
+        through the triggers. If the process dies midway, ``repair()`` restores
+        the triggers and the index the next time the databases are initialized.
+        """
+        with ConnectionManager.transaction(DATABASES[key], mode="IMMEDIATE") as conn:
+            for fts in FullTextIndex._tables(key):
+                for action in ("insert", "delete", "update"):
+                    conn.execute(f"DROP TRIGGER IF EXISTS trg_{fts}_{action}")
+        try:
+            yield
+        finally:
+            FullTextIndex.rebuild(key)
+
+    @staticmethod
+    def repair():
+        """Rebuild the FTS tables of every file whose sync triggers are missing, e.g. after an interrupted bulk load.
+
+        Returns the database keys that were rebuilt.
+        """
+        repaired = []
+        for key in sorted({spec[0] for spec in FTS_INDEXES.values()}):
+            tables = FullTextIndex._tables(key)
+            expected = {f"trg_{fts}_{action}" for fts in tables for action in ("insert", "delete", "update")}
+            with ConnectionManager.connection(DATABASES[key]) as conn:
+                names = {name for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+            if set(tables) <= names and not expected <= names:
+                FullTextIndex.rebuild(key)
+                repaired.append(key)
+        return repaired
+
+    @staticmethod
+    def rebuild(key):
+        """Recreate the sync triggers and reindex every FTS table of one database file."""
+        with ConnectionManager.transaction(DATABASES[key], mode="IMMEDIATE") as conn:
+            for fts in FullTextIndex._tables(key):
+                for trigger in fts_triggers(fts):
+                    conn.execute(trigger)
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+# Database initialization
+class DatabaseManager:
+    """Handles database operations."""
+    # Bump when SCHEMA changes; stored per file in PRAGMA user_version
+    SCHEMA_VERSION = 1
+
+    @staticmethod
+    def schema_version(db_name):
+        with ConnectionManager.connection(db_name) as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @staticmethod
+    def initialize_database():
+        """Create, seed and migrate any database file that is behind its latest version.
+
+        A warm start costs one ``PRAGMA user_version`` read per file, plus a
+        look at the FTS sync triggers. A cold start runs the DDL and the seed
+        batches for each file in one transaction, then applies MIGRATIONS.
+        """
+        for key, spec in SCHEMA.items():
+            db_name = DATABASES[key]
+            version = DatabaseManager.schema_version(db_name)
+            if version >= SchemaMigrator.latest_version(key):
+                continue
+            if version < DatabaseManager.SCHEMA_VERSION:
+                DatabaseManager._create_base_schema(db_name, spec)
+            SchemaMigrator.migrate(key, max(version, DatabaseManager.SCHEMA_VERSION))
+        FullTextIndex.repair()
+
+    @staticmethod
+    def _create_base_schema(db_name, spec):
+        with ConnectionManager.transaction(db_name, mode="IMMEDIATE") as conn:
+            for ddl in spec["tables"]:
+                conn.execute(ddl)
+            for insert, rows, only_if_empty in spec["seed"]:
+                if only_if_empty and conn.execute(f"SELECT 1 FROM {only_if_empty} LIMIT 1").fetchone():
+                    continue
+                conn.executemany(insert, rows)
+            conn.execute(f"PRAGMA user_version = {DatabaseManager.SCHEMA_VERSION}")
+
+
+if __name__ == "__main__":
+    DatabaseManager.initialize_database()
+    for query, plan, index, ok in SchemaMigrator.check_query_plans():
+        print(f"[{'ok' if ok else 'MISSING ' + index}] {query}")
+        for step in plan:
+            print(f"    {step}")
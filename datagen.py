@@ -0,0 +1,268 @@
+import argparse
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from booking import BookingEngine
+from database import DATABASES, VEHICLE_CLASS_IDS, ConnectionManager, DatabaseManager, FullTextIndex
+
+GENERATOR_BATCH_SIZE = 50000  # rows per executemany; each batch commits on its own
+
+# Vehicle class -> (share of the fleet, models as (brand, model, rate per day))
+CLASS_MIX = {
+    "Economy Car": (0.25, [("Toyota", "Yaris", 35.0), ("Kia", "Rio", 32.0), ("Hyundai", "Accent", 33.0)]),
+    "Compact Car": (0.20, [("Toyota", "Corolla", 45.0), ("Honda", "Civic", 50.0), ("Ford", "Focus", 40.0)]),
+    "Full Size Car": (0.12, [("Toyota", "Camry", 60.0), ("Honda", "Accord", 62.0)]),
+    "Luxury Car": (0.05, [("BMW", "5 Series", 120.0), ("Mercedes", "E-Class", 130.0)]),
+    "Electric Car": (0.06, [("Tesla", "Model 3", 110.0), ("Nissan", "Leaf", 70.0)]),
+    "Compact SUV": (0.12, [("Toyota", "RAV4", 65.0), ("Honda", "CR-V", 66.0)]),
+    "Full Size SUV": (0.08, [("Chevrolet", "Tahoe", 95.0), ("Ford", "Expedition", 98.0)]),
+    "Full Size Pickup": (0.06, [("Ford", "F-150", 90.0), ("Ram", "1500", 88.0)]),
+    "Minivan": (0.06, [("Honda", "Odyssey", 75.0), ("Chrysler", "Pacifica", 78.0)]),
+}
+
+# Relative rental demand per calendar month (January first); idle gaps shrink as demand rises
+SEASONALITY = [0.7, 0.7, 0.85, 0.95, 1.05, 1.35, 1.6, 1.5, 1.0, 0.9, 0.8, 1.2]
+
+# Feedback star ratings (1 to 5) and their weights, with a comment pool per rating
+RATING_WEIGHTS = [0.05, 0.07, 0.13, 0.35, 0.40]
+COMMENTS = {
+    1: ["Car was dirty and late.", "Terrible experience."],
+    2: ["Pickup took too long.", "Car had a warning light on."],
+    3: ["It was okay.", "Average service."],
+    4: ["Good car, friendly staff.", "Smooth rental."],
+    5: ["Great service!", "Excellent car, will rent again."],
+}
+
+LOG_ACTIONS = [
+    "Booked car #{car} for {customer}", "Updated reservation #{reservation} to Completed",
+    "Added a new customer: {customer}", "Updated vehicle #{car}", "Viewed financial reports",
+]
+
+FIRST_NAMES = ["James", "Mary", "John", "Linda", "Robert", "Susan", "Michael", "Karen", "David", "Lisa",
+               "Ahmed", "Mei", "Carlos", "Priya", "Olga", "Kenji", "Fatima", "Lucas", "Amara", "Noah"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Wilson", "Anderson", "Thomas", "Moore",
+              "Khan", "Chen", "Lopez", "Patel", "Ivanova", "Sato", "Ali", "Silva", "Okafor", "Martin"]
+INSURERS = ["ABC Insurance", "XYZ Insurance", "Safe Drive", "Shield Mutual"]
+
+
+def _batches(rows, size=GENERATOR_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def customer_name(index):
+    """Deterministic, unique customer name for ``index``."""
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    cycle = index // (len(FIRST_NAMES) * len(LAST_NAMES))
+    return f"{first} {last}" if cycle == 0 else f"{first} {last} {cycle + 1}"
+
+
+class DataGenerator:
+    """Fills the application databases with a deterministic synthetic history.
+
+    Every table is produced by a generator and written in ``executemany``
+    batches that commit one at a time. Memory use therefore stays bounded by
+    the batch size, however large the dataset. Each table draws from its own
+    ``random.Random`` derived from ``seed``, so a given seed and ``reference``
+    date always produce the same rows.
+
+    Per car, rentals follow one another with idle gaps that shrink in busy
+    months (SEASONALITY). A ``back_to_back`` share of rentals start on the day
+    the previous one ended. An ``overlap`` share are followed by a clashing
+    request for the same car, which ends up Cancelled or No Show.
+    """
+
+    def __init__(self, vehicles=1000, customers=5000, employees=50, logs=10000, seed=0,
+                 history_days=730, horizon_days=60, mean_rental_days=4, mean_idle_days=6,
+                 back_to_back=0.3, overlap=0.05, cancel_rate=0.04, feedback_rate=0.3,
+                 class_mix=None, reference=None):
+        self.vehicles = vehicles
+        self.customers = customers
+        self.employees = employees
+        self.logs = logs
+        self.seed = seed
+        self.history_days = history_days
+        self.horizon_days = horizon_days
+        self.mean_rental_days = mean_rental_days
+        self.mean_idle_days = mean_idle_days
+        self.back_to_back = back_to_back
+        self.overlap = overlap
+        self.cancel_rate = cancel_rate
+        self.feedback_rate = feedback_rate
+        self.class_mix = class_mix or CLASS_MIX
+        self.reference = reference or date.today()
+        self.first = self.reference - timedelta(days=history_days)
+
+    def _rng(self, table):
+        return random.Random(f"{self.seed}:{table}")
+
+    def _random_day(self, rng):
+        return self.first + timedelta(days=rng.randrange(self.history_days))
+
+    def vehicle_rows(self, first_id):
+        rng = self._rng("vehicles")
+        classes = list(self.class_mix)
+        weights = [self.class_mix[name][0] for name in classes]
+        for car_id in range(first_id, first_id + self.vehicles):
+            vehicle_class = rng.choices(classes, weights)[0]
+            brand, model, rate = rng.choice(self.class_mix[vehicle_class][1])
+            rate = round(rate * rng.uniform(0.9, 1.1), 2)
+            year = rng.randint(2015, self.reference.year)
+            kilometers = int((self.reference.year - year + rng.random()) * rng.uniform(8000, 25000))
+            class_id = VEHICLE_CLASS_IDS[vehicle_class]
+            yield car_id, brand, model, year, kilometers, rate, round(rate / 200, 2), class_id // 100, class_id
+
+    def reservation_rows(self, first_id):
+        rng = self._rng("reservations")
+        today = self.reference
+        last = today + timedelta(days=self.horizon_days)
+        for car_id in range(first_id, first_id + self.vehicles):
+            day = self.first + timedelta(days=rng.randrange(30))
+            while day < last:
+                end = day + timedelta(days=1 + int(rng.expovariate(1 / self.mean_rental_days)))
+                customer = customer_name(rng.randrange(self.customers))
+                if end <= today:
+                    status = "Cancelled" if rng.random() < self.cancel_rate else "Completed"
+                elif day <= today:
+                    status = "Ongoing"
+                else:
+                    status = "Upcoming" if rng.random() < 0.7 else "Booked"
+                yield customer, car_id, day.isoformat(), end.isoformat(), status
+
+                if rng.random() < self.overlap:
+                    clash = day + timedelta(days=rng.randrange((end - day).days))
+                    yield (customer_name(rng.randrange(self.customers)), car_id, clash.isoformat(),
+                           (clash + timedelta(days=rng.randint(1, 3))).isoformat(),
+                           "No Show" if clash <= today and rng.random() < 0.5 else "Cancelled")
+
+                if rng.random() < self.back_to_back:
+                    day = end
+                else:
+                    demand = SEASONALITY[end.month - 1]
+                    day = end + timedelta(days=1 + int(rng.expovariate(demand / self.mean_idle_days)))
+
+    def customer_rows(self):
+        rng = self._rng("customers")
+        for index in range(self.customers):
+            yield (customer_name(index), f"{rng.randint(1, 9999)} {rng.choice(LAST_NAMES)} Street",
+                   f"555-{rng.randint(0, 9999):04d}", f"LN{index:08d}", rng.choice(INSURERS), f"PN{rng.randint(0, 10**8):08d}")
+
+    def feedback_rows(self):
+        rng = self._rng("feedback")
+        for index in range(self.customers):
+            if rng.random() < self.feedback_rate:
+                rating = rng.choices(range(1, 6), RATING_WEIGHTS)[0]
+                yield customer_name(index), rating, rng.choice(COMMENTS[rating]), self._random_day(rng).isoformat()
+
+    def user_rows(self):
+        rng = self._rng("users")
+        for index in range(self.employees):
+            role = "Manager" if index % 10 == 0 else "Employee"
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield (f"staff{index:05d}", f"pass{index:05d}", role, first, last, f"555-{rng.randint(0, 9999):04d}",
+                   f"{first.lower()}.{last.lower()}{index}@example.com", str(3000 + index), f"{rng.randint(1, 999)} Main St")
+
+    def log_rows(self):
+        rng = self._rng("logs")
+        start = datetime.combine(self.first, datetime.min.time())
+        step = self.history_days * 86400 / max(self.logs, 1)
+        offset = 0.0
+        for _ in range(self.logs):
+            offset += rng.expovariate(1 / step)
+            action = rng.choice(LOG_ACTIONS).format(
+                car=rng.randint(1, max(self.vehicles, 1)), customer=customer_name(rng.randrange(self.customers)),
+                reservation=rng.randint(1, max(self.vehicles, 1) * 10),
+            )
+            timestamp = start + timedelta(seconds=min(offset, self.history_days * 86400 - 1))
+            yield f"staff{rng.randrange(max(self.employees, 1)):05d}", action, timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _write(db_name, insert, rows):
+        count = 0
+        for batch in _batches(rows):
+            with ConnectionManager.transaction(db_name) as conn:
+                conn.executemany(insert, batch)
+            count += len(batch)
+        return count
+
+    def generate(self):
+        """Create the schema if needed, append the synthetic rows and return the row count per table."""
+        DatabaseManager.initialize_database()
+        with ConnectionManager.connection(DATABASES["vehicle"]) as conn:
+            first_id = conn.execute("SELECT COALESCE(MAX(car_id), 0) + 1 FROM vehicles").fetchone()[0]
+
+        counts = {}
+        counts["users"] = self._write(DATABASES["user"], """
+            INSERT OR IGNORE INTO users (username, password, role, first_name, last_name, phone, email, employee_id, address)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, self.user_rows())
+        with FullTextIndex.bulk_load("customer"):
+            counts["customers"] = self._write(DATABASES["customer"], """
+                INSERT OR IGNORE INTO customers (name, address, phone, license_number, insurance_company, policy_number)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, self.customer_rows())
+            counts["feedback"] = self._write(DATABASES["customer"], """
+                INSERT INTO feedback (customer_name, rating, comment, date) VALUES (?, ?, ?, ?)
+            """, self.feedback_rows())
+        counts["vehicles"] = self._write(DATABASES["vehicle"], """
+            INSERT INTO vehicles (car_id, brand, model, year, kilometers, rate_per_day, rate_per_km, type_id, class_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, self.vehicle_rows(first_id))
+        counts["reservations"] = self._write(DATABASES["reservations"], """
+            INSERT INTO reservations (customer_name, car_id, start_date, end_date, status) VALUES (?, ?, ?, ?, ?)
+        """, self.reservation_rows(first_id))
+        with FullTextIndex.bulk_load("logs"):
+            counts["logs"] = self._write(DATABASES["logs"], """
+                INSERT INTO logs (user, action, timestamp) VALUES (?, ?, ?)
+            """, self.log_rows())
+
+        # Cars out on an ongoing rental are not available
+        with BookingEngine.transaction() as conn:
+            conn.execute("""
+                UPDATE main.vehicles SET status = 'Booked'
+                WHERE car_id >= ? AND car_id IN (SELECT car_id FROM res.reservations WHERE status = 'Ongoing')
+            """, (first_id,))
+        for key in ("user", "customer", "vehicle", "reservations", "logs"):
+            with ConnectionManager.connection(DATABASES[key]) as conn:
+                conn.execute("ANALYZE")
+        return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the car rental databases with synthetic data.")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--back-to-back", type=float, default=0.3, help="share of rentals starting the day the last one ended")
+    parser.add_argument("--overlap", type=float, default=0.05, help="share of rentals followed by a clashing request")
+    parser.add_argument("--feedback-rate", type=float, default=0.3, help="share of customers who left feedback")
+    parser.add_argument("--reference", type=date.fromisoformat, default=None, help="'today' for the history (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.directory)  # DATABASES holds relative file names
+    generator = DataGenerator(
+        vehicles=args.vehicles, customers=args.customers, employees=args.employees, logs=args.logs,
+        seed=args.seed, history_days=args.history_days, back_to_back=args.back_to_back,
+        overlap=args.overlap, feedback_rate=args.feedback_rate, reference=args.reference,
+    )
+    try:
+        for table, count in generator.generate().items():
+            print(f"{table:<14}{count:>12,}")
+    finally:
+        ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+
+from database import DATABASES
+from logstore import LogStore
+
+EXPORT_BATCH_SIZE = 5000     # rows per fetchmany; the only rows held in memory at a time
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_GZIP_LEVEL = 6        # zlib's default; level 9 costs about twice the time for a few percent
+
+# Exportable table -> (database key, columns, key column, date column, status column or None)
+EXPORT_TABLES = {
+    "reservations": ("reservations", ("reservation_id", "customer_name", "car_id", "start_date", "end_date", "status"),
+                     "reservation_id", "start_date", "status"),
+    "logs": ("logs", ("log_id", "user", "action", "timestamp"), "log_id", "timestamp", None),
+    "feedback": ("customer", ("feedback_id", "customer_name", "rating", "comment", "date"), "feedback_id", "date", None),
+}
+
+
+class ExportCancelled(Exception):
+    """Raised by DataExporter.export when its cancel event is set; the partial file is removed."""
+
+
+class DataExporter:
+    """Streams a table to CSV or JSON Lines, optionally gzip-compressed.
+
+    Rows are read with ``fetchmany`` from a private read-only connection
+    inside one read transaction. The file is a consistent snapshot, and
+    memory stays at one batch however large the table is. Under WAL,
+    writers carry on while an export runs. The shared connections are not
+    held, so the app's own queries are not blocked either. A logs export
+    whose range reaches months already moved to the log archive reads
+    logs.db and those months through LogStore, in timestamp order.
+    """
+
+    @staticmethod
+    def file_format(path):
+        """Return ("csv" | "jsonl", compressed) implied by a file name such as ``reservations.csv.gz``."""
+        name = path.lower()
+        compressed = name.endswith(".gz")
+        if compressed:
+            name = name[:-3]
+        fmt = os.path.splitext(name)[1].lstrip(".")
+        return (fmt if fmt in EXPORT_FORMATS else "csv"), compressed
+
+    @staticmethod
+    def _query(table, date_from=None, date_to=None, statuses=None):
+        """Build the count and select statements for ``table`` with the given filters (dates are inclusive)."""
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table {table!r}; choose one of {', '.join(EXPORT_TABLES)}.")
+        _, columns, key, date_column, status_column = EXPORT_TABLES[table]
+        conditions, params = [], []
+        if date_from:
+            conditions.append(f"{date_column} >= ?")
+            params.append(date.fromisoformat(date_from).isoformat())
+        if date_to:
+            # timestamps carry a time of day, so compare against the start of the next day
+            conditions.append(f"{date_column} < date(?, '+1 day')")
+            params.append(date.fromisoformat(date_to).isoformat())
+        if statuses:
+            if status_column is None:
+                raise ValueError(f"{table} has no status to filter on.")
+            placeholders = ", ".join("?" for _ in statuses)
+            # unary + keeps the planner on the date index or a table scan, which stream in order without a sort
+            conditions.append(f"+{status_column} IN ({placeholders})")
+            params.extend(statuses)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = f"{date_column}, {key}" if (date_from or date_to) else key  # the key breaks ties from the index
+        return (f"SELECT COUNT(*) FROM {table}{where}",
+                f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {order}", params)
+
+    @staticmethod
+    @contextmanager
+    def _batches(table, date_from, date_to, statuses, batch_size):
+        """Yield (total rows, iterator of row batches) for ``table`` with the given filters."""
+        count_query, select_query, params = DataExporter._query(table, date_from, date_to, statuses)
+        if table == "logs":
+            start = date_from or date.min.isoformat()
+            end = date_to or (date.max - timedelta(days=1)).isoformat()
+            if LogStore.archived_between(start, end):
+                with LogStore.partitions(start, end) as uris:
+                    rows = LogStore.merge(uris, start, end)
+                    yield LogStore.count(uris, start, end), iter(lambda: list(islice(rows, batch_size)), [])
+                return
+        conn = sqlite3.connect(f"file:{DATABASES[EXPORT_TABLES[table][0]]}?mode=ro", uri=True, isolation_level=None)
+        try:
+            conn.execute("BEGIN")  # one snapshot for the count and every batch
+            total = conn.execute(count_query, params).fetchone()[0]
+            cursor = conn.execute(select_query, params)
+            yield total, iter(lambda: cursor.fetchmany(batch_size), [])
+        finally:
+            conn.close()
+
+    @staticmethod
+    def export(table, path, fmt=None, compress=None, date_from=None, date_to=None, statuses=None,
+               progress=None, cancel=None, batch_size=EXPORT_BATCH_SIZE):
+        """Write the rows of ``table`` matching the filters to ``path`` and return how many were written.
+
+        ``fmt`` and ``compress`` default to what the file name implies.
+        ``progress(rows_written, total_rows)`` is called after every batch,
+        on the calling thread. Setting the ``cancel`` event stops the export
+        with ExportCancelled. A file is only left at ``path`` if the export
+        completes.
+        """
+        implied_format, implied_compress = DataExporter.file_format(path)
+        fmt = fmt or implied_format
+        compress = implied_compress if compress is None else compress
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; choose one of {', '.join(EXPORT_FORMATS)}.")
+        partial = f"{path}.part"
+        try:
+            with DataExporter._batches(table, date_from, date_to, statuses, batch_size) as (total, batches):
+                columns = EXPORT_TABLES[table][1]
+                if compress:
+                    out = gzip.open(partial, "wt", compresslevel=EXPORT_GZIP_LEVEL, encoding="utf-8", newline="")
+                else:
+                    out = open(partial, "w", encoding="utf-8", newline="")
+                written = 0
+                with out:
+                    writer = csv.writer(out) if fmt == "csv" else None
+                    if writer:
+                        writer.writerow(columns)
+                    if progress:
+                        progress(0, total)
+                    for rows in batches:
+                        if cancel is not None and cancel.is_set():
+                            raise ExportCancelled(f"Export of {table} cancelled after {written:,} rows.")
+                        if writer:
+                            writer.writerows(rows)
+                        else:
+                            out.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+                        written += len(rows)
+                        if progress:
+                            progress(written, total)
+            os.replace(partial, path)
+            return written
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+
+class ExportJob:
+    """Runs one DataExporter.export on a daemon thread.
+
+    The Tk thread polls ``rows``, ``total`` and ``finished``. After the job
+    finishes, ``error`` holds the exception it failed with, if any.
+    """
+
+    def __init__(self, table, path, **options):
+        self.table = table
+        self.path = path
+        self.rows = 0
+        self.total = None
+        self.error = None
+        self.finished = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(options,), name="export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self):
+        self._thread.join()
+
+    def _progress(self, rows, total):
+        self.rows, self.total = rows, total
+
+    def _run(self, options):
+        try:
+            self.rows = DataExporter.export(self.table, self.path, progress=self._progress, cancel=self._cancel, **options)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export reservations, logs or feedback to CSV or JSON Lines.")
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("path", help="output file; .csv or .jsonl, add .gz to compress")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None, help="overrides the file extension")
+    parser.add_argument("--from", dest="date_from", help="first date to include (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", help="last date to include (YYYY-MM-DD)")
+    parser.add_argument("--status", action="append", dest="statuses", help="reservation status to include; repeatable")
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.path)
+    os.chdir(args.directory)  # DATABASES holds relative file names
+    rows = DataExporter.export(
+        args.table, path, fmt=args.format, date_from=args.date_from, date_to=args.date_to, statuses=args.statuses,
+        progress=lambda written, total: print(f"\r{written:,} / {total:,} rows", end="", flush=True),
+    )
+    print(f"\nWrote {rows:,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import csv
+import math
+import os
+from contextlib import nullcontext
+from datetime import date
+
+from database import DATABASES, ConnectionManager, DatabaseManager, FullTextIndex, vehicle_codes
+
+IMPORT_CHUNK_SIZE = 10000              # rows validated and inserted per transaction
+IMPORT_MIN_YEAR = 1950                 # oldest model year accepted; the newest is next year
+IMPORT_BULK_INDEX_BYTES = 1024 * 1024  # customer files larger than this rebuild the search index once at the end
+
+VEHICLE_COLUMNS = ("brand", "model", "year", "kilometers", "rate_per_day", "rate_per_km", "vehicle_type", "vehicle_class")
+CUSTOMER_COLUMNS = ("name", "address", "phone", "license_number", "insurance_company", "policy_number")
+
+
+def _chunks(reader, size=IMPORT_CHUNK_SIZE):
+    """Yield lists of (line number, row) from a DictReader."""
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _number(value, name, minimum=0.0):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} {value!r} is not a number") from None
+    if not math.isfinite(number) or number < minimum:
+        raise ValueError(f"{name} must be a number of at least {minimum:g}")
+    return number
+
+
+class RejectionReport:
+    """Per-row rejection report: the CSV line number, the reason, then the row as it was read.
+
+    The file is only created once the first row is rejected.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, line, reason, row):
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(("line", "reason", *self.columns))
+        self._writer.writerow((line, reason, *(row.get(column, "") for column in self.columns)))
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class CsvImporter:
+    """Bulk CSV import of vehicles and customers.
+
+    The file is streamed and handled ``IMPORT_CHUNK_SIZE`` rows at a time.
+    Each chunk is validated in Python, and its valid rows are inserted with
+    one ``executemany`` in one transaction. Invalid rows go to a
+    RejectionReport with the reason, so a bad row never stops the import.
+    """
+
+    @staticmethod
+    def validate_vehicle(row):
+        """Return the vehicle row as typed values, or raise ValueError with the reason."""
+        brand, model = row["brand"].strip(), row["model"].strip()
+        if not brand or not model:
+            raise ValueError("brand and model are required")
+        try:
+            year = int(row["year"])
+        except ValueError:
+            raise ValueError(f"year {row['year']!r} is not a whole number") from None
+        if not IMPORT_MIN_YEAR <= year <= date.today().year + 1:
+            raise ValueError(f"year {year} is outside {IMPORT_MIN_YEAR}-{date.today().year + 1}")
+        kilometers = _number(row["kilometers"], "kilometers")
+        rate_per_day = _number(row["rate_per_day"], "rate_per_day")
+        rate_per_km = _number(row["rate_per_km"], "rate_per_km")
+        type_id, class_id = vehicle_codes(row["vehicle_type"].strip(), row["vehicle_class"].strip())
+        return brand, model, year, kilometers, rate_per_day, rate_per_km, type_id, class_id
+
+    @staticmethod
+    def validate_customer(row):
+        """Return the customer row with surrounding spaces removed, or raise ValueError with the reason."""
+        values = tuple(row[column].strip() for column in CUSTOMER_COLUMNS)
+        missing = [column for column, value in zip(CUSTOMER_COLUMNS, values) if not value]
+        if missing:
+            raise ValueError(f"{', '.join(missing)} required")
+        return values
+
+    @staticmethod
+    def _import(path, columns, report_path, insert_chunk, validate):
+        with open(path, encoding="utf-8-sig", newline="") as source:
+            reader = csv.DictReader(source, restval="")  # short rows read as empty values
+            missing = [column for column in columns if column not in (reader.fieldnames or ())]
+            if missing:
+                raise ValueError(f"{os.path.basename(path)} is missing the column(s): {', '.join(missing)}")
+            report = RejectionReport(report_path or f"{os.path.splitext(path)[0]}.rejected.csv", columns)
+            imported = 0
+            try:
+                for chunk in _chunks(reader):
+                    valid = []
+                    for line, row in chunk:
+                        try:
+                            valid.append((line, row, validate(row)))
+                        except ValueError as e:
+                            report.add(line, str(e), row)
+                    imported += insert_chunk(valid, report)
+            finally:
+                report.close()
+        return {"imported": imported, "rejected": report.count, "report": report.path if report.count else None}
+
+    @staticmethod
+    def import_vehicles(path, report_path=None):
+        """Add every valid vehicle in the CSV at ``path`` as an Available car.
+
+        Returns {"imported": n, "rejected": n, "report": path or None}.
+        """
+        def insert_chunk(valid, report):
+            with ConnectionManager.transaction(DATABASES["vehicle"]) as conn:
+                conn.executemany("""
+                    INSERT INTO vehicles (brand, model, year, kilometers, rate_per_day, rate_per_km, type_id, class_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [values for _, _, values in valid])
+            return len(valid)
+
+        return CsvImporter._import(path, VEHICLE_COLUMNS, report_path, insert_chunk, CsvImporter.validate_vehicle)
+
+    @staticmethod
+    def import_customers(path, report_path=None):
+        """Add every valid customer in the CSV at ``path``; names already taken, in the file or the table, are rejected.
+
+        Returns {"imported": n, "rejected": n, "report": path or None}.
+        """
+        seen = set()
+
+        def insert_chunk(valid, report):
+            with ConnectionManager.transaction(DATABASES["customer"], mode="IMMEDIATE") as conn:
+                names = [values[0] for _, _, values in valid]
+                placeholders = ", ".join("?" for _ in names)
+                existing = {
+                    name for (name,) in conn.execute(f"SELECT name FROM customers WHERE name IN ({placeholders})", names)
+                } if names else set()
+                rows = []
+                for line, row, values in valid:
+                    if values[0] in existing or values[0] in seen:
+                        report.add(line, f"customer {values[0]!r} already exists", row)
+                        continue
+                    seen.add(values[0])
+                    rows.append(values)
+                conn.executemany("""
+                    INSERT INTO customers (name, address, phone, license_number, insurance_company, policy_number)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+            return len(rows)
+
+        # Indexing a large file row by row through the FTS triggers costs far more than one rebuild
+        indexing = FullTextIndex.bulk_load("customer") if os.path.getsize(path) > IMPORT_BULK_INDEX_BYTES else nullcontext()
+        with indexing:
+            return CsvImporter._import(path, CUSTOMER_COLUMNS, report_path, insert_chunk, CsvImporter.validate_customer)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import vehicles or customers from a CSV file.")
+    parser.add_argument("kind", choices=["vehicles", "customers"])
+    parser.add_argument("path", help="CSV file with a header row")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    parser.add_argument("--report", help="where to write rejected rows (default: <file>.rejected.csv)")
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.path)
+    report = os.path.abspath(args.report) if args.report else None
+    os.chdir(args.directory)  # DATABASES holds relative file names
+    DatabaseManager.initialize_database()
+    try:
+        if args.kind == "vehicles":
+            result = CsvImporter.import_vehicles(path, report)
+        else:
+            result = CsvImporter.import_customers(path, report)
+    finally:
+        ConnectionManager.close_all()
+    print(f"Imported {result['imported']:,} {args.kind}, rejected {result['rejected']:,}")
+    if result["report"]:
+        print(f"Rejected rows: {result['report']}")
+
+
+if __name__ == "__main__":
+    main()
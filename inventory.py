@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+
+from booking import parse_period
+from database import DATABASES, VEHICLE_CLASS_IDS, VEHICLE_CLASSES, ConnectionManager, DatabaseUtility
+
+
+class FleetIndex:
+    """The fleet as NumPy columns with a precomputed index of each vehicle class, for search and pricing.
+
+    Vehicle rows are loaded once, sorted by car_id, and each class's row
+    positions are kept in their own array. A type or class filter is
+    therefore a lookup, not a scan. Search lists only cars whose status is
+    'Available', as ``BookingEngine.available_cars`` does: ``book()`` marks a
+    car 'Booked' whatever the dates, so it cannot be booked again until its
+    reservation closes. Whether a car is free for a period is read from
+    ``bookings``, the day map of reservations that hold a car, which booking
+    keeps current. The columns reload only when vehicle.db changes.
+    """
+
+    def __init__(self, bookings):
+        self.bookings = bookings
+        self._lock = threading.Lock()
+        self._signature = None
+        self._columns = None
+
+    @staticmethod
+    def _load():
+        vehicles = DatabaseUtility.execute_query(
+            DATABASES["vehicle"],
+            "SELECT car_id, brand, model, year, rate_per_day, rate_per_km, class_id, status FROM vehicles ORDER BY car_id",
+            fetch=True,
+        )
+        # Dense codes for bincount: 0 for unclassified cars, then the classes in VEHICLE_CLASS_IDS order
+        class_names = [None, *VEHICLE_CLASS_IDS]
+        dense = {class_id: code for code, class_id in enumerate(VEHICLE_CLASS_IDS.values(), start=1)}
+        class_codes = np.array([dense.get(row[6], 0) for row in vehicles], dtype=np.int64)
+        return {
+            "car_ids": np.array([row[0] for row in vehicles], dtype=np.int64),
+            "brands": [row[1] for row in vehicles],
+            "models": [row[2] for row in vehicles],
+            "years": np.array([row[3] for row in vehicles], dtype=np.int64),
+            "rate_per_day": np.array([row[4] for row in vehicles], dtype=np.float64),
+            "rate_per_km": np.array([row[5] for row in vehicles], dtype=np.float64),
+            "available": np.array([row[7] == "Available" for row in vehicles], dtype=bool),
+            "class_codes": class_codes,
+            "class_names": class_names,
+            "class_rows": [np.flatnonzero(class_codes == code) for code in range(len(class_names))],
+        }
+
+    def columns(self):
+        """Return the cached fleet columns, reloading them if vehicle.db changed."""
+        signature = ConnectionManager.signature(DATABASES["vehicle"])
+        with self._lock:
+            if signature != self._signature:
+                self._columns = self._load()
+                self._signature = signature
+            return self._columns
+
+    @staticmethod
+    def class_rows(columns, vehicle_type=None, vehicle_class=None):
+        """Row positions, in car_id order, of the cars of ``vehicle_class`` or of any class of ``vehicle_type``."""
+        if vehicle_class is None and vehicle_type is None:
+            return np.arange(len(columns["car_ids"]))
+        wanted = [vehicle_class] if vehicle_class is not None else VEHICLE_CLASSES.get(vehicle_type, [])
+        rows = [columns["class_rows"][columns["class_names"].index(name)]
+                for name in wanted if name in columns["class_names"]]
+        return np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    def search(self, start_date, end_date, vehicle_type=None, vehicle_class=None, min_year=None):
+        """Return (columns, row positions) of the matching Available cars that are free for all of [start_date, end_date)."""
+        start_date, end_date = parse_period(start_date, end_date)
+        columns = self.columns()
+        rows = self.class_rows(columns, vehicle_type, vehicle_class)
+        rows = rows[columns["available"][rows]]
+        if min_year is not None:
+            rows = rows[columns["years"][rows] >= min_year]
+        _, free = self.bookings.free(start_date, end_date, columns["car_ids"][rows])
+        return columns, rows[free]
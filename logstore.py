@@ -0,0 +1,234 @@
+import argparse
+import gzip
+import heapq
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from database import DATABASES, SCHEMA, ConnectionManager, DatabaseManager, DatabaseUtility, FullTextIndex
+
+LOG_ARCHIVE_DIR = "log_archive"  # one gzip-compressed SQLite file per archived month, next to logs.db
+LOG_RETENTION_MONTHS = 12        # months kept in logs.db, counting the current one; the Settings screen can change it
+LOG_FETCH_SIZE = 5000            # rows per fetchmany when reading a partition
+LOG_GZIP_LEVEL = 6               # level 9 takes several times longer for a slightly smaller archive
+
+
+def _shift_month(month, months):
+    """``"YYYY-MM"`` moved by ``months`` (negative moves back)."""
+    year, number = map(int, month.split("-"))
+    index = year * 12 + number - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _month_bounds(month):
+    """The half-open timestamp range [first day, first day of next month) of ``"YYYY-MM"``."""
+    return f"{month}-01", f"{_shift_month(month, 1)}-01"
+
+
+def _day_range(start, end):
+    """The half-open timestamp range [start, day after end) of two inclusive YYYY-MM-DD dates."""
+    return date.fromisoformat(start).isoformat(), (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+
+
+def _count(uri, start, end):
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        query = "SELECT COUNT(*) FROM logs WHERE timestamp >= ? AND timestamp < ?"
+        return conn.execute(query, (start, end)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _rows(uri, start, end, user):
+    """Stream (log_id, user, action, timestamp) with start <= timestamp < end from one partition, in time order."""
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        query = "SELECT log_id, user, action, timestamp FROM logs WHERE timestamp >= ? AND timestamp < ?"
+        params = [start, end]
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        cursor = conn.execute(query + " ORDER BY timestamp, log_id", params)
+        while True:
+            rows = cursor.fetchmany(LOG_FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
+class LogStore:
+    """Monthly partitions of the audit log, with retention and time-range queries.
+
+    logs.db holds the live partition: the last ``retention_months()`` months,
+    which the app writes, pages through and searches. ``archive()`` moves
+    every older month into its own SQLite file in ``LOG_ARCHIVE_DIR``,
+    gzip-compressed, and deletes it from logs.db. logs.db therefore stays
+    the same size however many years of history are kept, and so do
+    queries about recent activity. ``query(start, end)`` is the router. It
+    reads logs.db and decompresses only the archived months that overlap the
+    range. log_id is AUTOINCREMENT, so ids stay unique across partitions.
+    """
+
+    @staticmethod
+    def retention_months():
+        """Months to keep in logs.db: the ``log_retention_months`` setting, or LOG_RETENTION_MONTHS."""
+        try:
+            rows = DatabaseUtility.execute_query(
+                DATABASES["settings"], "SELECT setting_value FROM settings WHERE setting_name = 'log_retention_months'",
+                fetch=True,
+            )
+        except sqlite3.OperationalError:
+            rows = []  # the settings table is created when settings are first saved
+        return int(rows[0][0]) if rows else LOG_RETENTION_MONTHS
+
+    @staticmethod
+    def partition_path(month):
+        return os.path.join(LOG_ARCHIVE_DIR, f"logs-{month}.db.gz")
+
+    @staticmethod
+    def archived_months():
+        if not os.path.isdir(LOG_ARCHIVE_DIR):
+            return []
+        return sorted(name[len("logs-"):-len(".db.gz")] for name in os.listdir(LOG_ARCHIVE_DIR)
+                      if name.startswith("logs-") and name.endswith(".db.gz"))
+
+    @staticmethod
+    def _oldest_live_month():
+        with ConnectionManager.connection(DATABASES["logs"]) as conn:
+            oldest = conn.execute("SELECT MIN(timestamp) FROM logs").fetchone()[0]
+        return oldest[:7] if oldest else None
+
+    @staticmethod
+    def _write_partition(month):
+        """Copy ``month``'s rows from logs.db into its archive file, merging with any earlier archive of it."""
+        start, end = _month_bounds(month)
+        archive = LogStore.partition_path(month)
+        work = archive[:-len(".gz")]
+        if os.path.exists(work):
+            os.remove(work)  # left over from an interrupted run
+        if os.path.exists(archive):
+            with gzip.open(archive, "rb") as source, open(work, "wb") as target:
+                shutil.copyfileobj(source, target)
+        conn = sqlite3.connect(work, isolation_level=None)
+        try:
+            conn.execute(SCHEMA["logs"]["tables"][0])
+            conn.execute("ATTACH DATABASE ? AS live", (DATABASES["logs"],))
+            conn.execute("BEGIN")
+            conn.execute("""
+                INSERT OR IGNORE INTO main.logs (log_id, user, action, timestamp)
+                SELECT log_id, user, action, timestamp FROM live.logs WHERE timestamp >= ? AND timestamp < ?
+            """, (start, end))
+            conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE live")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
+        finally:
+            conn.close()
+        with open(work, "rb") as source, gzip.open(f"{archive}.part", "wb", compresslevel=LOG_GZIP_LEVEL) as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f"{archive}.part", archive)
+        os.remove(work)
+
+    @staticmethod
+    def archive(retention_months=None, today=None):
+        """Move every month older than the retention window out of logs.db; return the months archived.
+
+        Each month is written and compressed before its rows are deleted, so
+        an interrupted run loses nothing and is completed by the next one.
+        """
+        retention = retention_months or LogStore.retention_months()
+        if retention < 1:
+            raise ValueError("Log retention must be at least one month.")
+        cutoff = _shift_month((today or date.today()).strftime("%Y-%m"), 1 - retention)
+        month = LogStore._oldest_live_month()
+        if month is None or month >= cutoff:
+            return []
+        os.makedirs(LOG_ARCHIVE_DIR, exist_ok=True)
+        archived = []
+        # Deleting through the FTS triggers row by row is slow; reindex the (now small) live table once instead
+        with FullTextIndex.bulk_load("logs"):
+            while month is not None and month < cutoff:
+                LogStore._write_partition(month)
+                with ConnectionManager.transaction(DATABASES["logs"]) as conn:
+                    conn.execute("DELETE FROM logs WHERE timestamp >= ? AND timestamp < ?", _month_bounds(month))
+                archived.append(month)
+                month = LogStore._oldest_live_month()
+        return archived
+
+    @staticmethod
+    def archived_between(start, end):
+        """The archived months overlapping ``start`` to ``end`` (YYYY-MM-DD, inclusive)."""
+        first, stop = _day_range(start, end)
+        return [month for month in LogStore.archived_months() if month >= first[:7] and _month_bounds(month)[0] < stop]
+
+    @staticmethod
+    @contextmanager
+    def partitions(start, end):
+        """Yield read-only URIs of logs.db and of every archived month overlapping ``start`` to ``end``.
+
+        The archived months are decompressed into a temporary directory that
+        is removed on exit.
+        """
+        with tempfile.TemporaryDirectory(prefix="car-rental-logs-") as workdir:
+            uris = [f"file:{DATABASES['logs']}?mode=ro"]
+            for month in LogStore.archived_between(start, end):
+                path = os.path.join(workdir, f"logs-{month}.db")
+                with gzip.open(LogStore.partition_path(month), "rb") as source, open(path, "wb") as target:
+                    shutil.copyfileobj(source, target)
+                uris.append(f"file:{path}?mode=ro")
+            yield uris
+
+    @staticmethod
+    def count(uris, start, end):
+        """Number of entries from ``start`` to ``end`` (inclusive) across the partitions yielded by ``partitions()``."""
+        first, stop = _day_range(start, end)
+        return sum(_count(uri, first, stop) for uri in uris)
+
+    @staticmethod
+    def merge(uris, start, end, user=None):
+        """Yield (log_id, user, action, timestamp) from ``start`` to ``end`` across ``uris``, oldest first."""
+        first, stop = _day_range(start, end)
+        yield from heapq.merge(*(_rows(uri, first, stop, user) for uri in uris), key=lambda row: (row[3], row[0]))
+
+    @staticmethod
+    def query(start, end, user=None):
+        """Yield (log_id, user, action, timestamp) from ``start`` to ``end`` (YYYY-MM-DD, inclusive), oldest first.
+
+        Only archived months overlapping the range are decompressed, into a
+        temporary directory that is removed when the generator finishes.
+        """
+        with LogStore.partitions(start, end) as uris:
+            yield from LogStore.merge(uris, start, end, user)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old audit log months or read a time range across partitions.")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="move months older than the retention window to LOG_ARCHIVE_DIR")
+    archive.add_argument("--retention-months", type=int, default=None)
+    query = commands.add_parser("query", help="print the log entries in a date range")
+    query.add_argument("start", help="first day (YYYY-MM-DD)")
+    query.add_argument("end", help="last day (YYYY-MM-DD)")
+    query.add_argument("--user")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.directory)  # DATABASES and LOG_ARCHIVE_DIR are relative
+    DatabaseManager.initialize_database()
+    try:
+        if args.command == "archive":
+            months = LogStore.archive(args.retention_months)
+            print(f"Archived {len(months)} month(s){': ' + ', '.join(months) if months else ''}")
+        else:
+            for log_id, user, action, timestamp in LogStore.query(args.start, args.end, args.user):
+                print(f"{log_id}\t{timestamp}\t{user}\t{action}")
+    finally:
+        ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
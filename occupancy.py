@@ -0,0 +1,506 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+
+from analytics import FETCH_CHUNK, NON_REVENUE_STATUSES, days_since_epoch, iso_day
+from database import DATABASES, ConnectionManager, DatabaseManager, DatabaseUtility
+
+OCCUPANCY_DAY_STEP = 366   # the day axis grows a year at a time, so a booking rarely has to resize the file
+OCCUPANCY_CAR_STEP = 1024  # the car axis grows in blocks of rows
+OCCUPANCY_BLOCK = 4096     # cars reduced at a time; bounds the temporary arrays of the fleet-wide queries
+OCCUPANCY_FIRST_DATE = "2000-01-01"   # reservation days before it are left out of the map
+OCCUPANCY_HORIZON_DAYS = 10 * 366     # days after today the map covers; later reservation days are left out
+OCCUPANCY_MAX_BYTES = 2 ** 31         # hard cap on the count array; growing past it is refused, not allocated
+
+
+def _round_up(value, step):
+    return max(-(-value // step) * step, step)
+
+
+def _day(iso_date):
+    return days_since_epoch(date.fromisoformat(iso_date))
+
+
+def _window():
+    """The [first, last) days a map may cover; reservation days outside it are typos or far-future holds."""
+    return _day(OCCUPANCY_FIRST_DATE), days_since_epoch(date.today()) + OCCUPANCY_HORIZON_DAYS
+
+
+class OccupancyTooLarge(Exception):
+    """Raised instead of allocating a count array larger than OCCUPANCY_MAX_BYTES."""
+
+
+def _check_size(shape):
+    if shape[0] * shape[1] > OCCUPANCY_MAX_BYTES:
+        raise OccupancyTooLarge(
+            f"The occupancy map would need {shape[0]:,} cars x {shape[1]:,} days, more than {OCCUPANCY_MAX_BYTES:,} bytes."
+        )
+
+
+def occupancy_paths(name="occupancy"):
+    """The count array, its row -> car id list and its metadata of the day map ``name``, stored next to reservations.db."""
+    base = os.path.splitext(DATABASES["reservations"])[0]
+    return f"{base}.{name}.npy", f"{base}.{name}.cars.npy", f"{base}.{name}.json"
+
+
+def _lock_file(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class OccupancyMap:
+    """Per-car, per-day reservation counts kept in a memory-mapped NumPy file next to reservations.db.
+
+    Each car with reservations has a row, listed in a ``.cars.npy`` file next
+    to the map, so sparse or large car ids cost nothing. Column ``day -
+    origin`` holds the number of reservations covering that day whose status
+    is not in ``excluded`` (by default NON_REVENUE_STATUSES, i.e. rentals).
+    It is one byte per car and day, so cancelling one of two overlapping
+    rentals leaves the day rented. Utilization, idle, peak-day and free-car
+    questions become reductions over a slice of the array, ``OCCUPANCY_BLOCK``
+    cars at a time.
+
+    BookingEngine stages each change on the writing thread and applies it
+    after the commit. The file records the ``occupancy_version`` counter
+    that reservations.db triggers bump on every write. A write made anywhere
+    else, e.g. datagen, the importer or another process, leaves the file
+    behind the counter, and the next query rebuilds it from the table.
+    Applying, growing and rebuilding hold a ``.lock`` file next to the map, so
+    processes sharing it take turns, and each re-reads the metadata (and
+    remaps the file if another process replaced it) before touching it.
+
+    Only days from OCCUPANCY_FIRST_DATE to OCCUPANCY_HORIZON_DAYS after today
+    are mapped, so one mistyped date cannot blow up the array. A map that would
+    still exceed OCCUPANCY_MAX_BYTES is not written; the queries then count
+    from reservations.db, a block of cars at a time.
+    """
+
+    def __init__(self, name="occupancy", excluded=NON_REVENUE_STATUSES):
+        self.name = name
+        self.excluded = list(excluded)
+        self._lock = threading.RLock()
+        self._counts = None   # memmap of shape (rows, days)
+        self._car_ids = None  # car id of each used row
+        self._order = None    # rows sorted by car id, to look cars up
+        self._origin = None   # day (since the epoch) of column 0
+        self._version = None  # occupancy_version the counts reflect
+        self._identity = None  # (device, inode) of the mapped files, to notice when they are replaced
+        self._oversized = None  # version whose map would exceed OCCUPANCY_MAX_BYTES
+        self._lock_handle = None
+        self._lock_depth = 0
+        self._local = threading.local()
+
+    @staticmethod
+    def version(conn, schema="main"):
+        return conn.execute(f"SELECT version FROM {schema}.occupancy_version").fetchone()[0]
+
+    # Staged changes, applied once the writing transaction has committed
+
+    def _staged(self):
+        if not hasattr(self._local, "changes"):
+            self._local.changes = []
+        return self._local.changes
+
+    def stage(self, car_id, start_date, end_date, old_status, new_status):
+        """Record that a reservation moved from ``old_status`` (None when new) to ``new_status``."""
+        delta = (new_status not in self.excluded) - (old_status is not None and old_status not in self.excluded)
+        if not delta:
+            return
+        try:
+            car_id, first, last = int(car_id), _day(start_date), _day(end_date)
+        except (TypeError, ValueError):
+            return  # rows without a car id or dates are left out of the map, as the rebuild leaves them out
+        low, high = _window()
+        first, last = max(first, low), min(max(last, first + 1), high)
+        if car_id >= 0 and first < last:
+            self._staged().append((car_id, first, last, delta))
+
+    def mark(self):
+        return len(self._staged())
+
+    def discard(self, mark=0):
+        """Drop the changes staged since ``mark``, e.g. after a rollback."""
+        del self._staged()[mark:]
+
+    def apply(self, before, after):
+        """Apply the staged changes of a transaction that moved the version from ``before`` to ``after``."""
+        changes = self._staged()[:]
+        self.discard()
+        if before == after:
+            return
+        with self._lock:
+            try:
+                with self._file_lock():
+                    if not self._open() or self._version != before:
+                        return  # no file yet, or already behind; the next query rebuilds it
+                    for car_id, first, last, delta in changes:
+                        row = self._ensure(car_id, first, last)
+                        start, stop = first - self._origin, last - self._origin
+                        cells = self._counts[row, start:stop].astype(np.int16)
+                        self._counts[row, start:stop] = np.clip(cells + delta, 0, 255)
+                    self._counts.flush()
+                    self._save(after)
+            except (OSError, OccupancyTooLarge):
+                self._close()  # the metadata still names the old version, so the next query rebuilds
+
+    # The file
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the map's lock file; re-entrant within this process, exclusive across processes."""
+        with self._lock:
+            if not self._lock_depth:
+                path, _, _ = occupancy_paths(self.name)
+                handle = open(f"{os.path.splitext(path)[0]}.lock", "a+b")
+                try:
+                    _lock_file(handle)
+                except BaseException:
+                    handle.close()
+                    raise
+                self._lock_handle = handle
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if not self._lock_depth:
+                    handle, self._lock_handle = self._lock_handle, None
+                    try:
+                        _unlock_file(handle)
+                    finally:
+                        handle.close()
+
+    def _close(self):
+        self._counts = self._car_ids = self._order = self._origin = self._version = self._identity = None
+
+    @staticmethod
+    def _identify(*paths):
+        return tuple((stat.st_dev, stat.st_ino) for stat in map(os.stat, paths))
+
+    def _open(self):
+        """Map the file, or remap it if it was replaced, and re-read its metadata; False when there is none yet."""
+        path, cars_path, meta_path = occupancy_paths(self.name)
+        try:
+            identity = self._identify(path, cars_path)
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            self._close()
+            return False
+        if self._counts is None or identity != self._identity:
+            self._counts = np.load(path, mmap_mode="r+")
+            self._set_car_ids(np.load(cars_path))
+            self._identity = identity
+        self._origin, self._version = meta["origin"], meta["version"]
+        return True
+
+    def _save(self, version):
+        _, _, meta_path = occupancy_paths(self.name)
+        with open(f"{meta_path}.part", "w", encoding="utf-8") as f:
+            json.dump({"origin": self._origin, "version": version}, f)
+        os.replace(f"{meta_path}.part", meta_path)
+        self._version = version
+
+    def _set_car_ids(self, car_ids):
+        self._car_ids = car_ids
+        self._order = np.argsort(car_ids, kind="stable")
+
+    def _save_car_ids(self, car_ids):
+        """Write the row -> car id list and swap it in; callers save the metadata afterwards."""
+        path, cars_path, _ = occupancy_paths(self.name)
+        with open(f"{cars_path}.part", "wb") as f:
+            np.save(f, np.asarray(car_ids, dtype=np.int64))
+        os.replace(f"{cars_path}.part", cars_path)
+        self._set_car_ids(np.asarray(car_ids, dtype=np.int64))
+        self._identity = self._identify(path, cars_path)
+
+    def _rows(self, car_ids):
+        """Return (row of each car id, bool array: the car has a row)."""
+        known = self._car_ids[self._order]
+        if not len(known):
+            return np.zeros(len(car_ids), dtype=np.int64), np.zeros(len(car_ids), dtype=bool)
+        position = np.minimum(np.searchsorted(known, car_ids), len(known) - 1)
+        return self._order[position], known[position] == car_ids
+
+    def _replace(self, shape, fill, car_ids, origin, version):
+        """Write a new file of ``shape`` through ``fill(target)``, swap it in and map it.
+
+        The new array is a zero-filled memmap that ``fill`` writes a block at a
+        time, so even a large map is never held in memory whole.
+        """
+        path, cars_path, _ = occupancy_paths(self.name)
+        target = np.lib.format.open_memmap(f"{path}.part", mode="w+", dtype=np.uint8, shape=shape)
+        fill(target)
+        target.flush()
+        del target
+        self._counts = None  # release the old mapping before the file is replaced
+        os.replace(f"{path}.part", path)
+        self._counts = np.load(path, mmap_mode="r+")
+        self._save_car_ids(car_ids)
+        self._origin = origin
+        self._save(version)
+
+    def _ensure(self, car_id, first, last):
+        """Return the row of ``car_id``, giving it one and growing the file to cover [first, last) if needed."""
+        rows, mapped = self._rows(np.array([car_id], dtype=np.int64))
+        cars, days = self._counts.shape
+        used, origin = len(self._car_ids), self._origin
+        if first >= origin and last <= origin + days:
+            if mapped[0]:
+                return int(rows[0])
+            if used < cars:
+                self._save_car_ids(np.append(self._car_ids, car_id))
+                return used
+        car_ids = self._car_ids if mapped[0] else np.append(self._car_ids, car_id)
+        new_origin = origin - _round_up(origin - first, OCCUPANCY_DAY_STEP) if first < origin else origin
+        shape = (_round_up(len(car_ids), OCCUPANCY_CAR_STEP),
+                 _round_up(max(origin + days, last) - new_origin, OCCUPANCY_DAY_STEP))
+        _check_size(shape)
+        offset, old = origin - new_origin, self._counts
+
+        def fill(target):
+            for low in range(0, used, OCCUPANCY_BLOCK):
+                high = min(low + OCCUPANCY_BLOCK, used)
+                target[low:high, offset:offset + days] = old[low:high]
+
+        self._replace(shape, fill, car_ids, new_origin, self._version)
+        return int(rows[0]) if mapped[0] else used
+
+    def rebuild(self):
+        """Recount every counted reservation from reservations.db into a new file."""
+        conn = sqlite3.connect(f"file:{DATABASES['reservations']}?mode=ro", uri=True, isolation_level=None)
+        placeholders = ", ".join("?" for _ in self.excluded)
+        chunks = []
+        try:
+            conn.execute("BEGIN")  # the version and the rows come from one snapshot
+            version = self.version(conn)
+            cursor = conn.execute(f"""
+                SELECT car_id,
+                       CAST(julianday(start_date) - 2440587.5 AS INTEGER),
+                       CAST(julianday(end_date) - 2440587.5 AS INTEGER)
+                FROM reservations
+                WHERE status NOT IN ({placeholders}) AND typeof(car_id) = 'integer' AND car_id >= 0
+                  AND julianday(start_date) IS NOT NULL AND julianday(end_date) IS NOT NULL
+            """, self.excluded)
+            while True:
+                rows = cursor.fetchmany(FETCH_CHUNK)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.int64))
+        finally:
+            conn.close()
+        data = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+        low, high = _window()
+        first = np.maximum(data[:, 1], low)
+        last = np.minimum(np.maximum(data[:, 2], data[:, 1] + 1), high)
+        data = np.column_stack([data[:, 0], first, last])[first < last]
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        car_ids, rows = np.unique(data[:, 0], return_inverse=True)  # one row per car with reservations, in id order
+        first, last = data[:, 1], data[:, 2]
+
+        origin = int(first.min()) if len(data) else days_since_epoch(date.today())
+        days = _round_up(int(last.max()) - origin if len(data) else 1, OCCUPANCY_DAY_STEP)
+        shape = (_round_up(len(car_ids), OCCUPANCY_CAR_STEP), days)
+        _check_size(shape)
+
+        def fill(target):
+            # One difference array per block of rows: +1 on each first day, -1 after each last, then a running sum
+            bounds = np.searchsorted(rows, np.arange(0, len(car_ids) + OCCUPANCY_BLOCK, OCCUPANCY_BLOCK))
+            for block, low in enumerate(range(0, len(car_ids), OCCUPANCY_BLOCK)):
+                lo, hi = bounds[block], bounds[block + 1]
+                count = min(OCCUPANCY_BLOCK, len(car_ids) - low)
+                cells = (rows[lo:hi] - low) * (days + 1)
+                size = count * (days + 1)
+                diff = (np.bincount(cells + first[lo:hi] - origin, minlength=size)
+                        - np.bincount(cells + last[lo:hi] - origin, minlength=size))
+                target[low:low + count] = np.minimum(np.cumsum(diff.reshape(count, days + 1), axis=1)[:, :days], 255)
+
+        with self._lock, self._file_lock():
+            if self._open() and self._version >= version:
+                return  # another process rebuilt or updated the file past this snapshot meanwhile
+            self._replace(shape, fill, car_ids, origin, version)
+
+    def refresh(self):
+        """Make the map match reservations.db, re-reading or rebuilding the file if it is behind; return the version.
+
+        A map that would exceed OCCUPANCY_MAX_BYTES is not kept; the queries
+        then read reservations.db directly until the next write.
+        """
+        with ConnectionManager.connection(DATABASES["reservations"]) as conn:
+            version = self.version(conn)
+        with self._lock:
+            if self._version != version and self._oversized != version:
+                with self._file_lock():  # another process may be updating or replacing the file
+                    if not self._open() or self._version != version:
+                        try:
+                            self.rebuild()
+                        except OccupancyTooLarge:
+                            self._close()
+                            self._oversized = version
+        return version
+
+    # Fleet-wide queries over [start_date, end_date); car_ids defaults to every car in vehicle.db
+
+    @staticmethod
+    def _fleet(car_ids):
+        if car_ids is None:
+            rows = DatabaseUtility.execute_query(DATABASES["vehicle"], "SELECT car_id FROM vehicles ORDER BY car_id",
+                                                 fetch=True)
+            return np.array([row[0] for row in rows], dtype=np.int64)
+        return np.asarray(car_ids, dtype=np.int64)
+
+    def _query(self, ids, first, last):
+        """The rented days of ``ids`` over [first, last) read from reservations.db, used when there is no map."""
+        rented = np.zeros((len(ids), last - first), dtype=bool)
+        if not len(ids) or first == last:
+            return rented
+        statuses = ", ".join("?" for _ in self.excluded)
+        cars = ", ".join("?" for _ in ids)
+        with ConnectionManager.connection(DATABASES["reservations"]) as conn:
+            reservations = conn.execute(f"""
+                SELECT car_id,
+                       CAST(julianday(start_date) - 2440587.5 AS INTEGER),
+                       CAST(julianday(end_date) - 2440587.5 AS INTEGER)
+                FROM reservations
+                WHERE status NOT IN ({statuses}) AND car_id IN ({cars})
+                  AND start_date < ? AND (end_date > ? OR start_date >= ?)
+                  AND julianday(start_date) IS NOT NULL AND julianday(end_date) IS NOT NULL
+            """, [*self.excluded, *ids.tolist(), iso_day(last), iso_day(first), iso_day(first)]).fetchall()
+        positions = {}
+        for position, car_id in enumerate(ids.tolist()):
+            positions.setdefault(car_id, []).append(position)
+        for car_id, start, end in reservations:
+            start, end = max(start, first), min(max(end, start + 1), last)
+            if start < end:
+                rented[positions[car_id], start - first:end - first] = True
+        return rented
+
+    def _blocks(self, car_ids, start_date, end_date):
+        """Yield (row offset, bool array of rented days) for ``OCCUPANCY_BLOCK`` of ``car_ids`` at a time."""
+        first, last = _day(start_date), _day(end_date)
+        if last < first:
+            raise ValueError("End date must not be before the start date.")
+        self.refresh()
+        with self._lock:
+            if self._counts is None:  # too large to map; count from reservations.db instead
+                for offset in range(0, len(car_ids), OCCUPANCY_BLOCK):
+                    yield offset, self._query(car_ids[offset:offset + OCCUPANCY_BLOCK], first, last)
+                return
+            days = self._counts.shape[1]
+            low, high = max(first, self._origin), min(last, self._origin + days)
+            for offset in range(0, len(car_ids), OCCUPANCY_BLOCK):
+                ids = car_ids[offset:offset + OCCUPANCY_BLOCK]
+                rented = np.zeros((len(ids), last - first), dtype=bool)
+                rows, mapped = self._rows(ids)  # cars with no reservations on file were never rented
+                if low < high:
+                    rented[mapped, low - first:high - first] = (
+                        self._counts[rows[mapped], low - self._origin:high - self._origin] > 0)
+                yield offset, rented
+
+    def rented_days(self, start_date, end_date, car_ids=None):
+        """Return (car_ids, number of rented days of each)."""
+        car_ids = self._fleet(car_ids)
+        totals = np.zeros(len(car_ids), dtype=np.int64)
+        for offset, rented in self._blocks(car_ids, start_date, end_date):
+            totals[offset:offset + len(rented)] = rented.sum(axis=1)
+        return car_ids, totals
+
+    def free(self, start_date, end_date, car_ids=None):
+        """Return (car_ids, bool array: no counted reservation on any day of the range)."""
+        car_ids = self._fleet(car_ids)
+        free = np.zeros(len(car_ids), dtype=bool)
+        for offset, rented in self._blocks(car_ids, start_date, end_date):
+            free[offset:offset + len(rented)] = ~rented.any(axis=1)
+        return car_ids, free
+
+    def utilization(self, start_date, end_date, car_ids=None):
+        """Share of the car-days in the range that were rented, from 0 to 1."""
+        car_ids, totals = self.rented_days(start_date, end_date, car_ids)
+        car_days = len(car_ids) * (_day(end_date) - _day(start_date))
+        return float(totals.sum() / car_days) if car_days else 0.0
+
+    def idle_cars(self, start_date, end_date, car_ids=None):
+        """Car ids that were not rented on any day of the range."""
+        car_ids, totals = self.rented_days(start_date, end_date, car_ids)
+        return car_ids[totals == 0]
+
+    def longest_idle(self, start_date, end_date, car_ids=None):
+        """Return (car_ids, longest run of consecutive unrented days of each)."""
+        car_ids = self._fleet(car_ids)
+        longest = np.zeros(len(car_ids), dtype=np.int64)
+        for offset, rented in self._blocks(car_ids, start_date, end_date):
+            if not rented.shape[1]:
+                continue
+            day = np.arange(rented.shape[1], dtype=np.int32)
+            last_rented = np.maximum.accumulate(np.where(rented, day, np.int32(-1)), axis=1)
+            longest[offset:offset + len(rented)] = (day - last_rented).max(axis=1)
+        return car_ids, longest
+
+    def cars_out(self, start_date, end_date, car_ids=None):
+        """Number of cars rented on each day of the range."""
+        car_ids = self._fleet(car_ids)
+        out = np.zeros(_day(end_date) - _day(start_date), dtype=np.int64)
+        for _, rented in self._blocks(car_ids, start_date, end_date):
+            out += rented.sum(axis=0)
+        return out
+
+    def peak_days(self, start_date, end_date, top=5, car_ids=None):
+        """The ``top`` days with the most cars rented, as (YYYY-MM-DD, cars), busiest first."""
+        out = self.cars_out(start_date, end_date, car_ids)
+        busiest = np.argsort(-out, kind="stable")[:top]
+        first = _day(start_date)
+        return [(iso_day(first + day), int(out[day])) for day in busiest]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the occupancy map or print fleet utilization for a date range.")
+    parser.add_argument("--directory", default=".", help="where the database files live")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recount every reservation into the occupancy file")
+    stats = commands.add_parser("stats", help="utilization, idle cars and peak days over [start, end)")
+    stats.add_argument("start", help="first day (YYYY-MM-DD)")
+    stats.add_argument("end", help="day after the last (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.directory)  # DATABASES holds relative file names
+    DatabaseManager.initialize_database()
+    occupancy = OccupancyMap()
+    try:
+        if args.command == "rebuild":
+            occupancy.rebuild()
+            print(f"Rebuilt {occupancy_paths()[0]}")
+        else:
+            car_ids, longest = occupancy.longest_idle(args.start, args.end)
+            print(f"Utilization: {occupancy.utilization(args.start, args.end):.1%}")
+            print(f"Idle cars: {len(occupancy.idle_cars(args.start, args.end)):,} of {len(car_ids):,}")
+            if len(car_ids):
+                print(f"Longest idle streak: {int(longest.max())} days (car #{int(car_ids[np.argmax(longest)])})")
+            for day, cars in occupancy.peak_days(args.start, args.end):
+                print(f"Peak day {day}: {cars:,} cars out")
+    finally:
+        ConnectionManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import threading
+from datetime import date
+
+import numpy as np
+
+from analytics import days_since_epoch, iso_day, month_index
+from inventory import FleetIndex
+
+# Rental length tiers: (minimum rental days, multiplier); the longest tier reached applies
+LENGTH_TIERS = [(1, 1.00), (3, 0.95), (7, 0.85), (14, 0.80), (28, 0.70)]
+
+# Season multiplier per calendar month (January first), averaged over the rented days
+SEASON_MULTIPLIERS = [0.90, 0.90, 0.95, 1.00, 1.05, 1.20, 1.30, 1.30, 1.05, 1.00, 0.95, 1.15]
+
+# Vehicle class multipliers on a car's own rate; classes not listed price at 1.0
+CLASS_MULTIPLIERS = {
+    "Economy Car": 0.95, "Compact Car": 0.97, "Premium Car": 1.10, "Sporty Car": 1.15, "Luxury Car": 1.15,
+    "Elite Car": 1.20, "Convertible Car": 1.10, "Premium & Luxury SUV": 1.15, "Full Size SUV": 1.05,
+    "Box Truck": 1.05, "Refrigerated Truck": 1.10, "Refrigerated Van": 1.10,
+}
+
+# Utilization tiers: (minimum share of the class already booked during the rental, multiplier)
+UTILIZATION_TIERS = [(0.0, 1.00), (0.60, 1.05), (0.80, 1.15), (0.90, 1.30)]
+
+
+def _tier(tiers, values):
+    """Multiplier of the highest tier whose threshold each value reaches."""
+    thresholds = np.array([threshold for threshold, _ in tiers], dtype=np.float64)
+    multipliers = np.array([multiplier for _, multiplier in tiers], dtype=np.float64)
+    return multipliers[np.maximum(np.searchsorted(thresholds, values, side="right") - 1, 0)]
+
+
+class PricingEngine:
+    """Quotes rental prices for the whole fleet at once from the rule tables above.
+
+    A quote is ``rate_per_day * days`` scaled by the rental length tier, the
+    average season multiplier of the rented days, the car's class multiplier
+    and the utilization tier of its class over the rental. Then
+    ``rate_per_km * kilometers`` is added. Every factor is computed in one
+    vectorized pass over the FleetIndex columns, with utilization read from
+    the occupancy day map. The per-car day prices are memoized by (class,
+    date range). The cache is dropped when the fleet columns reload after
+    vehicle.db changes, when the occupancy map moves to a new version, or on
+    ``invalidate()`` after a rate edit.
+    """
+
+    def __init__(self, fleet, occupancy):
+        self.fleet = fleet
+        self.occupancy = occupancy
+        self._lock = threading.Lock()
+        self._columns = None
+        self._version = None
+        self._quotes = {}  # (vehicle_class, first day, last day) -> (car_ids, day prices, rates per km)
+
+    def invalidate(self):
+        with self._lock:
+            self._quotes = {}
+
+    def _price(self, columns, vehicle_class, first, last):
+        days = max(last - first, 1)
+        season = np.asarray(SEASON_MULTIPLIERS)[month_index(np.arange(first, first + days)) % 12].mean()
+        length = _tier(LENGTH_TIERS, days)
+
+        # Share of each class rented on at least one day of [first, last)
+        codes = columns["class_codes"]
+        classes = len(columns["class_names"])
+        _, rented = self.occupancy.rented_days(iso_day(first), iso_day(first + days), columns["car_ids"])
+        fleet = np.bincount(codes, minlength=classes)
+        utilization = np.bincount(codes, weights=rented > 0, minlength=classes) / np.maximum(fleet, 1)
+        class_factor = (np.array([CLASS_MULTIPLIERS.get(name, 1.0) for name in columns["class_names"]])
+                        * _tier(UTILIZATION_TIERS, utilization))
+
+        selected = FleetIndex.class_rows(columns, vehicle_class=vehicle_class)
+        day_prices = columns["rate_per_day"][selected] * (days * season * length) * class_factor[codes[selected]]
+        return columns["car_ids"][selected], day_prices, columns["rate_per_km"][selected]
+
+    def quote(self, start_date, end_date, vehicle_class=None, kilometers=0):
+        """Return (car_ids, prices) arrays for every car, or every car of ``vehicle_class``, over [start, end)."""
+        first = days_since_epoch(date.fromisoformat(start_date))
+        last = days_since_epoch(date.fromisoformat(end_date))
+        if last < first:
+            raise ValueError("End date must not be before the start date.")
+        columns = self.fleet.columns()
+        version = self.occupancy.refresh()
+        key = (vehicle_class, first, last)
+        with self._lock:
+            if columns is not self._columns or version != self._version:
+                self._columns, self._version = columns, version
+                self._quotes = {}
+            cached = self._quotes.get(key)
+        if cached is None:
+            cached = self._price(columns, vehicle_class, first, last)
+            with self._lock:
+                if columns is self._columns and version == self._version:
+                    self._quotes[key] = cached
+        car_ids, day_prices, rates_per_km = cached
+        return car_ids, np.round(day_prices + rates_per_km * float(kilometers), 2)
@@ -0,0 +1,346 @@
+# UI-free business operations used by the Tk screens, benchmarks and tools.
+# Nothing here imports tkinter, so the logic can be profiled without a display.
+from datetime import date
+from itertools import islice
+
+import numpy as np
+
+from analytics import REPORT_PERIODS, AnalyticsEngine, iso_day
+from auth import Authenticator, hash_password
+from booking import RELEASE_STATUSES, BookingEngine, parse_period, today_period
+from database import DATABASES, ConnectionManager, DatabaseUtility, vehicle_codes
+from inventory import FleetIndex
+from logstore import LogStore
+from pricing import PricingEngine
+
+LIST_LIMIT = 200    # default page size for the list_* methods
+SEARCH_LIMIT = 200  # ranked matches returned by the search_* methods
+
+
+def _page(db_name, select, key, after, limit, where="", params=(), before=None):
+    """Keyset-paginated read: rows of ``select`` after (or before) a key, in key order."""
+    conditions = [where] if where else []
+    params = list(params)
+    order = "ASC"
+    if after is not None:
+        conditions.append(f"{key} > ?")
+        params.append(after)
+    elif before is not None:
+        conditions.append(f"{key} < ?")
+        params.append(before)
+        order = "DESC"
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = DatabaseUtility.execute_query(
+        db_name, f"{select}{where_clause} ORDER BY {key} {order} LIMIT ?", (*params, limit), fetch=True
+    )
+    return rows[::-1] if order == "DESC" else rows
+
+
+def _match_query(text):
+    """Turn free text into an FTS5 query in which every word must match as a prefix."""
+    return " ".join(f'"{word}"*' for word in text.replace('"', " ").split())
+
+
+def _search(db_name, query, text, limit):
+    match = _match_query(text)
+    if not match:
+        return []
+    return DatabaseUtility.execute_query(db_name, query, (match, limit), fetch=True)
+
+
+class UserService:
+    """Employee accounts and authentication."""
+
+    @staticmethod
+    def login(username, password):
+        """Return a Session for valid credentials, or None. Slow by design; keep it off the Tk thread."""
+        return Authenticator.authenticate(username, password)
+
+    @staticmethod
+    def list_users(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["user"],
+                     "SELECT username, role, first_name, last_name, phone, email, employee_id, address FROM users",
+                     "username", after, limit, before=before)
+
+    @staticmethod
+    def add_user(username, password, role, first_name, last_name, phone, email, employee_id, address):
+        """Insert an employee; raises sqlite3.IntegrityError if the username exists."""
+        DatabaseUtility.execute_query(DATABASES["user"], """
+            INSERT INTO users (username, password, role, first_name, last_name, phone, email, employee_id, address)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (username, hash_password(password), role, first_name, last_name, phone, email, employee_id, address))
+
+    @staticmethod
+    def delete_user(username):
+        """Delete an employee. Returns False if the username was not found."""
+        with ConnectionManager.transaction(DATABASES["user"]) as conn:
+            return conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount > 0
+
+    @staticmethod
+    def update_user(username, password, role, first_name, last_name, phone, email, employee_id, address):
+        """Overwrite an employee's details, keeping the password if ``password`` is empty.
+
+        Returns False if the username was not found.
+        """
+        hashed = hash_password(password) if password else None  # hashed before user.db is locked
+        with ConnectionManager.transaction(DATABASES["user"]) as conn:
+            return conn.execute("""
+                UPDATE users
+                SET password = COALESCE(?, password), role = ?, first_name = ?, last_name = ?, phone = ?, email = ?, employee_id = ?, address = ?
+                WHERE username = ?
+            """, (hashed, role, first_name, last_name, phone, email, employee_id, address, username)).rowcount > 0
+
+
+class VehicleService:
+    """Fleet records and availability."""
+    fleet = FleetIndex(BookingEngine.bookings)
+
+    @staticmethod
+    def list_vehicles(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["vehicle"],
+                     "SELECT car_id, brand, model, year, rate_per_day, rate_per_km FROM vehicles",
+                     "car_id", after, limit, before=before)
+
+    @staticmethod
+    def add_vehicle(brand, model, year, kilometers, rate_per_day, rate_per_km, vehicle_type, vehicle_class):
+        """Add an Available car; raises ValueError if ``vehicle_class`` is not a class of ``vehicle_type``."""
+        type_id, class_id = vehicle_codes(vehicle_type, vehicle_class)
+        DatabaseUtility.execute_query(DATABASES["vehicle"], """
+            INSERT INTO vehicles (brand, model, year, kilometers, rate_per_day, rate_per_km, type_id, class_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (brand, model, year, kilometers, rate_per_day, rate_per_km, type_id, class_id))
+
+    @staticmethod
+    def delete_vehicle(car_id):
+        """Delete a car. Returns False if the car_id was not found."""
+        with ConnectionManager.transaction(DATABASES["vehicle"]) as conn:
+            return conn.execute("DELETE FROM vehicles WHERE car_id = ?", (car_id,)).rowcount > 0
+
+    @staticmethod
+    def update_vehicle(car_id, brand, model, year, rate_per_day, rate_per_km, vehicle_type, vehicle_class):
+        """Update a car's details, pricing and class. Returns False if the car_id was not found.
+
+        Raises ValueError if ``vehicle_class`` is not a class of ``vehicle_type``.
+        """
+        type_id, class_id = vehicle_codes(vehicle_type, vehicle_class)
+        with ConnectionManager.transaction(DATABASES["vehicle"]) as conn:
+            return conn.execute("""
+                UPDATE vehicles
+                SET brand = ?, model = ?, year = ?, rate_per_day = ?, rate_per_km = ?, type_id = ?, class_id = ?
+                WHERE car_id = ?
+            """, (brand, model, year, rate_per_day, rate_per_km, type_id, class_id, car_id)).rowcount > 0
+
+    @staticmethod
+    def available_cars(start_date=None, end_date=None):
+        """Cars with no active reservation in [start_date, end_date); defaults to today."""
+        if start_date is None:
+            start_date, end_date = today_period()
+        return BookingEngine.available_cars(start_date, end_date)
+
+    @staticmethod
+    def is_available(car_id, start_date, end_date):
+        return BookingEngine.is_available(car_id, start_date, end_date)
+
+    @staticmethod
+    def search_available(start_date, end_date, vehicle_type=None, vehicle_class=None, max_price=None, min_year=None,
+                         limit=SEARCH_LIMIT):
+        """Available cars free for all of [start_date, end_date) that match the filters, cheapest quote first.
+
+        Rows are (car_id, brand, model, year, vehicle_class, rate_per_day, rate_per_km, quote).
+        """
+        start_date, end_date = parse_period(start_date, end_date)
+        columns, rows = VehicleService.fleet.search(start_date, end_date, vehicle_type, vehicle_class, min_year)
+        car_ids, prices = PricingService.quote(start_date, end_date)
+        position = np.clip(np.searchsorted(car_ids, columns["car_ids"][rows]), 0, max(len(car_ids) - 1, 0))
+        quotes = prices[position] if len(car_ids) else np.empty(0)
+        if max_price is not None:
+            rows, quotes = rows[quotes <= max_price], quotes[quotes <= max_price]
+        order = np.argsort(quotes, kind="stable")[:limit]
+        names = columns["class_names"]
+        return [
+            (int(columns["car_ids"][row]), columns["brands"][row], columns["models"][row], int(columns["years"][row]),
+             names[columns["class_codes"][row]] or "", float(columns["rate_per_day"][row]),
+             float(columns["rate_per_km"][row]), float(quote))
+            for row, quote in zip(rows[order], quotes[order])
+        ]
+
+
+class ReservationService:
+    """Bookings, reservation status changes and reservation listings."""
+
+    @staticmethod
+    def book(car_id, customer_name, start_date, end_date):
+        """Book a car for a customer; raises BookingConflict or ValueError. Returns the reservation_id."""
+        return BookingEngine.book(car_id, customer_name, start_date, end_date)
+
+    @staticmethod
+    def reserve(car_id, customer_name, start_date, end_date, status):
+        return BookingEngine.reserve(car_id, customer_name, start_date, end_date, status)
+
+    @staticmethod
+    def update_status(reservation_id, new_status):
+        BookingEngine.update_status(reservation_id, new_status)
+
+    @staticmethod
+    def list_reservations(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["reservations"],
+                     "SELECT reservation_id, customer_name, car_id, start_date, end_date, status FROM reservations",
+                     "reservation_id", after, limit, before=before)
+
+    @staticmethod
+    def get_reservation(reservation_id):
+        """One row shaped like list_reservations, or None if it does not exist."""
+        rows = DatabaseUtility.execute_query(DATABASES["reservations"], """
+            SELECT reservation_id, customer_name, car_id, start_date, end_date, status
+            FROM reservations WHERE reservation_id = ?
+        """, (reservation_id,), fetch=True)
+        return rows[0] if rows else None
+
+    @staticmethod
+    def status_counts():
+        """Reservation count per status, from the trigger-maintained counters table."""
+        return dict(DatabaseUtility.execute_query(
+            DATABASES["reservations"], "SELECT status, count FROM reservation_counters", fetch=True
+        ))
+
+    @staticmethod
+    def upcoming(limit):
+        """The next ``limit`` active reservations starting today or later."""
+        placeholders = ", ".join("?" for _ in RELEASE_STATUSES)
+        return DatabaseUtility.execute_query(DATABASES["reservations"], f"""
+            SELECT reservation_id, customer_name, car_id, start_date, end_date
+            FROM reservations
+            WHERE start_date >= ? AND status NOT IN ({placeholders})
+            ORDER BY start_date
+            LIMIT ?
+        """, (today_period()[0], *RELEASE_STATUSES, limit), fetch=True)
+
+
+class CustomerService:
+    """Customer records and feedback."""
+
+    @staticmethod
+    def list_customers(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["customer"],
+                     "SELECT name, address, phone, license_number, insurance_company, policy_number FROM customers",
+                     "name", after, limit, before=before)
+
+    @staticmethod
+    def add_customer(name, address, phone, license_number, insurance_company, policy_number):
+        """Insert a customer; raises sqlite3.IntegrityError if the name exists."""
+        DatabaseUtility.execute_query(DATABASES["customer"], """
+            INSERT INTO customers (name, address, phone, license_number, insurance_company, policy_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, address, phone, license_number, insurance_company, policy_number))
+
+    @staticmethod
+    def delete_customer(name):
+        DatabaseUtility.execute_query(DATABASES["customer"], "DELETE FROM customers WHERE name = ?", (name,))
+
+    @staticmethod
+    def search_customers(text, limit=SEARCH_LIMIT):
+        """Customers matching every word of ``text`` in name, address, phone or licence, best first."""
+        return _search(DATABASES["customer"], """
+            SELECT c.name, c.address, c.phone, c.license_number, c.insurance_company, c.policy_number
+            FROM customers_fts JOIN customers AS c ON c.rowid = customers_fts.rowid
+            WHERE customers_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, text, limit)
+
+    @staticmethod
+    def list_feedback(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["customer"],
+                     "SELECT feedback_id, customer_name, rating, comment, date FROM feedback",
+                     "feedback_id", after, limit, before=before)
+
+    @staticmethod
+    def search_feedback(text, limit=SEARCH_LIMIT):
+        """Feedback whose comment matches every word of ``text``, best first."""
+        return _search(DATABASES["customer"], """
+            SELECT f.feedback_id, f.customer_name, f.rating, f.comment, f.date
+            FROM feedback_fts JOIN feedback AS f ON f.feedback_id = feedback_fts.rowid
+            WHERE feedback_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, text, limit)
+
+
+class LogService:
+    """The audit log written by AuditLogger."""
+
+    @staticmethod
+    def list_logs(after=None, limit=LIST_LIMIT, before=None):
+        return _page(DATABASES["logs"], "SELECT log_id, user, action, timestamp FROM logs",
+                     "log_id", after, limit, before=before)
+
+    @staticmethod
+    def search_logs(text, limit=SEARCH_LIMIT):
+        """Log entries whose action matches every word of ``text``, best first."""
+        return _search(DATABASES["logs"], """
+            SELECT l.log_id, l.user, l.action, l.timestamp
+            FROM logs_fts JOIN logs AS l ON l.log_id = logs_fts.rowid
+            WHERE logs_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, text, limit)
+
+    @staticmethod
+    def logs_between(start_date, end_date, user=None, limit=None):
+        """Log entries from ``start_date`` to ``end_date`` (inclusive), oldest first, archived months included."""
+        return list(islice(LogStore.query(start_date, end_date, user), limit))
+
+
+class ReportingService:
+    """Revenue and booking reports, backed by a shared AnalyticsEngine."""
+    analytics = AnalyticsEngine()
+
+    @staticmethod
+    def report(period, reference=None):
+        return ReportingService.analytics.report(period, reference)
+
+    @staticmethod
+    def monthly_summary():
+        return ReportingService.analytics.monthly_summary()
+
+    @staticmethod
+    def utilization(period, reference=None):
+        """Fleet utilization (metric, value) rows for the same window as ``report(period, reference)``."""
+        first, last = AnalyticsEngine.window(REPORT_PERIODS[period][0], reference or date.today())
+        start, end = iso_day(first), iso_day(last)
+        occupancy = BookingEngine.occupancy
+        car_ids, rented = occupancy.rented_days(start, end)
+        if not len(car_ids):
+            return [("Fleet Utilization", "-")]
+        _, idle = occupancy.longest_idle(start, end, car_ids)
+        (peak_day, cars_out), = occupancy.peak_days(start, end, top=1, car_ids=car_ids)
+        return [
+            ("Fleet Utilization", f"{rented.sum() / (len(car_ids) * (last - first)):.1%}"),
+            ("Idle Cars", f"{int((rented == 0).sum()):,} of {len(car_ids):,}"),
+            ("Longest Idle Streak", f"{int(idle.max())} day{'s' if idle.max() != 1 else ''} (car #{int(car_ids[idle.argmax()])})"),
+            ("Peak Day", f"{date.fromisoformat(peak_day).strftime('%B %d, %Y')} ({cars_out:,} cars out)"),
+        ]
+
+
+class PricingService:
+    """Rental quotes from the shared PricingEngine, over the fleet index and the occupancy map."""
+    engine = PricingEngine(VehicleService.fleet, BookingEngine.occupancy)
+
+    @staticmethod
+    def quote(start_date, end_date, vehicle_class=None, kilometers=0):
+        """(car_ids, prices) NumPy arrays for every matching car."""
+        return PricingService.engine.quote(start_date, end_date, vehicle_class, kilometers)
+
+    @staticmethod
+    def quote_cars(car_ids, start_date, end_date, kilometers=0):
+        """Return {car_id: price} for the given cars; unknown cars are left out."""
+        fleet, prices = PricingService.engine.quote(start_date, end_date, kilometers=kilometers)
+        wanted = np.asarray([int(car_id) for car_id in car_ids], dtype=np.int64)
+        position = np.clip(np.searchsorted(fleet, wanted), 0, max(len(fleet) - 1, 0))
+        found = (fleet[position] == wanted) if len(fleet) else np.zeros(len(wanted), dtype=bool)
+        return {int(car_id): float(price) for car_id, price in zip(wanted[found], prices[position[found]])}
+
+    @staticmethod
+    def invalidate():
+        """Forget memoized quotes, e.g. after a car's rates were edited."""
+        PricingService.engine.invalidate()